@@ -1,9 +1,15 @@
 import streamlit as st
 from datetime import datetime, date
-import json
-from typing import List, Dict
-import pandas as pd
-import io
+import os
+
+from todo_engine import (
+    CATEGORIES, DUE_FILTER_OPTIONS, EXPORT_FORMATS, IMPORT_FORMATS, PRIORITY_COLORS, PRIORITY_COLORS_HEX,
+    SORT_OPTIONS, STATUS_OPTIONS, History, JournalTaskStorage, PhaseTimer, SQLiteTaskStorage, TaskEngine,
+    configure_logging, due_label, due_range, format_import_report, page_count, page_window, paging_state,
+    table_changes, table_due_date
+)
+
+timer = PhaseTimer(enabled=False)
 
 # Cấu hình trang
 st.set_page_config(
@@ -13,103 +19,94 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Khởi tạo session state
-if 'tasks' not in st.session_state:
-    st.session_state.tasks = []
-
-if 'task_id_counter' not in st.session_state:
-    st.session_state.task_id_counter = 0
-
-# Khởi tạo order cho các tasks cũ (nếu chưa có)
-for idx, task in enumerate(st.session_state.tasks):
-    if 'order' not in task:
-        task['order'] = idx
-
-# Định nghĩa priority colors
-PRIORITY_COLORS = {
-    "Gấp": "🔴",
-    "Quan trọng": "🟡",
-    "Bình thường": "🟢"
-}
+# Đo thời gian từng giai đoạn của mỗi lần chạy: bật bằng TODO_PROFILE=1 hoặc ?profile=1 trên URL
+timer.enabled = os.environ.get("TODO_PROFILE", "0") != "0" or st.query_params.get("profile") == "1"
+if timer.enabled:
+    configure_logging()
+
+PAGE_SIZES = [20, 50, 100, 200]
 
-PRIORITY_COLORS_HEX = {
-    "Gấp": "#FF4444",
-    "Quan trọng": "#FFAA00",
-    "Bình thường": "#44FF44"
+# Màu nhãn ngày hết hạn theo nhóm (xem due_label)
+DUE_LABEL_COLORS = {'overdue': "red", 'today': "orange"}
+
+VIEW_MODES = ["Phân trang", "Tải thêm", "Bảng"]
+
+# Chế độ bảng: cột → field của task (cột "Hạn" chỉ để xem), style ô theo mức độ ưu tiên / hạn
+TABLE_FIELDS = {
+    "Hoàn thành": 'completed', "Tên công việc": 'name', "Mức độ ưu tiên": 'priority',
+    "Danh mục": 'category', "Ngày hết hạn": 'due_date'
+}
+PRIORITY_TABLE_STYLES = {
+    priority: f"background-color: {color}; color: white" for priority, color in PRIORITY_COLORS_HEX.items()
 }
+DUE_TABLE_STYLES = {bucket: f"color: {color}" for bucket, color in DUE_LABEL_COLORS.items()}
+TABLE_HEIGHT = 600
 
-CATEGORIES = ["Công việc", "Cá nhân", "Học tập", "Khác"]
-
-def add_task(task_name: str, priority: str, category: str, due_date: date = None):
-    """Thêm task mới vào danh sách"""
-    max_order = max([t.get('order', 0) for t in st.session_state.tasks], default=-1)
-    task = {
-        'id': st.session_state.task_id_counter,
-        'name': task_name,
-        'completed': False,
-        'priority': priority,
-        'category': category,
-        'due_date': due_date.isoformat() if due_date else None,
-        'created_at': datetime.now().isoformat(),
-        'order': max_order + 1
-    }
-    st.session_state.tasks.append(task)
-    st.session_state.task_id_counter += 1
-
-def update_task(task_id: int, **kwargs):
-    """Cập nhật thông tin task"""
-    for task in st.session_state.tasks:
-        if task['id'] == task_id:
-            for key, value in kwargs.items():
-                if key == 'due_date' and value:
-                    task[key] = value.isoformat() if isinstance(value, date) else value
-                else:
-                    task[key] = value
-            break
-
-def delete_task(task_id: int):
-    """Xóa task khỏi danh sách"""
-    st.session_state.tasks = [t for t in st.session_state.tasks if t['id'] != task_id]
-
-def toggle_task_completion(task_id: int):
-    """Chuyển đổi trạng thái hoàn thành của task"""
-    for task in st.session_state.tasks:
-        if task['id'] == task_id:
-            task['completed'] = not task['completed']
-            break
-
-def reorder_tasks(old_index: int, new_index: int):
-    """Sắp xếp lại thứ tự tasks"""
-    if 0 <= old_index < len(st.session_state.tasks) and 0 <= new_index < len(st.session_state.tasks):
-        task = st.session_state.tasks.pop(old_index)
-        st.session_state.tasks.insert(new_index, task)
-        # Cập nhật lại order cho tất cả tasks
-        for idx, t in enumerate(st.session_state.tasks):
-            t['order'] = idx
-
-def move_task_up(task_id: int):
-    """Di chuyển task lên trên"""
-    task_index = next((i for i, t in enumerate(st.session_state.tasks) if t['id'] == task_id), None)
-    if task_index is not None and task_index > 0:
-        reorder_tasks(task_index, task_index - 1)
-
-def move_task_down(task_id: int):
-    """Di chuyển task xuống dưới"""
-    task_index = next((i for i, t in enumerate(st.session_state.tasks) if t['id'] == task_id), None)
-    if task_index is not None and task_index < len(st.session_state.tasks) - 1:
-        reorder_tasks(task_index, task_index + 1)
+# Đường dẫn file SQLite để lưu trữ lâu dài (bỏ trống = chỉ lưu trong session)
+DB_PATH = os.environ.get("TODO_DB_PATH", "")
+
+# Hoặc lưu bằng journal chỉ ghi nối thêm + snapshot (xem JournalTaskStorage)
+JOURNAL_PATH = os.environ.get("TODO_JOURNAL_PATH", "")
+
+# Mọi session dùng chung một danh sách: luôn bật khi lưu xuống file, hoặc TODO_SHARED=1 để dùng chung trong bộ nhớ
+SHARED = bool(DB_PATH or JOURNAL_PATH) or os.environ.get("TODO_SHARED", "0") != "0"
+
+# Số giây giữa hai lần kiểm tra thay đổi từ session khác
+SYNC_INTERVAL = float(os.environ.get("TODO_SYNC_INTERVAL", "2"))
+
+# Số giây giữa hai lần cập nhật tiến độ nhập/xuất chạy nền
+JOB_POLL_INTERVAL = 0.5
+
+
+@st.cache_resource
+def get_shared_engine(db_path: str, journal_path: str) -> TaskEngine:
+    """Một engine dùng chung cho mọi session trong process (lưu vào SQLite hoặc journal nếu có đường dẫn)"""
+    if db_path:
+        return TaskEngine.from_storage(SQLiteTaskStorage(db_path))
+    if journal_path:
+        return TaskEngine.from_storage(JournalTaskStorage(journal_path))
+    return TaskEngine()
+
+
+# Khởi tạo session state
+with timer.phase("session_init"):
+    if 'engine' not in st.session_state:
+        st.session_state.engine = get_shared_engine(DB_PATH, JOURNAL_PATH) if SHARED else TaskEngine()
+    if 'history' not in st.session_state:
+        # Lịch sử hoàn tác riêng của session, kể cả khi engine được dùng chung
+        st.session_state.history = History()
+
+engine: TaskEngine = st.session_state.engine
+history: History = st.session_state.history
+store = engine.store
+
+# Dữ liệu đã đổi từ lần chạy trước (có thể do session khác): bỏ state cũ của
+# checkbox hoàn thành để chúng hiển thị đúng giá trị hiện tại
+if st.session_state.get('seen_version') != engine.version:
+    for key in [k for k in st.session_state if k.startswith("checkbox_")]:
+        del st.session_state[key]
+    st.session_state.seen_version = engine.version
+
+if SHARED:
+    @st.fragment(run_every=SYNC_INTERVAL)
+    def sync_with_other_sessions():
+        """Chỉ chạy lại cả trang khi version đã khác lần chạy trước"""
+        if engine.version != st.session_state.seen_version:
+            st.rerun(scope="app")
+
+    sync_with_other_sessions()
 
 # Sidebar - Bộ lọc và tìm kiếm
-with st.sidebar:
+with st.sidebar, timer.phase("sidebar"):
     st.header("🔍 Tìm kiếm & Lọc")
     
     # Tìm kiếm
-    search_query = st.text_input("🔎 Tìm kiếm công việc", "")
+    search_query = st.text_input("🔎 Tìm kiếm công việc", "", help="Tìm theo đầu từ, không cần gõ dấu (vd: \"gap bao\" tìm thấy \"Gấp báo cáo\")")
     
     # Bộ lọc trạng thái
     filter_status = st.selectbox(
         "📊 Lọc theo trạng thái",
-        ["Tất cả", "Đang làm", "Đã hoàn thành"]
+        STATUS_OPTIONS
     )
     
     # Bộ lọc priority
@@ -124,221 +121,228 @@ with st.sidebar:
         ["Tất cả"] + CATEGORIES
     )
     
+    # Bộ lọc ngày hết hạn (tra trên chỉ mục ngày hết hạn của store)
+    today = date.today()
+    filter_due = st.selectbox("📅 Lọc theo ngày hết hạn", DUE_FILTER_OPTIONS)
+    due_from = due_to = None
+    if filter_due == "Khoảng ngày":
+        picked = st.date_input("Từ ngày – đến ngày", value=(), key="due_range")
+        if picked:
+            due_from = picked[0]
+            due_to = picked[1] if len(picked) > 1 else None
+    due_filter_range = due_range(filter_due, today, due_from, due_to)
+    
     # Tùy chọn sắp xếp
     st.divider()
     st.subheader("🔄 Sắp xếp")
     sort_option = st.selectbox(
         "Sắp xếp theo",
-        ["Thứ tự thêm", "Mức độ ưu tiên", "Ngày hết hạn", "Tên (A-Z)"],
+        SORT_OPTIONS,
         key="sort_option"
     )
     
     st.divider()
     
-    # Thống kê
-    total_tasks = len(st.session_state.tasks)
-    completed_tasks = sum(1 for t in st.session_state.tasks if t['completed'])
-    pending_tasks = total_tasks - completed_tasks
-    
-    st.metric("Tổng số công việc", total_tasks)
-    st.metric("Đã hoàn thành", completed_tasks)
-    st.metric("Đang làm", pending_tasks)
+    # Thống kê (snapshot theo version từ bộ đếm của store, không duyệt danh sách)
+    with timer.phase("sidebar_stats"):
+        _, (stats, count_table) = engine.summary(today)
+        
+        st.metric("Tổng số công việc", stats['total'])
+        st.metric("Đã hoàn thành", stats['completed'])
+        st.metric("Đang làm", stats['pending'])
+        
+        with st.expander("📊 Thống kê chi tiết"):
+            st.progress(stats['completion_rate'], text=f"Tỷ lệ hoàn thành: {stats['completion_rate']:.0%}")
+            stat_col1, stat_col2 = st.columns(2)
+            stat_col1.metric("⏰ Quá hạn", stats['overdue'])
+            stat_col2.metric("📅 Hết hạn hôm nay", stats['due_today'])
+            st.caption("Đã hoàn thành / tổng số theo danh mục × mức độ ưu tiên")
+            st.dataframe(
+                [
+                    {"Danh mục": category} | {
+                        priority: "{}/{}".format(*count_table.get((category, priority), (0, 0)))
+                        for priority in PRIORITY_COLORS
+                    }
+                    for category in CATEGORIES
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
     
     # Export/Import data
     st.divider()
     st.subheader("💾 Quản lý dữ liệu")
     
+    # Nhập/xuất chạy nền: tên việc ("export:<định dạng>" hoặc "import") → Job
+    if 'jobs' not in st.session_state:
+        st.session_state.jobs = {}
+    jobs = st.session_state.jobs
+    
     # Export
-    col_export1, col_export2 = st.columns(2)
-    with col_export1:
-        if st.button("📥 Xuất Excel", use_container_width=True):
-            if st.session_state.tasks:
-                # Chuyển đổi tasks sang DataFrame
-                tasks_data = []
-                for task in st.session_state.tasks:
-                    due_date_str = ""
-                    if task.get('due_date'):
-                        try:
-                            due_date_obj = datetime.fromisoformat(task['due_date']).date()
-                            due_date_str = due_date_obj.strftime('%Y-%m-%d')
-                        except:
-                            due_date_str = task.get('due_date', '')
-                    
-                    tasks_data.append({
-                        'ID': task.get('id', ''),
-                        'Tên công việc': task.get('name', ''),
-                        'Hoàn thành': 'Có' if task.get('completed', False) else 'Không',
-                        'Mức độ ưu tiên': task.get('priority', ''),
-                        'Danh mục': task.get('category', ''),
-                        'Ngày hết hạn': due_date_str,
-                        'Ngày tạo': task.get('created_at', '')[:10] if task.get('created_at') else ''
-                    })
-                
-                df = pd.DataFrame(tasks_data)
-                
-                # Tạo Excel file trong memory
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Danh sách công việc')
-                
-                output.seek(0)
-                
-                st.download_button(
-                    label="⬇️ Tải file Excel",
-                    data=output.getvalue(),
-                    file_name=f"todo_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+    with timer.phase("sidebar_export"):
+        export_columns = st.columns(2)
+        for i, fmt in enumerate(EXPORT_FORMATS):
+            with export_columns[i % 2]:
+                running = f"export:{fmt}" in jobs and not jobs[f"export:{fmt}"].done
+                if st.button(f"📥 Xuất {fmt}", use_container_width=True, disabled=running):
+                    if store.tasks:
+                        jobs[f"export:{fmt}"] = engine.submit_export(fmt)
+                    else:
+                        st.warning("Không có dữ liệu để xuất!")
+        
+        # Xuất thay đổi: chỉ các task đã thêm/sửa/xóa sau mốc của lần xuất trước (nhập lại bằng "Gộp theo ID")
+        st.markdown("**🔁 Xuất thay đổi**")
+        st.text_input(
+            "Từ mốc", key="changes_since", placeholder="Bỏ trống = tất cả",
+            help="Mốc 'until' trong file thay đổi lần trước; được điền sẵn sau mỗi lần tải"
+        )
+        if st.button("📥 Xuất thay đổi", use_container_width=True):
+            st.session_state.changes_export = engine.export_changes(st.session_state.changes_since or None)
+        if 'changes_export' in st.session_state:
+            def advance_changes_since(until: str):
+                """Lần xuất sau chỉ lấy các thay đổi từ sau file vừa tải"""
+                st.session_state.changes_since = until
+                del st.session_state.changes_export
+            
+            until, data = st.session_state.changes_export
+            st.download_button(
+                label="⬇️ Tải file thay đổi",
+                data=data,
+                file_name=f"todo_changes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json",
+                on_click=advance_changes_since,
+                args=(until,),
+                use_container_width=True
+            )
+    
+    # Import
+    with timer.phase("sidebar_import"):
+        st.markdown("**📤 Nhập dữ liệu**")
+        uploaded_file = st.file_uploader(
+            "Chọn file Excel (.xlsx) hoặc JSON (.json, .jsonl)",
+            type=list(IMPORT_FORMATS),
+            label_visibility="collapsed"
+        )
+        merge_import = st.toggle(
+            "🔀 Gộp theo ID", key="merge_import",
+            help="Chỉ áp dụng các task mới hơn bản đang có (file JSON từ \"Xuất thay đổi\" hoặc \"Xuất JSON\"), không thay cả danh sách"
+        )
+        
+        # Kết quả của lần nhập trước (được giữ qua st.rerun)
+        if 'import_message' in st.session_state:
+            level, message = st.session_state.pop('import_message')
+            getattr(st, level)(message)
+        
+        # Mỗi file chỉ được nhập một lần, tránh nhập lại ở các lần chạy sau
+        if uploaded_file is not None and uploaded_file.file_id != st.session_state.get('imported_file_id'):
+            st.session_state.imported_file_id = uploaded_file.file_id
+            # Job nền đọc thẳng file đã upload (không chép ra bộ nhớ lần nữa);
+            # mỗi lần chạy lại, file_uploader trả về một đối tượng file mới
+            uploaded_file.seek(0)
+            file_kind = IMPORT_FORMATS.get(uploaded_file.name.split('.')[-1].lower())
+            if file_kind is None:
+                st.error("Định dạng file không được hỗ trợ!")
+            elif 'import' in jobs and not jobs['import'].done:
+                st.warning("Đang nhập một file khác, hãy chờ xong hoặc hủy trước!")
+            elif merge_import:
+                if file_kind == "JSON":
+                    jobs['import'] = engine.submit_merge(uploaded_file, uploaded_file.name, history=history)
+                else:
+                    st.error("Chỉ gộp được file JSON!")
             else:
-                st.warning("Không có dữ liệu để xuất!")
-    
-    with col_export2:
-        if st.button("📥 Xuất JSON", use_container_width=True):
-            if st.session_state.tasks:
-                tasks_json = json.dumps(st.session_state.tasks, ensure_ascii=False, indent=2)
-                st.download_button(
-                    label="⬇️ Tải file JSON",
-                    data=tasks_json,
-                    file_name=f"todo_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json"
+                # Excel được chuẩn hóa theo cột; JSON được đọc theo từng bản ghi,
+                # bản ghi không hợp lệ bị bỏ qua. Danh sách chỉ bị thay khi đọc xong.
+                jobs['import'] = engine.submit_import(uploaded_file, uploaded_file.name, history=history)
+    
+    def finish_import(job):
+        """Ghi lại kết quả nhập để hiển thị sau khi chạy lại cả trang.
+
+        Dựa vào kết quả của job chứ không vào việc đã bấm hủy: bấm hủy sau lần
+        báo tiến độ cuối thì danh sách vẫn được thay.
+        """
+        file_kind = IMPORT_FORMATS[job.label.rsplit('.', 1)[-1].lower()]
+        if job.cancelled:
+            st.session_state.import_message = ("info", "Đã hủy nhập dữ liệu, danh sách không thay đổi.")
+        elif job.label.startswith("Gộp") and job.error is not None:
+            st.session_state.import_message = ("error", f"Lỗi khi gộp dữ liệu: {job.error}")
+        elif job.label.startswith("Gộp"):
+            merged_count, report = job.result()
+            st.session_state.import_message = (
+                "success", f"Đã gộp {merged_count} thay đổi từ file {file_kind}. " + format_import_report(report)
+            )
+        elif job.error is not None:
+            st.session_state.import_message = (
+                "error",
+                f"Lỗi khi nhập dữ liệu: {job.error} 💡 Hãy đảm bảo file Excel có các cột: 'Tên công việc' (bắt buộc), "
+                "'Hoàn thành', 'Mức độ ưu tiên', 'Danh mục', 'Ngày hết hạn'"
+            )
+        else:
+            imported_count, report = job.result()
+            if imported_count:
+                st.session_state.import_message = (
+                    "success",
+                    f"Đã nhập thành công {imported_count} công việc từ file {file_kind}! " + format_import_report(report)
                 )
             else:
-                st.warning("Không có dữ liệu để xuất!")
+                st.session_state.import_message = (
+                    "warning", f"Không có dữ liệu hợp lệ trong file {file_kind}! " + format_import_report(report)
+                )
     
-    # Import
-    st.markdown("**📤 Nhập dữ liệu**")
-    uploaded_file = st.file_uploader(
-        "Chọn file Excel (.xlsx) hoặc JSON (.json)",
-        type=['xlsx', 'xls', 'json'],
-        label_visibility="collapsed"
-    )
+    polling = any(not job.done for job in jobs.values())
     
-    if uploaded_file is not None:
-        try:
-            file_extension = uploaded_file.name.split('.')[-1].lower()
-            
-            if file_extension in ['xlsx', 'xls']:
-                # Đọc file Excel
-                df = pd.read_excel(uploaded_file)
-                
-                # Kiểm tra các cột bắt buộc
-                required_columns = ['Tên công việc']
-                if not all(col in df.columns for col in required_columns):
-                    st.error("File Excel thiếu cột bắt buộc: 'Tên công việc'")
-                else:
-                    # Chuyển đổi DataFrame sang danh sách tasks
-                    imported_tasks = []
-                    for idx, row in df.iterrows():
-                        # Xử lý ID - xử lý NaN an toàn
-                        task_id = st.session_state.task_id_counter + idx
-                        if 'ID' in df.columns:
-                            id_value = row.get('ID')
-                            if pd.notna(id_value):
-                                try:
-                                    task_id = int(float(id_value))  # Chuyển qua float trước để xử lý NaN
-                                except (ValueError, TypeError):
-                                    task_id = st.session_state.task_id_counter + idx
-                        
-                        # Xử lý tên công việc - bắt buộc
-                        task_name = str(row.get('Tên công việc', '')).strip()
-                        if not task_name or task_name == 'nan':
-                            continue  # Bỏ qua dòng không có tên công việc
-                        
-                        # Xử lý trạng thái hoàn thành
-                        completed = False
-                        if 'Hoàn thành' in df.columns:
-                            hoan_thanh_val = row.get('Hoàn thành')
-                            if pd.notna(hoan_thanh_val):
-                                hoan_thanh_str = str(hoan_thanh_val).strip().lower()
-                                completed = hoan_thanh_str in ['có', 'yes', 'true', '1', 'x', '✓', '✅']
-                        
-                        # Xử lý mức độ ưu tiên
-                        priority = 'Bình thường'
-                        if 'Mức độ ưu tiên' in df.columns:
-                            priority_val = row.get('Mức độ ưu tiên')
-                            if pd.notna(priority_val):
-                                priority_str = str(priority_val).strip()
-                                if priority_str in ['Gấp', 'Quan trọng', 'Bình thường']:
-                                    priority = priority_str
-                        
-                        # Xử lý danh mục
-                        category = 'Khác'
-                        if 'Danh mục' in df.columns:
-                            category_val = row.get('Danh mục')
-                            if pd.notna(category_val):
-                                category_str = str(category_val).strip()
-                                if category_str in CATEGORIES:
-                                    category = category_str
-                        
-                        # Xử lý ngày hết hạn
-                        due_date = None
-                        if 'Ngày hết hạn' in df.columns:
-                            due_date_val = row.get('Ngày hết hạn')
-                            if pd.notna(due_date_val):
-                                try:
-                                    if isinstance(due_date_val, str):
-                                        due_date = datetime.strptime(due_date_val, '%Y-%m-%d').date()
-                                    else:
-                                        due_date = due_date_val.date() if hasattr(due_date_val, 'date') else None
-                                except:
-                                    try:
-                                        due_date = pd.to_datetime(due_date_val).date()
-                                    except:
-                                        due_date = None
-                        
-                        task = {
-                            'id': task_id,
-                            'name': task_name,
-                            'completed': completed,
-                            'priority': priority,
-                            'category': category,
-                            'due_date': due_date.isoformat() if due_date else None,
-                            'created_at': datetime.now().isoformat(),
-                            'order': idx
-                        }
-                        
-                        imported_tasks.append(task)
-                    
-                    if imported_tasks:
-                        st.session_state.tasks = imported_tasks
-                        # Cập nhật task_id_counter
-                        max_id = max([t.get('id', 0) for t in imported_tasks])
-                        st.session_state.task_id_counter = max_id + 1
-                        st.success(f"Đã nhập thành công {len(imported_tasks)} công việc từ file Excel!")
-                        st.rerun()
-                    else:
-                        st.warning("Không có dữ liệu hợp lệ trong file Excel!")
-            
-            elif file_extension == 'json':
-                # Đọc file JSON
-                data = json.load(uploaded_file)
-                if isinstance(data, list):
-                    # Đảm bảo tất cả tasks có field 'order'
-                    for idx, task in enumerate(data):
-                        if 'order' not in task:
-                            task['order'] = idx
-                    st.session_state.tasks = data
-                    # Cập nhật task_id_counter
-                    if data:
-                        max_id = max([t.get('id', 0) for t in data])
-                        st.session_state.task_id_counter = max_id + 1
-                    st.success(f"Đã nhập thành công {len(data)} công việc từ file JSON!")
-                    st.rerun()
-                else:
-                    st.error("File JSON không đúng định dạng!")
+    @st.fragment(run_every=JOB_POLL_INTERVAL if polling else None)
+    def job_panel():
+        """Tiến độ và kết quả nhập/xuất; chỉ phần này chạy lại trong lúc chờ"""
+        jobs = st.session_state.jobs
+        for key, job in list(jobs.items()):
+            if not job.done:
+                progress_col, cancel_col = st.columns([4, 1])
+                progress_col.progress(job.progress, text=f"{job.label} ({job.progress:.0%})")
+                if cancel_col.button("✖️", key=f"cancel_{key}", help="Hủy", disabled=job.cancel_requested):
+                    job.cancel()
+            elif key == 'import':
+                del jobs[key]
+                finish_import(job)
+                st.rerun(scope="app")
+            elif job.cancelled:
+                del jobs[key]
+            elif job.error is not None:
+                del jobs[key]
+                st.error(f"Lỗi khi xuất {key.split(':', 1)[1]}: {job.error}")
             else:
-                st.error("Định dạng file không được hỗ trợ!")
-                
-        except Exception as e:
-            st.error(f"Lỗi khi nhập dữ liệu: {str(e)}")
-            st.info("💡 Hãy đảm bảo file Excel có các cột: 'Tên công việc' (bắt buộc), 'Hoàn thành', 'Mức độ ưu tiên', 'Danh mục', 'Ngày hết hạn'")
+                fmt = key.split(':', 1)[1]
+                extension, mime, _ = EXPORT_FORMATS[fmt]
+                if st.download_button(
+                    label=f"⬇️ Tải file {fmt}",
+                    data=job.result(),
+                    file_name=f"todo_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime,
+                    key=f"download_{key}"
+                ):
+                    del jobs[key]
+        # Hết việc đang chạy thì chạy lại cả trang một lần để dừng cập nhật định kỳ
+        if polling and all(job.done for job in jobs.values()):
+            st.rerun(scope="app")
+    
+    job_panel()
 
 # Main content
-st.title("✅ To-Do List App")
+title_col, undo_col, redo_col = st.columns([6, 1, 1])
+title_col.title("✅ To-Do List App")
+with undo_col:
+    undo_label = history.undo_label
+    if st.button("↩️ Hoàn tác", help=undo_label, disabled=undo_label is None, use_container_width=True):
+        engine.undo(history=history)
+        st.rerun()
+with redo_col:
+    redo_label = history.redo_label
+    if st.button("↪️ Làm lại", help=redo_label, disabled=redo_label is None, use_container_width=True):
+        engine.redo(history=history)
+        st.rerun()
 st.markdown("---")
 
 # Form thêm task mới
-with st.expander("➕ Thêm công việc mới", expanded=True):
+with st.expander("➕ Thêm công việc mới", expanded=True), timer.phase("add_form"):
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -360,7 +364,7 @@ with st.expander("➕ Thêm công việc mới", expanded=True):
         add_button = st.button("➕ Thêm", type="primary", use_container_width=True)
     
     if add_button and new_task_name:
-        add_task(new_task_name, new_task_priority, new_task_category, new_task_due_date)
+        engine.add_task(new_task_name, new_task_priority, new_task_category, new_task_due_date, history=history)
         st.success(f"Đã thêm: {new_task_name}")
         st.rerun()
     elif add_button and not new_task_name:
@@ -368,75 +372,207 @@ with st.expander("➕ Thêm công việc mới", expanded=True):
 
 st.markdown("---")
 
-# Lọc và tìm kiếm tasks
-filtered_tasks = st.session_state.tasks.copy()
-
-# Áp dụng bộ lọc trạng thái
-if filter_status == "Đang làm":
-    filtered_tasks = [t for t in filtered_tasks if not t['completed']]
-elif filter_status == "Đã hoàn thành":
-    filtered_tasks = [t for t in filtered_tasks if t['completed']]
-
-# Áp dụng bộ lọc priority
-if filter_priority != "Tất cả":
-    filtered_tasks = [t for t in filtered_tasks if t['priority'] == filter_priority]
+# Lọc và tìm kiếm tasks (snapshot theo version, dùng chung giữa các session cùng bộ lọc)
+with timer.phase("query"):
+    _, filtered_ids = engine.query(
+        filter_status, filter_priority, filter_category, search_query, sort_option, due_filter_range, timer=timer
+    )
 
-# Áp dụng bộ lọc category
-if filter_category != "Tất cả":
-    filtered_tasks = [t for t in filtered_tasks if t['category'] == filter_category]
+# Hiển thị danh sách tasks
+if filtered_ids:
+    st.subheader(f"📋 Danh sách công việc ({len(filtered_ids)}/{len(store)})")
 
-# Áp dụng tìm kiếm
-if search_query:
-    filtered_tasks = [t for t in filtered_tasks if search_query.lower() in t['name'].lower()]
+# Phân trang: chỉ tạo widget cho các task trong cửa sổ đang xem; hoặc cả danh sách trong một bảng
+page_col1, page_col2, page_col3 = st.columns([2, 1, 1])
+with page_col1:
+    view_mode = st.radio("Hiển thị", VIEW_MODES, horizontal=True, key="view_mode")
 
-# Hiển thị danh sách tasks
-if not filtered_tasks:
+if not filtered_ids:
     st.info("📝 Không có công việc nào. Hãy thêm công việc mới!")
+elif view_mode == "Bảng":
+    # Cả danh sách lọc được vẽ bằng một st.data_editor (một component dù có bao nhiêu task)
+    import pandas as pd
+    
+    _, table_tasks = engine.rows(filtered_ids)
+    table_ids = [t['id'] for t in table_tasks]
+    today_ordinal = today.toordinal()
+    due_badges, due_styles = [], []
+    for task in table_tasks:
+        due = task['due']
+        bucket, label = due_label(due, today_ordinal) if due is not None else (None, "")
+        due_badges.append(label)
+        due_styles.append(DUE_TABLE_STYLES.get(bucket, ""))
+    
+    with timer.phase("table_build"):
+        priorities = [t['priority'] for t in table_tasks]
+        table = pd.DataFrame(
+            {
+                "Hoàn thành": [t['completed'] for t in table_tasks],
+                "Tên công việc": [t['name'] for t in table_tasks],
+                "Ưu tiên": [PRIORITY_COLORS.get(p, "⚪") for p in priorities],
+                "Mức độ ưu tiên": priorities,
+                "Danh mục": [t['category'] for t in table_tasks],
+                "Ngày hết hạn": [table_due_date(t['due_date']) for t in table_tasks],
+                "Hạn": due_badges,
+            },
+            index=pd.Index(table_ids, name="ID")
+        )
+        # st.data_editor chỉ tô màu cột không sửa được: màu mức độ ưu tiên nằm ở cột "Ưu tiên"
+        priority_styles = [PRIORITY_TABLE_STYLES.get(p, "") for p in priorities]
+        styled = (
+            table.style
+            .apply(lambda column: priority_styles, subset=["Ưu tiên"])
+            .apply(lambda column: due_styles, subset=["Hạn"])
+        )
+    
+    def apply_table_edits(key: str, rows: list):
+        """Chỉ gửi các ô đã sửa (diff theo dòng) cho engine, trong một thao tác hoàn tác"""
+        changes = table_changes(st.session_state[key]["edited_rows"], rows, TABLE_FIELDS)
+        engine.apply_changes(changes, history=history)
+    
+    table_key = f"table_{engine.version}"
+    with timer.phase("table_render"):
+        st.data_editor(
+            styled,
+            key=table_key,
+            on_change=apply_table_edits,
+            args=(table_key, table_tasks),
+            num_rows="fixed",
+            disabled=["Ưu tiên", "Hạn"],
+            column_config={
+                "Hoàn thành": st.column_config.CheckboxColumn(width="small"),
+                "Tên công việc": st.column_config.TextColumn(width="large", required=True),
+                "Ưu tiên": st.column_config.TextColumn(width="small"),
+                "Mức độ ưu tiên": st.column_config.SelectboxColumn(options=list(PRIORITY_COLORS), required=True),
+                "Danh mục": st.column_config.SelectboxColumn(options=CATEGORIES, required=True),
+                "Ngày hết hạn": st.column_config.DateColumn(format="DD/MM/YYYY"),
+            },
+            height=TABLE_HEIGHT,
+            use_container_width=True
+        )
 else:
-    st.subheader(f"📋 Danh sách công việc ({len(filtered_tasks)}/{len(st.session_state.tasks)})")
-    
-    # Sắp xếp tasks
-    priority_order = {"Gấp": 0, "Quan trọng": 1, "Bình thường": 2}
-    
-    if sort_option == "Thứ tự thêm":
-        # Tìm order trong danh sách gốc
-        task_order_map = {t['id']: t.get('order', 0) for t in st.session_state.tasks}
-        filtered_tasks.sort(key=lambda x: (x['completed'], task_order_map.get(x['id'], 0)))
-    elif sort_option == "Mức độ ưu tiên":
-        filtered_tasks.sort(key=lambda x: (x['completed'], priority_order.get(x['priority'], 3)))
-    elif sort_option == "Ngày hết hạn":
-        def get_due_date(task):
-            if task['due_date']:
-                try:
-                    return datetime.fromisoformat(task['due_date']).date()
-                except:
-                    return date.max
-            return date.max
-        filtered_tasks.sort(key=lambda x: (x['completed'], get_due_date(x)))
-    elif sort_option == "Tên (A-Z)":
-        filtered_tasks.sort(key=lambda x: (x['completed'], x['name'].lower()))
-    
-    for idx, task in enumerate(filtered_tasks):
+    with page_col2:
+        page_size = st.selectbox("Số công việc mỗi trang", PAGE_SIZES, key="page_size")
+    
+    total_pages = page_count(len(filtered_ids), page_size)
+    # Tìm kiếm / bộ lọc / cách sắp xếp đổi thì về trang đầu; giữ task vừa di chuyển trong cửa sổ đang xem
+    list_signature = (search_query, filter_status, filter_priority, filter_category, due_filter_range, sort_option)
+    reset = st.session_state.get('list_signature') != list_signature
+    st.session_state.list_signature = list_signature
+    focus_task_id = st.session_state.pop('focus_task_id', None)
+    focus_index = filtered_ids.index(focus_task_id) if focus_task_id in filtered_ids else None
+    st.session_state.page_number, st.session_state.visible_count = paging_state(
+        len(filtered_ids), page_size,
+        st.session_state.get('page_number', 1), st.session_state.get('visible_count'),
+        focus_index=focus_index, reset=reset
+    )
+    
+    if view_mode == "Phân trang":
+        with page_col3:
+            page_number = st.number_input("Trang", min_value=1, max_value=total_pages, step=1, key="page_number")
+        start, end = page_window(len(filtered_ids), page_size, page_number=page_number)
+    else:
+        start, end = page_window(len(filtered_ids), page_size, visible_count=st.session_state.visible_count)
+    
+    _, visible_tasks = engine.rows(filtered_ids[start:end])
+    st.caption(f"Hiển thị {start + 1}–{start + len(visible_tasks)} / {len(filtered_ids)} công việc")
+    
+    # Chế độ chọn nhiều: thao tác trên cả nhóm chỉ cần một lần chạy lại
+    selection_mode = st.toggle("☑️ Chọn nhiều", key="selection_mode")
+    if 'selected_ids' not in st.session_state:
+        st.session_state.selected_ids = set()
+        st.session_state.selection_generation = 0
+    selected_ids = st.session_state.selected_ids
+    selected_ids.difference_update([i for i in selected_ids if i not in store])
+    
+    def reset_selection(task_ids=()):
+        """Đặt lại tập đang chọn; đổi generation để các checkbox chọn được tạo lại"""
+        st.session_state.selected_ids = set(task_ids)
+        st.session_state.selection_generation += 1
+    
+    def toggle_selection(task_id: int):
+        st.session_state.selected_ids ^= {task_id}
+    
+    def set_completed(task_id: int):
+        """Ghi đúng giá trị người dùng vừa chọn (không đảo), nên không lệch khi session khác cũng vừa đổi"""
+        engine.update_task(task_id, completed=st.session_state[f"checkbox_{task_id}"], history=history)
+    
+    if selection_mode:
+        with st.container(border=True):
+            bulk_col1, bulk_col2, bulk_col3 = st.columns([2, 1, 1])
+            bulk_col1.markdown(f"**Đã chọn {len(selected_ids)} công việc**")
+            if bulk_col2.button(f"Chọn tất cả ({len(filtered_ids)})", use_container_width=True):
+                reset_selection(filtered_ids)
+                st.rerun()
+            if bulk_col3.button("Bỏ chọn", use_container_width=True, disabled=not selected_ids):
+                reset_selection()
+                st.rerun()
+            
+            action_col1, action_col2, action_col3 = st.columns(3)
+            if action_col1.button("✅ Hoàn thành", use_container_width=True, disabled=not selected_ids):
+                engine.bulk_set_completed(selected_ids, True, history=history)
+                st.rerun()
+            if action_col2.button("↩️ Chưa hoàn thành", use_container_width=True, disabled=not selected_ids):
+                engine.bulk_set_completed(selected_ids, False, history=history)
+                st.rerun()
+            if action_col3.button("🗑️ Xóa đã chọn", use_container_width=True, disabled=not selected_ids):
+                engine.bulk_delete(selected_ids, history=history)
+                reset_selection()
+                st.rerun()
+            
+            edit_col1, edit_col2, edit_col3, edit_col4 = st.columns(4)
+            with edit_col1:
+                bulk_priority = st.selectbox("Mức độ ưu tiên", ["Bình thường", "Quan trọng", "Gấp"], key="bulk_priority")
+                if st.button("⚡ Đổi mức độ", use_container_width=True, disabled=not selected_ids):
+                    engine.bulk_update(selected_ids, priority=bulk_priority, history=history)
+                    st.rerun()
+            with edit_col2:
+                bulk_category = st.selectbox("Danh mục", CATEGORIES, key="bulk_category")
+                if st.button("📁 Đổi danh mục", use_container_width=True, disabled=not selected_ids):
+                    engine.bulk_update(selected_ids, category=bulk_category, history=history)
+                    st.rerun()
+            with edit_col3:
+                bulk_due_date = st.date_input("Ngày hết hạn", value=None, key="bulk_due_date")
+                if st.button("📅 Đặt hạn", use_container_width=True, disabled=not selected_ids):
+                    engine.bulk_update(selected_ids, due_date=bulk_due_date, history=history)
+                    st.rerun()
+            with edit_col4:
+                bulk_position = st.number_input("Vị trí khối", min_value=1, max_value=max(1, len(store)), step=1, key="bulk_position")
+                if st.button("↕️ Di chuyển khối", use_container_width=True, disabled=not selected_ids):
+                    engine.bulk_move(selected_ids, bulk_position - 1, history=history)
+                    st.rerun()
+    
+    today_ordinal = today.toordinal()
+    for idx, task in enumerate(timer.timed("row", visible_tasks)):
         with st.container():
             # Tìm vị trí thực tế trong danh sách gốc để di chuyển
-            original_index = next((i for i, t in enumerate(st.session_state.tasks) if t['id'] == task['id']), None)
-            can_move_up = original_index is not None and original_index > 0
-            can_move_down = original_index is not None and original_index < len(st.session_state.tasks) - 1
+            original_index = task['index']
+            can_move_up = original_index > 0
+            can_move_down = original_index < stats['total'] - 1
             
             # Tạo layout cho mỗi task
             task_col1, task_col2, task_col3, task_col4, task_col5, task_col6 = st.columns([0.5, 3, 2, 1.5, 1, 0.8])
             
             with task_col1:
+                if selection_mode:
+                    # Checkbox chọn (giữ qua các trang nhờ on_change)
+                    st.checkbox(
+                        "Chọn",
+                        value=task['id'] in selected_ids,
+                        key=f"select_{st.session_state.selection_generation}_{task['id']}",
+                        label_visibility="collapsed",
+                        on_change=toggle_selection,
+                        args=(task['id'],)
+                    )
                 # Checkbox hoàn thành
-                is_completed = st.checkbox(
+                st.checkbox(
                     "",
                     value=task['completed'],
                     key=f"checkbox_{task['id']}",
-                    label_visibility="collapsed"
+                    label_visibility="collapsed",
+                    on_change=set_completed,
+                    args=(task['id'],)
                 )
-                if is_completed != task['completed']:
-                    toggle_task_completion(task['id'])
-                    st.rerun()
             
             with task_col2:
                 # Hiển thị tên task với style
@@ -461,16 +597,12 @@ else:
             with task_col3:
                 # Hiển thị thông tin bổ sung
                 info_text = f"📁 {task['category']}"
-                if task['due_date']:
-                    due_date_obj = datetime.fromisoformat(task['due_date']).date()
-                    today = date.today()
-                    days_left = (due_date_obj - today).days
-                    if days_left < 0:
-                        info_text += f" | ⏰ <span style='color: red;'>Quá hạn {abs(days_left)} ngày</span>"
-                    elif days_left == 0:
-                        info_text += f" | ⏰ <span style='color: orange;'>Hết hạn hôm nay</span>"
-                    else:
-                        info_text += f" | ⏰ Còn {days_left} ngày"
+                due = task['due']
+                if due is not None:
+                    # Nhãn được cache theo (ngày hết hạn, hôm nay), không parse lại mỗi dòng
+                    bucket, label = due_label(due, today_ordinal)
+                    color = DUE_LABEL_COLORS.get(bucket)
+                    info_text += f" | ⏰ <span style='color: {color};'>{label}</span>" if color else f" | ⏰ {label}"
                 
                 st.markdown(info_text, unsafe_allow_html=True)
             
@@ -478,7 +610,7 @@ else:
                 # Dropdown để chỉnh sửa
                 edit_option = st.selectbox(
                     "Thao tác",
-                    ["Chọn...", "✏️ Chỉnh sửa", "🗑️ Xóa"],
+                    ["Chọn...", "✏️ Chỉnh sửa", "↕️ Di chuyển", "🗑️ Xóa"],
                     key=f"action_{task['id']}"
                 )
                 
@@ -507,19 +639,47 @@ else:
                         )
                         
                         if st.button("💾 Lưu", key=f"save_{task['id']}"):
-                            update_task(
+                            engine.update_task(
                                 task['id'],
                                 name=edit_name,
                                 priority=edit_priority,
                                 category=edit_category,
-                                due_date=edit_due_date
+                                due_date=edit_due_date,
+                                history=history
                             )
                             st.success("Đã cập nhật!")
                             st.rerun()
                 
+                elif edit_option == "↕️ Di chuyển":
+                    with st.popover("Di chuyển công việc", use_container_width=True):
+                        target_position = st.number_input(
+                            "Vị trí mới",
+                            min_value=1,
+                            max_value=max(stats['total'], original_index + 1),
+                            value=original_index + 1,
+                            step=1,
+                            key=f"move_position_{task['id']}"
+                        )
+                        move_col1, move_col2, move_col3 = st.columns(3)
+                        with move_col1:
+                            if st.button("⏫ Lên đầu", key=f"move_top_{task['id']}", use_container_width=True):
+                                engine.move_task_to_top(task['id'], history=history)
+                                st.session_state.focus_task_id = task['id']
+                                st.rerun()
+                        with move_col2:
+                            if st.button("⏬ Xuống cuối", key=f"move_bottom_{task['id']}", use_container_width=True):
+                                engine.move_task_to_bottom(task['id'], history=history)
+                                st.session_state.focus_task_id = task['id']
+                                st.rerun()
+                        with move_col3:
+                            if st.button("↕️ Di chuyển", key=f"move_to_{task['id']}", use_container_width=True):
+                                engine.move_task_to(task['id'], target_position - 1, history=history)
+                                st.session_state.focus_task_id = task['id']
+                                st.rerun()
+                
                 elif edit_option == "🗑️ Xóa":
                     if st.button("Xác nhận xóa", key=f"confirm_delete_{task['id']}", type="secondary"):
-                        delete_task(task['id'])
+                        engine.delete_task(task['id'], history=history)
                         st.success("Đã xóa!")
                         st.rerun()
             
@@ -537,20 +697,45 @@ else:
             
             with task_col6:
                 # Nút di chuyển lên/xuống (chỉ hiển thị khi không filter hoặc filter = "Tất cả")
-                if filter_status == "Tất cả" and filter_priority == "Tất cả" and filter_category == "Tất cả" and not search_query:
+                if (filter_status == "Tất cả" and filter_priority == "Tất cả" and filter_category == "Tất cả"
+                        and not search_query and due_filter_range is None):
                     col_up, col_down = st.columns(2)
                     with col_up:
                         if st.button("⬆️", key=f"up_{task['id']}", disabled=not can_move_up, use_container_width=True):
-                            move_task_up(task['id'])
+                            engine.move_task_up(task['id'], history=history)
+                            st.session_state.focus_task_id = task['id']
                             st.rerun()
                     with col_down:
                         if st.button("⬇️", key=f"down_{task['id']}", disabled=not can_move_down, use_container_width=True):
-                            move_task_down(task['id'])
+                            engine.move_task_down(task['id'], history=history)
+                            st.session_state.focus_task_id = task['id']
                             st.rerun()
             
             st.divider()
+    
+    if view_mode == "Tải thêm" and end < len(filtered_ids):
+        if st.button(f"⬇️ Tải thêm {min(page_size, len(filtered_ids) - end)} công việc", use_container_width=True):
+            st.session_state.visible_count += page_size
+            st.rerun()
 
 # Footer
 st.markdown("---")
-st.caption("💡 Tip: Dữ liệu được lưu tự động trong session. Sử dụng tính năng Export/Import để lưu trữ lâu dài.")
+if store.storage:
+    st.caption(f"💡 Tip: Dữ liệu được lưu tự động vào `{store.storage.path}` và dùng chung cho mọi người đang mở ứng dụng.")
+elif SHARED:
+    st.caption("💡 Tip: Danh sách được dùng chung cho mọi người đang mở ứng dụng (lưu trong bộ nhớ của server).")
+else:
+    st.caption("💡 Tip: Dữ liệu được lưu tự động trong session. Đặt biến môi trường `TODO_DB_PATH` hoặc dùng tính năng Export/Import để lưu trữ lâu dài.")
 
+# Báo cáo thời gian xử lý (chỉ khi bật đo)
+if timer.enabled:
+    timing = timer.log(tasks=len(store), filtered=len(filtered_ids), version=store.version)
+    with st.expander(f"⏱️ Thời gian xử lý: {timing['total_ms']:.1f} ms"):
+        st.dataframe(
+            [
+                {"Giai đoạn": name, "Tổng (ms)": phase['ms'], "Số lần": phase['count'], "Lâu nhất (ms)": phase['max_ms']}
+                for name, phase in timing['phases'].items()
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
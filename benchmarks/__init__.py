@@ -0,0 +1 @@
+"""Benchmark cho todo_engine (xem benchmarks/run.py)"""
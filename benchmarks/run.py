@@ -0,0 +1,234 @@
+"""Đo thời gian các đường xử lý chính của todo_engine.
+
+    python -m benchmarks.run                          # 1k, 10k, 100k tasks
+    python -m benchmarks.run --sizes 1000 --sqlite -o before.json
+    python -m benchmarks.run -o after.json --compare before.json
+
+Kết quả được ghi ra file JSON; chỉ nên so sánh các file chạy trên cùng một máy.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from todo_engine import (
+    CATEGORIES, EXPORT_FORMATS, PRIORITY_COLORS, SORT_OPTIONS, STATUS_OPTIONS,
+    JournalTaskStorage, SQLiteTaskStorage, TaskEngine, TaskStore, due_range, read_changes, read_excel,
+    tasks_from_json
+)
+
+from .synthetic import generate_tasks
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Số thao tác cho mỗi phép đo từng task (thêm, sửa, di chuyển...)
+DEFAULT_OPS = 1000
+
+
+def measure(function: Callable, ops: int = 1, repeat: int = 1) -> Dict:
+    """Chạy function repeat lần, lấy lần nhanh nhất; ops là số thao tác trong một lần"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return {'seconds': best, 'ops': ops, 'us_per_op': best / ops * 1e6}
+
+
+def make_engine(tasks, db_dir: str = None, journal: bool = False) -> TaskEngine:
+    """Engine chứa bản sao của tasks; có db_dir thì dùng SQLite (hoặc journal) trong thư mục đó"""
+    tasks = [dict(t) for t in tasks]
+    if db_dir is None:
+        return TaskEngine(TaskStore(tasks))
+    path = os.path.join(db_dir, f"bench_{time.perf_counter_ns()}")
+    storage = JournalTaskStorage(path + ".journal") if journal else SQLiteTaskStorage(path + ".db")
+    storage.replace_all(TaskStore(tasks).tasks)
+    if journal:
+        storage.compact(wait=True)
+    return TaskEngine.from_storage(storage)
+
+
+def run_size(size: int, ops: int, repeat: int, seed: int, db_dir: str = None, excel: bool = True,
+             journal: bool = False) -> Dict:
+    """Mọi phép đo cho một kích thước danh sách"""
+    results = {}
+    rng = random.Random(seed)
+    tasks = generate_tasks(size, seed=seed)
+
+    results['load'] = measure(lambda: make_engine(tasks, db_dir, journal), ops=size, repeat=repeat)
+    engine = make_engine(tasks, db_dir, journal)
+    store = engine.store
+    since = store.last_changed
+
+    # Thao tác trên từng task
+    def add_tasks():
+        for i in range(ops):
+            engine.add_task(f"Việc mới {i}", rng.choice(list(PRIORITY_COLORS)), rng.choice(CATEGORIES))
+    results['add_task'] = measure(add_tasks, ops=ops)
+
+    ids = [t['id'] for t in store.tasks]
+    sample = [rng.choice(ids) for _ in range(ops)]
+
+    def update_tasks():
+        for task_id in sample:
+            engine.update_task(task_id, priority=rng.choice(list(PRIORITY_COLORS)), name=f"Đổi tên {task_id}")
+    results['update_task'] = measure(update_tasks, ops=ops)
+
+    def toggle_tasks():
+        for task_id in sample:
+            engine.toggle_task_completion(task_id)
+    results['toggle_task_completion'] = measure(toggle_tasks, ops=ops)
+
+    def lookup_tasks():
+        for task_id in sample:
+            store.get(task_id)
+            store.index_of(task_id)
+    results['lookup'] = measure(lookup_tasks, ops=ops, repeat=repeat)
+
+    moves = [(rng.randrange(len(store)), rng.randrange(len(store))) for _ in range(ops)]
+
+    def reorder():
+        for old_index, new_index in moves:
+            engine.reorder_tasks(old_index, new_index)
+    results['reorder_tasks'] = measure(reorder, ops=ops)
+
+    # Lịch sử chỉ giữ UNDO_LIMIT thao tác gần nhất: chỉ đo các lần thực sự hoàn tác / làm lại
+    steps = min(ops, engine.history.undo_entries.maxlen)
+
+    def undo_redo():
+        for _ in range(steps):
+            engine.undo()
+        for _ in range(steps):
+            engine.redo()
+    results['undo_redo'] = measure(undo_redo, ops=2 * steps)
+
+    # Xuất các thay đổi từ sau khi nạp rồi gộp vào một bản sao chưa đổi (chi phí theo số task đã đổi)
+    results['export_changes'] = measure(lambda: engine.export_changes(since), repeat=repeat)
+    changed, deleted, _ = read_changes(io.BytesIO(engine.export_changes(since)[1]))
+    replica = make_engine(tasks, db_dir, journal)
+    results['merge'] = measure(lambda: replica.merge(changed, deleted), ops=len(changed) + len(deleted))
+
+    # Lọc và sắp xếp (lấy toàn bộ danh sách id, không qua cache của giao diện)
+    filter_cases = {
+        'filter_none': ("Tất cả", "Tất cả", "Tất cả", ""),
+        'filter_status': (STATUS_OPTIONS[1], "Tất cả", "Tất cả", ""),
+        'filter_status_priority_category': (STATUS_OPTIONS[1], "Gấp", CATEGORIES[0], ""),
+        'filter_search': ("Tất cả", "Tất cả", "Tất cả", "bao cao"),
+        'filter_search_status': (STATUS_OPTIONS[2], "Tất cả", "Tất cả", "kiem"),
+    }
+    for name, args in filter_cases.items():
+        results[name] = measure(lambda: list(engine.filter_and_sort(*args, SORT_OPTIONS[0])), repeat=repeat)
+    for option in ("Quá hạn", "Trong tuần này"):
+        results[f"filter_due[{option}]"] = measure(
+            lambda: list(engine.filter_and_sort(due_range=due_range(option))), repeat=repeat
+        )
+    for option in SORT_OPTIONS:
+        results[f"sort[{option}]"] = measure(
+            lambda: list(engine.filter_and_sort(sort_option=option)), repeat=repeat
+        )
+    results['stats'] = measure(store.stats, repeat=repeat)
+
+    # Xuất và nhập file (gọi thẳng hàm xuất, không qua cache theo version của engine)
+    exported = {}
+    for fmt in EXPORT_FORMATS:
+        if fmt == "Excel" and not excel:
+            continue
+        results[f"export[{fmt}]"] = measure(
+            lambda: exported.__setitem__(fmt, EXPORT_FORMATS[fmt][2](store.tasks)), ops=len(store), repeat=repeat
+        )
+    if "Excel" in exported:
+        results['import[Excel]'] = measure(
+            lambda: read_excel(io.BytesIO(exported["Excel"]), 0), ops=len(store), repeat=repeat
+        )
+    results['import[JSON]'] = measure(
+        lambda: tasks_from_json(io.BytesIO(exported["JSON"])), ops=len(store), repeat=repeat
+    )
+    return results
+
+
+def environment() -> Dict:
+    """Thông tin máy và phiên bản mã để đối chiếu kết quả"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def compare(current: Dict, baseline: Dict):
+    """In tỷ lệ thời gian so với một file kết quả trước đó (>1 là chậm hơn)"""
+    print(f"\nSo với {baseline['environment'].get('commit')} ({baseline['environment']['timestamp']}):")
+    if baseline.get('config') != current['config']:
+        print(f"  Lưu ý: cấu hình khác nhau ({baseline.get('config')} / {current['config']})")
+    for size, benchmarks in current['results'].items():
+        old = baseline['results'].get(size, {})
+        for name, result in benchmarks.items():
+            if name in old and old[name]['seconds'] > 0:
+                ratio = result['seconds'] / old[name]['seconds']
+                flag = "  ⚠️" if ratio > 1.2 else ""
+                print(f"  {size:>7} {name:<40} {ratio:6.2f}x{flag}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Số thao tác cho phép đo từng task")
+    parser.add_argument("--repeat", type=int, default=3, help="Số lần lặp các phép đo chỉ đọc (lấy nhanh nhất)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sqlite", action="store_true", help="Đo với lưu trữ SQLite (file tạm)")
+    parser.add_argument("--journal", action="store_true", help="Đo với lưu trữ journal + snapshot (file tạm)")
+    parser.add_argument("--max-excel-size", type=int, default=100000,
+                        help="Bỏ qua xuất/nhập Excel với danh sách lớn hơn")
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="File kết quả cũ để so sánh")
+    args = parser.parse_args(argv)
+
+    report = {
+        'environment': environment(),
+        'config': {'ops': args.ops, 'repeat': args.repeat, 'seed': args.seed, 'sqlite': args.sqlite,
+                   'journal': args.journal},
+        'results': {}
+    }
+    with tempfile.TemporaryDirectory() as db_dir:
+        for size in args.sizes:
+            started = time.perf_counter()
+            results = run_size(size, args.ops, args.repeat, args.seed,
+                               db_dir if args.sqlite or args.journal else None, excel=size <= args.max_excel_size,
+                               journal=args.journal)
+            report['results'][str(size)] = results
+            print(f"{size} tasks ({time.perf_counter() - started:.1f} s)")
+            for name, result in results.items():
+                print(f"  {name:<40} {result['seconds'] * 1000:10.2f} ms  {result['us_per_op']:10.2f} µs/op")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Đã ghi kết quả vào {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(report, json.load(file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
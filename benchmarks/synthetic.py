@@ -0,0 +1,48 @@
+"""Sinh danh sách tasks giả lập cho benchmark"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from todo_engine import CATEGORIES, PRIORITY_COLORS
+
+# Tỷ lệ xuất hiện của từng mức độ ưu tiên / danh mục
+PRIORITY_WEIGHTS = dict(zip(PRIORITY_COLORS, [0.15, 0.3, 0.55]))
+CATEGORY_WEIGHTS = dict(zip(CATEGORIES, [0.45, 0.25, 0.2, 0.1]))
+
+# Tỷ lệ task đã hoàn thành và task không có ngày hết hạn
+COMPLETED_RATIO = 0.35
+NO_DUE_DATE_RATIO = 0.3
+
+VERBS = ["Viết", "Gửi", "Đọc", "Sửa", "Kiểm tra", "Chuẩn bị", "Họp", "Gọi", "Mua", "Ôn tập", "Dọn dẹp", "Lên kế hoạch"]
+OBJECTS = ["báo cáo", "email", "tài liệu", "hợp đồng", "bài tập", "slide", "ngân sách", "đơn hàng",
+           "lịch họp", "mã nguồn", "hóa đơn", "đề cương", "sách", "nhà cửa", "quà sinh nhật"]
+QUALIFIERS = ["tuần này", "cho khách hàng", "quý 3", "dự án A", "dự án B", "gấp", "cuối tháng", "", "", ""]
+
+
+def generate_tasks(count: int, seed: int = 0, today: date = None) -> List[Dict]:
+    """count task với id 0..count-1, cùng seed thì cùng kết quả.
+
+    Ngày hết hạn rải trong khoảng ±60 ngày quanh today, nên luôn có task quá
+    hạn, hết hạn hôm nay và trong tương lai.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    created = datetime.combine(today, datetime.min.time()) - timedelta(days=90)
+    priorities = rng.choices(list(PRIORITY_WEIGHTS), weights=list(PRIORITY_WEIGHTS.values()), k=count)
+    categories = rng.choices(list(CATEGORY_WEIGHTS), weights=list(CATEGORY_WEIGHTS.values()), k=count)
+    tasks = []
+    for task_id in range(count):
+        name = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}".strip()
+        due_date = None
+        if rng.random() >= NO_DUE_DATE_RATIO:
+            due_date = (today + timedelta(days=rng.randint(-60, 60))).isoformat()
+        tasks.append({
+            'id': task_id,
+            'name': f"{name} #{task_id}",
+            'completed': rng.random() < COMPLETED_RATIO,
+            'priority': priorities[task_id],
+            'category': categories[task_id],
+            'due_date': due_date,
+            'created_at': (created + timedelta(seconds=task_id * 37)).isoformat()
+        })
+    return tasks
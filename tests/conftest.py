@@ -0,0 +1,25 @@
+"""Fixture dùng chung cho các test của todo_engine"""
+from datetime import date, timedelta
+
+import pytest
+
+from todo_engine import CATEGORIES, PRIORITY_COLORS
+
+
+@pytest.fixture
+def sample_tasks():
+    """20 task id 0..19, một nửa có ngày hết hạn"""
+    today = date.today()
+    return [
+        {
+            'id': i,
+            'name': f"Việc {i}",
+            'completed': i % 3 == 0,
+            'priority': list(PRIORITY_COLORS)[i % len(PRIORITY_COLORS)],
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'due_date': (today + timedelta(days=i - 10)).isoformat() if i % 2 else None,
+            'created_at': '2026-01-01T00:00:00',
+            'order': None
+        }
+        for i in range(20)
+    ]
@@ -0,0 +1,36 @@
+"""Hàm dùng chung cho các test: đọc nội dung danh sách và sinh thao tác ghi ngẫu nhiên"""
+import random
+from datetime import date, timedelta
+
+from todo_engine import CATEGORIES, PRIORITY_COLORS
+
+
+def task_state(engine) -> list:
+    """Nội dung và thứ tự danh sách (không gồm mốc thời gian)"""
+    return [(t.id, t.name, t.completed, t.priority, t.category, t.due_date) for t in engine.store]
+
+
+def random_ops(engine, rng: random.Random, count: int, undo: bool = True):
+    """count thao tác ghi ngẫu nhiên (thêm/sửa/xóa/di chuyển, có cả hoàn tác / làm lại)"""
+    for _ in range(count):
+        ids = [t.id for t in engine.store]
+        op = rng.random()
+        if op < 0.25 or not ids:
+            due = rng.choice([None, date.today() + timedelta(days=rng.randint(-10, 10))])
+            engine.add_task(f"Việc {rng.random():.4f}", rng.choice(list(PRIORITY_COLORS)), rng.choice(CATEGORIES), due)
+        elif op < 0.4:
+            engine.update_task(rng.choice(ids), name=f"Sửa {rng.random():.4f}", completed=rng.random() < 0.5)
+        elif op < 0.5:
+            engine.delete_task(rng.choice(ids))
+        elif op < 0.6:
+            engine.bulk_delete(rng.sample(ids, min(3, len(ids))))
+        elif op < 0.7:
+            engine.move_task_to(rng.choice(ids), rng.randrange(len(ids)))
+        elif op < 0.8:
+            engine.bulk_move(rng.sample(ids, min(4, len(ids))), rng.randrange(len(ids)))
+        elif op < 0.86:
+            engine.bulk_update(rng.sample(ids, min(3, len(ids))), priority=rng.choice(list(PRIORITY_COLORS)))
+        elif undo and op < 0.94:
+            engine.undo()
+        elif undo:
+            engine.redo()
@@ -0,0 +1,100 @@
+"""Phân trang / tải thêm và bản diff của bảng sửa trực tiếp"""
+from datetime import date
+
+import pytest
+
+from todo_engine import TaskEngine, page_count, page_window, paging_state, table_changes, table_due_date
+
+
+@pytest.mark.parametrize("total, pages", [(0, 1), (1, 1), (20, 1), (21, 2), (100, 5)])
+def test_page_count(total, pages):
+    assert page_count(total, 20) == pages
+
+
+def test_page_window_clamps_the_last_page():
+    assert page_window(45, 20, page_number=1) == (0, 20)
+    assert page_window(45, 20, page_number=3) == (40, 45)
+    assert page_window(45, 20, visible_count=40) == (0, 40)
+    assert page_window(45, 20, visible_count=60) == (0, 45)
+
+
+def test_paging_state_defaults_and_clamps():
+    assert paging_state(45, 20) == (1, 20)
+    assert paging_state(45, 20, page_number=7, visible_count=60) == (3, 60)
+    assert paging_state(0, 20, page_number=3, visible_count=40) == (1, 40)
+
+
+def test_paging_state_reset_goes_back_to_the_first_page():
+    # Bộ lọc đổi: trang 3 / 60 task đang hiện không còn ý nghĩa với danh sách mới
+    assert paging_state(500, 20, page_number=3, visible_count=60, reset=True) == (1, 20)
+
+
+def test_paging_state_keeps_the_focused_task_visible():
+    assert paging_state(100, 20, page_number=1, visible_count=20, focus_index=45) == (3, 46)
+    assert paging_state(100, 20, page_number=4, visible_count=80, focus_index=5) == (1, 80)
+    # Task vừa di chuyển vẫn được giữ trong cửa sổ kể cả khi vừa đổi bộ lọc
+    assert paging_state(100, 20, page_number=4, visible_count=80, focus_index=30, reset=True) == (2, 31)
+    page_number, visible_count = paging_state(100, 20, focus_index=59)
+    start, end = page_window(100, 20, page_number=page_number)
+    assert start <= 59 < end
+    assert 59 < page_window(100, 20, visible_count=visible_count)[1]
+
+
+COLUMNS = {"Hoàn thành": 'completed', "Tên công việc": 'name', "Ngày hết hạn": 'due_date'}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-03-09", date(2024, 3, 9)),
+    (date(2024, 3, 9), date(2024, 3, 9)),
+    ("", None),
+    (None, None),
+    ("không phải ngày", None),
+    ("2024-W10-6", None),
+    ("20240309", None),
+])
+def test_table_due_date(value, expected):
+    assert table_due_date(value) == expected
+
+
+@pytest.fixture
+def table(sample_tasks):
+    sample_tasks[1]['due_date'] = "không phải ngày"
+    sample_tasks[3]['due_date'] = "2024-03-09"
+    sample_tasks[4]['due_date'] = "2024-03-10"
+    engine = TaskEngine()
+    engine.load(sample_tasks[:5])
+    return engine, engine.store.rows(range(5))
+
+
+def test_table_edits_become_field_changes(table):
+    engine, rows = table
+    edited = {
+        "0": {"Hoàn thành": not rows[0]['completed'], "Tên công việc": "Tên mới"},
+        "3": {"Ngày hết hạn": "2024-04-01"},
+        "4": {"Ngày hết hạn": None},
+    }
+    changes = table_changes(edited, rows, COLUMNS)
+    assert changes == {
+        0: {'completed': not rows[0]['completed'], 'name': "Tên mới"},
+        3: {'due_date': "2024-04-01"},
+        4: {'due_date': None},
+    }
+    assert engine.apply_changes(changes) == len(changes)
+    assert engine.store.get(0).name == "Tên mới"
+    assert engine.store.get(3).due_date == "2024-04-01"
+    assert engine.store.get(4).due_date is None
+
+
+def test_table_edits_keep_unchanged_and_unreadable_cells(table):
+    engine, rows = table
+    edited = {
+        # Sửa tên ở dòng có ngày hết hạn không đọc được: ô ngày (trống) không bị ghi lại
+        "1": {"Tên công việc": "Tên mới", "Ngày hết hạn": None},
+        # Giá trị giống hệt giá trị đang hiển thị, tên để trống, cột chỉ để xem
+        "2": {"Tên công việc": rows[2]['name'], "Hạn": "Quá hạn"},
+        "3": {"Ngày hết hạn": "2024-03-09", "Tên công việc": "  "},
+    }
+    changes = table_changes(edited, rows, COLUMNS)
+    assert changes == {1: {'name': "Tên mới"}}
+    engine.apply_changes(changes)
+    assert engine.store.get(1).due_date == "không phải ngày"
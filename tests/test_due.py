@@ -0,0 +1,85 @@
+"""Chỉ mục ngày hết hạn: khoảng lọc, đếm, nhãn theo nhóm ngày"""
+from datetime import date, timedelta
+
+import pytest
+
+from todo_engine import TaskEngine, due_label, due_range
+
+# Thứ Tư
+TODAY = date(2026, 10, 14)
+
+
+@pytest.fixture
+def engine(sample_tasks):
+    # Task lẻ hết hạn TODAY + (id - 10) ngày, task chẵn không có ngày hết hạn
+    for task in sample_tasks:
+        if task['due_date']:
+            task['due_date'] = (TODAY + timedelta(days=task['id'] - 10)).isoformat()
+    sample_tasks[2]['due_date'] = "không phải ngày"
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    return engine
+
+
+def expected_ids(engine, start: date = None, end: date = None) -> set:
+    return {
+        t.id for t in engine.store if t.due_date and t.id != 2
+        and (start is None or date.fromisoformat(t.due_date) >= start)
+        and (end is None or date.fromisoformat(t.due_date) <= end)
+    }
+
+
+def test_due_range_options():
+    today = TODAY.toordinal()
+    assert due_range("Tất cả", TODAY) is None
+    assert due_range("Quá hạn", TODAY) == (None, today - 1)
+    assert due_range("Hết hạn hôm nay", TODAY) == (today, today)
+    assert due_range("Trong tuần này", TODAY) == (today - 2, today + 4)
+    assert due_range("Khoảng ngày", TODAY) is None
+    assert due_range("Khoảng ngày", TODAY, end=TODAY) == (None, today)
+
+
+@pytest.mark.parametrize("option", ["Quá hạn", "Hết hạn hôm nay", "Trong tuần này"])
+def test_filter_by_due_range(engine, option):
+    start, end = due_range(option, TODAY)
+    expected = expected_ids(
+        engine,
+        date.fromordinal(start) if start else None,
+        date.fromordinal(end) if end else None
+    )
+    assert set(engine.filter_and_sort(due_range=(start, end))) == expected
+    assert engine.store.due_count(start, end) == len(expected)
+
+
+def test_due_range_combines_with_search_and_filters(engine):
+    week = due_range("Trong tuần này", TODAY)
+    ids = engine.filter_and_sort("Đang làm", search_query="viec", due_range=week, sort_option="Ngày hết hạn")
+    # Task 9 đã hoàn thành
+    assert list(ids) == [11, 13]
+
+
+def test_due_index_follows_updates(engine):
+    engine.update_task(0, due_date=TODAY)
+    engine.update_task(11, due_date=None)
+    engine.delete_task(9)
+    today = TODAY.toordinal()
+    assert engine.store.due_ids(today, today) == {0}
+    assert engine.store.due_ids(today - 1, today + 1) == {0}
+    engine.undo()
+    assert engine.store.due_ids(today - 1, today + 1) == {0, 9}
+
+
+def test_due_labels():
+    today = TODAY.toordinal()
+    assert due_label(today - 3, today) == ('overdue', "Quá hạn 3 ngày")
+    assert due_label(today, today) == ('today', "Hết hạn hôm nay")
+    assert due_label(today + 2, today) == ('upcoming', "Còn 2 ngày")
+
+
+def test_rows_and_stats_use_due_ordinals(engine):
+    _, rows = engine.rows([1, 2, 11])
+    assert [row['due'] for row in rows] == [TODAY.toordinal() - 9, None, TODAY.toordinal() + 1]
+    stats = engine.store.stats(TODAY)
+    pending = [t for t in engine.store if t.due_date and t.id != 2 and not t.completed]
+    assert stats['overdue'] == sum(date.fromisoformat(t.due_date) < TODAY for t in pending)
+    assert stats['due_today'] == 0
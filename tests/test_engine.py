@@ -0,0 +1,223 @@
+"""Bất biến của TaskStore sau các thao tác ngẫu nhiên, hoàn tác / làm lại và lịch sử theo session"""
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from todo_engine import SORT_OPTIONS, History, TaskEngine, TaskStore
+
+from helpers import random_ops, task_state
+
+
+def check_invariants(store: TaskStore):
+    tasks = list(store)
+    ids = [t.id for t in tasks]
+    assert len(set(ids)) == len(ids)
+    orders = [t.order for t in tasks]
+    assert all(a < b for a, b in zip(orders, orders[1:]))
+    for position, task in enumerate(tasks):
+        assert store.get(task.id) is task
+        assert store.index_of(task.id) == position
+        assert task.id in store
+        due = date.fromisoformat(task.due_date).toordinal() if task.due_date else None
+        assert store.due_ordinal(task.id) == due
+    for option in SORT_OPTIONS:
+        assert sorted(store.sorted_ids(option)) == sorted(ids)
+        assert list(store.sorted_ids(option)) == store.sort_ids(ids, option)
+    table = Counter()
+    for task in tasks:
+        table[task.category, task.priority, 'total'] += 1
+        table[task.category, task.priority, 'done'] += task.completed
+    assert store.count_table() == {
+        (category, priority): (table[category, priority, 'done'], n)
+        for (category, priority, kind), n in table.items() if kind == 'total'
+    }
+    stats = store.stats()
+    assert stats['total'] == len(tasks)
+    assert stats['completed'] == sum(t.completed for t in tasks)
+    for task_id in ids:
+        assert store.deleted_at(task_id) is None
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_random_operations_keep_indexes_consistent(seed, sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    rng = random.Random(seed)
+    for _ in range(10):
+        random_ops(engine, rng, 15)
+        check_invariants(engine.store)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_undo_all_then_redo_all_restores_each_state(seed, sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    initial = task_state(engine)
+    random_ops(engine, random.Random(seed), 60, undo=False)
+    final = task_state(engine)
+    while engine.undo() is not None:
+        check_invariants(engine.store)
+    assert task_state(engine) == []
+    engine.redo()
+    assert task_state(engine) == initial
+    while engine.redo() is not None:
+        pass
+    assert task_state(engine) == final
+    check_invariants(engine.store)
+
+
+def test_duplicate_ids_are_rejected_without_changing_the_store(sample_tasks):
+    store = TaskStore(sample_tasks)
+    with pytest.raises(ValueError):
+        store.load([{'id': 1, 'name': "a"}, {'id': 1, 'name': "b"}])
+    assert [t.id for t in store] == list(range(20))
+    check_invariants(store)
+
+
+def test_next_id_skips_tombstoned_ids(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    engine.delete_task(19)
+    engine.load(sample_tasks[:5])
+    assert engine.next_id == 20
+    assert engine.add_task("Mới", "Bình thường", "Khác").id == 20
+
+
+def test_history_is_kept_per_session(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    mine, theirs = History(), History()
+    engine.update_task(0, name="Của tôi", history=mine)
+    engine.load(sample_tasks[:3], history=theirs)
+    assert mine.undo_label is not None and theirs.undo_label.startswith("Thay danh sách")
+    after_import = task_state(engine)
+    # Hoàn tác của session này không đụng tới lần nhập của session kia
+    engine.undo(history=mine)
+    assert task_state(engine) == after_import
+    assert mine.redo_label is not None and theirs.redo_label is None
+    engine.undo(history=theirs)
+    assert [t.id for t in engine.store] == list(range(20))
+
+
+def test_stats_counters_per_bucket():
+    today = date(2026, 10, 14)
+    engine = TaskEngine()
+    a = engine.add_task("A", "Gấp", "Công việc", date(2026, 10, 13)).id
+    b = engine.add_task("B", "Gấp", "Công việc", today).id
+    c = engine.add_task("C", "Bình thường", "Cá nhân", today).id
+    d = engine.add_task("D", "Quan trọng", "Học tập").id
+    store = engine.store
+
+    def counts():
+        stats = store.stats(today)
+        return store.count_table(), (stats['completed'], stats['pending'], stats['overdue'], stats['due_today'])
+
+    assert counts() == (
+        {("Công việc", "Gấp"): (0, 2), ("Cá nhân", "Bình thường"): (0, 1), ("Học tập", "Quan trọng"): (0, 1)},
+        (0, 4, 1, 2)
+    )
+    # Task đã hoàn thành không còn quá hạn / hết hạn hôm nay
+    engine.toggle_task_completion(a)
+    engine.update_task(b, priority="Quan trọng")
+    assert counts() == (
+        {("Công việc", "Gấp"): (1, 1), ("Công việc", "Quan trọng"): (0, 1), ("Cá nhân", "Bình thường"): (0, 1),
+         ("Học tập", "Quan trọng"): (0, 1)},
+        (1, 3, 0, 2)
+    )
+    assert store.count(priority="Quan trọng") == 2 and store.count(category="Công việc", completed=False) == 1
+    engine.bulk_update([c, d], category="Khác", due_date=date(2026, 10, 1).isoformat())
+    engine.bulk_set_completed([b, d], True)
+    assert counts() == (
+        {("Công việc", "Gấp"): (1, 1), ("Công việc", "Quan trọng"): (1, 1), ("Khác", "Bình thường"): (0, 1),
+         ("Khác", "Quan trọng"): (1, 1)},
+        (3, 1, 1, 0)
+    )
+    engine.bulk_delete([a, c])
+    assert counts() == ({("Công việc", "Quan trọng"): (1, 1), ("Khác", "Quan trọng"): (1, 1)}, (2, 0, 0, 0))
+    # Hoàn tác trả bộ đếm về đúng từng bước
+    engine.undo()
+    engine.undo()
+    engine.undo()
+    assert counts()[1] == (1, 3, 0, 2)
+    assert store.count() == len(store) == 4
+
+def test_summary_and_rows_are_snapshots(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    version, (stats, table) = engine.summary()
+    assert version == engine.version and stats['total'] == 20
+    assert sum(total for _, total in table.values()) == 20
+    _, rows = engine.rows([3, 99, 1])
+    assert [(row['id'], row['index']) for row in rows] == [(3, 3), (1, 1)]
+    rows[0]['name'] = "Đổi bản sao"
+    assert engine.store.get(3).name == "Việc 3"
+
+
+def test_undo_move_after_another_session_deletes(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks[:6])
+    mine, theirs = History(), History()
+    engine.move_task_down(3, history=mine)
+    engine.delete_task(0, history=theirs)
+    assert [t.id for t in engine.store] == [1, 2, 4, 3, 5]
+    # Vị trí cũ đã lệch một ô; hoàn tác vẫn đưa đúng task 3 về trước task 4
+    assert engine.undo(history=mine) is not None
+    assert [t.id for t in engine.store] == [1, 2, 3, 4, 5]
+    engine.redo(history=mine)
+    assert [t.id for t in engine.store] == [1, 2, 4, 3, 5]
+    engine.delete_task(3, history=theirs)
+    assert engine.undo(history=mine) is not None
+    assert [t.id for t in engine.store] == [1, 2, 4, 5]
+    check_invariants(engine.store)
+
+
+def test_undo_bulk_move_after_another_session_edits(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks[:8])
+    mine, theirs = History(), History()
+    engine.bulk_move([1, 5, 6], 0, history=mine)
+    assert [t.id for t in engine.store] == [1, 5, 6, 0, 2, 3, 4, 7]
+    engine.bulk_delete([0, 5], history=theirs)
+    engine.add_task("Mới", "Bình thường", "Khác", history=theirs)
+    engine.undo(history=mine)
+    # Task 5 đã bị session kia xóa thì không quay lại; các task khác về chỗ cũ
+    assert [t.id for t in engine.store] == [1, 2, 3, 4, 6, 7, 8]
+    check_invariants(engine.store)
+
+
+def test_insert_existing_id_is_rejected_without_changing_the_store(sample_tasks):
+    store = TaskStore(sample_tasks)
+    version = store.version
+    with pytest.raises(ValueError):
+        store.insert({'id': 3, 'name': "Trùng"}, 0)
+    with pytest.raises(ValueError):
+        store.insert_ordered({'id': 3, 'name': "Trùng", 'order': store.get(5).order})
+    assert store.version == version and store.get(3).name == "Việc 3"
+    check_invariants(store)
+
+
+def test_undo_delete_after_another_session_reuses_the_id(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks[:5])
+    mine, theirs = History(), History()
+    engine.delete_task(1, history=mine)
+    engine.load([dict(sample_tasks[1], name="Đã nhập")], history=theirs)
+    assert engine.undo(history=mine) is not None
+    assert [(t.id, t.name) for t in engine.store] == [(1, "Đã nhập")]
+    check_invariants(engine.store)
+
+
+@pytest.mark.parametrize("fields", [{'order': -99999}, {'id': 99}, {'name': "Mới", 'order': 5}])
+def test_id_and_order_cannot_be_updated_as_fields(fields, sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    version = engine.version
+    with pytest.raises(ValueError):
+        engine.update_task(1, **fields)
+    with pytest.raises(ValueError):
+        engine.bulk_update([1, 2], **fields)
+    assert engine.version == version and engine.undo_label.startswith("Thay danh sách")
+    assert engine.store.get(1).name == "Việc 1"
+    check_invariants(engine.store)
@@ -0,0 +1,53 @@
+"""File xuất: JSON giống json.dumps, CSV có BOM, file thay đổi đọc lại được, tiến độ và cache theo version"""
+import csv
+import io
+import json
+
+import pytest
+
+from todo_engine import EXPORT_COLUMNS, TaskEngine, export_changes, export_csv, export_json, read_changes
+
+
+@pytest.fixture
+def engine(sample_tasks):
+    engine = TaskEngine()
+    engine.load(sample_tasks)
+    return engine
+
+
+def test_json_matches_json_dumps(engine):
+    expected = json.dumps([t.to_dict() for t in engine.store], ensure_ascii=False, indent=2)
+    assert export_json(engine.store.tasks).decode('utf-8') == expected
+    progress = []
+    assert export_json(engine.store.tasks, progress=progress.append).decode('utf-8') == expected
+    assert progress[0] == 0.0 and progress[-1] == 1.0 and progress == sorted(progress)
+
+
+def test_csv_has_bom_header_and_one_row_per_task(engine):
+    data = export_csv(engine.store.tasks)
+    assert data.startswith(b'\xef\xbb\xbf')
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [int(row[0]) for row in rows[1:]] == list(range(20))
+    task = engine.store.get(1)
+    assert rows[2] == ['1', task.name, 'Không', task.priority, task.category, task.due_date, '2026-01-01']
+
+
+def test_changes_round_trip(engine):
+    since = engine.store.last_changed
+    engine.update_task(3, name="Đã sửa")
+    engine.delete_task(4)
+    until, data = engine.export_changes(since)
+    tasks, deleted, report = read_changes(io.BytesIO(data))
+    assert [(t['id'], t['name']) for t in tasks] == [(3, "Đã sửa")]
+    assert [task_id for task_id, _ in deleted] == [4]
+    assert report['rejected'] == {}
+    header = json.loads(export_changes([], [], since, until))
+    assert (header['since'], header['until']) == (since, until)
+
+
+def test_export_is_cached_until_the_data_changes(engine):
+    first = engine.export("JSON")
+    assert engine.export("JSON") is first
+    engine.update_task(0, name="Đổi")
+    assert engine.export("JSON") is not first
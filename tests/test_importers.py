@@ -0,0 +1,99 @@
+"""Nhập Excel (ID trùng nhận id mới) và JSON/NDJSON (đọc theo khối, bản ghi hỏng bị bỏ qua)"""
+import io
+import json
+
+import pytest
+
+from todo_engine import TaskEngine, tasks_from_excel, tasks_from_json, validate_task_record
+from todo_engine.importers import iter_json_records
+
+
+def json_lines(records) -> bytes:
+    return "\n".join(json.dumps(r, ensure_ascii=False) for r in records).encode()
+
+
+def excel_file(df) -> io.BytesIO:
+    pytest.importorskip("openpyxl")
+    file = io.BytesIO()
+    df.to_excel(file, index=False)
+    file.seek(0)
+    return file
+
+
+def test_duplicate_and_colliding_ids_get_fresh_ids():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({'ID': [1, None, 3, 3], 'Tên công việc': ["a", "b", "c", "d"]})
+    tasks, report = tasks_from_excel(df, id_start=0)
+    assert [(t['id'], t['name']) for t in tasks] == [(1, "a"), (4, "b"), (3, "c"), (5, "d")]
+    assert report['defaulted'] == {'ID bị trùng': 2}
+
+
+def test_import_excel_with_duplicate_ids():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({'ID': [7, 7, None], 'Tên công việc': ["a", "b", "c"], 'Mức độ ưu tiên': ["Gấp"] * 3})
+    engine = TaskEngine()
+    count, report = engine.import_file(excel_file(df), "tasks.xlsx")
+    ids = [t.id for t in engine.store]
+    assert count == 3 and len(set(ids)) == 3
+    assert engine.store.get(7).name == "a"
+    assert report['defaulted']['ID bị trùng'] == 1
+    assert engine.next_id == max(ids) + 1
+
+
+def test_torn_ndjson_line_is_rejected(sample_tasks):
+    lines = json_lines(sample_tasks).split(b"\n")
+    lines[4] = lines[4][:30]
+    tasks, report = tasks_from_json(io.BytesIO(b"\n".join(lines)))
+    assert [t['id'] for t in tasks] == [i for i in range(20) if i != 4]
+    assert report['rejected'] == {"Dòng JSON không hợp lệ": 1}
+
+
+def test_malformed_json_array_fails_fast():
+    records = [{'id': i, 'name': "x" * 50, 'priority': "Gấp", 'category': "Khác"} for i in range(20000)]
+    data = json.dumps(records).encode()
+    file = io.BytesIO(data.replace(b"}, {", b"}} {", 1))
+    with pytest.raises(json.JSONDecodeError):
+        tasks_from_json(file)
+    # Lỗi ở đầu file: không phải đọc (và chép lại) phần còn lại của file
+    assert file.tell() < len(data) // 10
+
+
+@pytest.mark.parametrize("data", ['[{"id": 1}{"id": 2}]', '[1 2]', '[{"id": 1},]', '[,{"id": 1}]', '[1,,2]'])
+def test_json_array_needs_one_comma_between_elements(data):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_records(io.BytesIO(data.encode()), 3))
+
+
+@pytest.mark.parametrize("data", ['[]', '[ ]', ' [ {"id": 1} , {"id": 2} ] '])
+def test_json_array_separators(data):
+    assert list(iter_json_records(io.BytesIO(data.encode()), 3)) == json.loads(data)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_records_split_across_chunks(chunk_size, sample_tasks):
+    records = [dict(t, name=f"Việc “{t['id']}” \\ true") for t in sample_tasks]
+    for data in (json.dumps(records, ensure_ascii=False).encode(), json_lines(records)):
+        assert list(iter_json_records(io.BytesIO(data), chunk_size)) == records
+
+
+def test_invalid_records_are_counted(sample_tasks):
+    records = sample_tasks[:3] + [
+        dict(sample_tasks[0], name="Trùng"),
+        {'id': 90, 'name': "Sai mức", 'priority': "?", 'category': "Khác"},
+        {'id': 91, 'name': "Sai ngày", 'priority': "Gấp", 'category': "Khác", 'due_date': "31/12"},
+        [1, 2],
+    ]
+    tasks, report = tasks_from_json(io.BytesIO(json_lines(records)))
+    assert [t['id'] for t in tasks] == [0, 1, 2]
+    assert report['max_id'] == 2
+    assert report['rejected'] == {
+        "ID bị trùng": 1, "Mức độ ưu tiên không hợp lệ": 1, "Ngày hết hạn không hợp lệ": 1, "Không phải object": 1
+    }
+
+
+@pytest.mark.parametrize("order, kept", [(5, True), (-3, True), (True, False), (False, False), (1.5, False)])
+def test_order_must_be_a_plain_integer(order, kept):
+    record = {'id': 1, 'name': "a", 'priority': "Gấp", 'category': "Khác", 'order': order}
+    task, reason = validate_task_record(record)
+    assert reason is None
+    assert ('order' in task) == kept
@@ -0,0 +1,53 @@
+"""Job nền: kết quả quyết định bởi việc đã chạy xong hay dừng ở JobCancelled, không bởi nút hủy"""
+import io
+import json
+import threading
+
+import pytest
+
+from todo_engine import TaskEngine
+from todo_engine.jobs import JobCancelled, JobRunner
+
+
+@pytest.fixture
+def runner():
+    return JobRunner(workers=1)
+
+
+def test_cancel_before_the_last_progress_check_stops_the_job(runner):
+    started, go_on = threading.Event(), threading.Event()
+
+    def work(progress):
+        started.set()
+        go_on.wait()
+        progress(1.0)
+        return "xong"
+
+    job = runner.submit("Việc", work)
+    started.wait()
+    job.cancel()
+    go_on.set()
+    with pytest.raises(JobCancelled):
+        job.result()
+    assert job.cancel_requested and job.cancelled and job.error is None
+
+
+def test_cancel_after_the_last_progress_check_keeps_the_result(runner, sample_tasks):
+    engine = TaskEngine(runner=runner)
+    loading, go_on = threading.Event(), threading.Event()
+    load = engine.load
+
+    def slow_load(tasks, **kwargs):
+        loading.set()
+        go_on.wait()
+        return load(tasks, **kwargs)
+
+    engine.load = slow_load
+    job = engine.submit_import(io.BytesIO(json.dumps(sample_tasks).encode()), "tasks.json")
+    loading.wait()
+    job.cancel()
+    go_on.set()
+    assert job.result()[0] == 20
+    # Đã bấm hủy nhưng danh sách đã bị thay, nên job không được coi là đã hủy
+    assert job.cancel_requested and not job.cancelled
+    assert len(engine.store) == 20
@@ -0,0 +1,116 @@
+"""Gộp thay đổi theo id: bản ghi và tombstone cùng id, file thay đổi nối nhau, hoàn tác"""
+import io
+import json
+import random
+
+import pytest
+
+from todo_engine import TaskEngine, read_changes
+
+from helpers import random_ops, task_state
+
+
+def engine_with(tasks) -> TaskEngine:
+    engine = TaskEngine()
+    engine.load(tasks)
+    return engine
+
+
+@pytest.mark.parametrize("task_stamp, deleted_at, removed", [
+    ("2026-05-01T00:00:00", "2026-06-01T00:00:00", True),
+    ("2026-06-01T00:00:00", "2026-05-01T00:00:00", False),
+])
+def test_update_and_tombstone_for_same_id(task_stamp, deleted_at, removed, sample_tasks):
+    engine = engine_with(sample_tasks)
+    # Bản trong danh sách cũ hơn cả hai thay đổi gửi tới
+    engine.store.get(1).updated_at = "2026-01-01T00:00:00"
+    before = task_state(engine)
+    count = engine.merge([dict(sample_tasks[1], name="Đã sửa", updated_at=task_stamp)], [(1, deleted_at)])
+    assert count == 1
+    if removed:
+        assert 1 not in engine.store and engine.store.deleted_at(1) == deleted_at
+    else:
+        assert engine.store.get(1).name == "Đã sửa"
+    engine.undo()
+    assert task_state(engine) == before
+
+
+def test_concatenated_change_files_keep_newest_record(sample_tasks):
+    source = engine_with(sample_tasks)
+    target = engine_with(sample_tasks)
+    since = source.store.last_changed
+    source.update_task(2, name="Đã sửa")
+    _, updated = source.export_changes(since)
+    source.delete_task(2)
+    _, deleted = source.export_changes(since)
+
+    tasks, tombstones, report = read_changes(io.BytesIO(updated + b"\n" + deleted))
+    assert [t['id'] for t in tasks] == [] and [i for i, _ in tombstones] == [2]
+    assert report['rejected'] == {"Có bản mới hơn cùng ID": 1}
+    assert target.merge(tasks, tombstones) == 1
+    assert 2 not in target.store
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sync_two_engines(seed, sample_tasks):
+    rng = random.Random(seed)
+    a, b = engine_with(sample_tasks), TaskEngine()
+    since_a, since_b = None, b.store.last_changed
+    for _ in range(5):
+        random_ops(a, rng, 15)
+        since_a, data = a.export_changes(since_a)
+        b.merge(*read_changes(io.BytesIO(data))[:2])
+        assert task_state(b) == task_state(a)
+        random_ops(b, rng, 15)
+        since_b, data = b.export_changes(since_b)
+        a.merge(*read_changes(io.BytesIO(data))[:2])
+        assert task_state(a) == task_state(b)
+
+
+def test_tasks_added_on_both_sides_keep_distinct_ids(sample_tasks):
+    a, b = engine_with(sample_tasks), engine_with(sample_tasks)
+    since_a = since_b = a.store.last_changed
+    a.add_task("Việc của A", "Gấp", "Công việc")
+    b.add_task("Việc của B", "Bình thường", "Cá nhân")
+    b.add_task("Việc thứ hai của B", "Bình thường", "Cá nhân")
+    since_a, from_a = a.export_changes(since_a)
+    since_b, from_b = b.export_changes(since_b)
+    a.merge(*read_changes(io.BytesIO(from_a + b"\n" + from_b))[:2])
+    b.merge(*read_changes(io.BytesIO(from_a))[:2])
+    # Task tạo trước giữ id 20, hai task còn lại nhận cùng id mới ở cả hai bên
+    assert task_state(a) == task_state(b)
+    assert {(t.id, t.name) for t in a.store if t.id >= 20} == {
+        (20, "Việc của A"), (21, "Việc thứ hai của B"), (22, "Việc của B")
+    }
+    assert a.next_id == b.next_id == 23
+    # Lần đồng bộ sau chỉ mang thay đổi id của B sang, không sinh thêm bản sao
+    _, from_b = b.export_changes(since_b)
+    a.merge(*read_changes(io.BytesIO(from_b))[:2])
+    assert task_state(a) == task_state(b) and len(a.store) == 23
+    b.undo()
+    assert {t.name for t in b.store if t.id >= 20} == {"Việc của B", "Việc thứ hai của B"}
+
+
+def test_merging_the_same_file_twice_is_a_no_op():
+    records = [{'id': i, 'name': f"Việc {i}", 'priority': "Gấp", 'category': "Khác"} for i in range(3)]
+    data = "\n".join(json.dumps(r, ensure_ascii=False) for r in records).encode()
+    engine = TaskEngine()
+    assert engine.merge_file(io.BytesIO(data), "tasks.jsonl")[0] == 3
+    before = task_state(engine)
+    assert engine.merge_file(io.BytesIO(data), "tasks.jsonl")[0] == 0
+    assert task_state(engine) == before
+    assert [t.created_at for t in engine.store] == [None] * 3
+
+
+def test_update_with_unknown_field_keeps_the_task_in_delta_exports(sample_tasks):
+    engine = engine_with(sample_tasks)
+    since = engine.store.last_changed
+    with pytest.raises(KeyError):
+        engine.store.update(3, name="Đã sửa", colour="đỏ")
+    with pytest.raises(KeyError):
+        engine.store.update_many([3, 4], colour="đỏ")
+    assert engine.store.get(3).name == "Việc 3"
+    engine.update_task(3, name="Đã sửa")
+    _, tasks, _ = engine.changes_since(since)
+    assert [t['id'] for t in tasks] == [3]
+    assert len(engine.changes_since(None)[1]) == 20
@@ -0,0 +1,67 @@
+"""Tìm kiếm theo tiền tố từ, không phân biệt hoa thường và dấu tiếng Việt"""
+import pytest
+
+from todo_engine import SearchIndex, TaskEngine, fold_text, tokenize
+
+NAMES = {
+    1: "Báo cáo tháng Mười",
+    2: "Đi chợ mua rau",
+    3: "Họp với đối tác",
+    4: "Bảo dưỡng xe",
+    5: "báo giá C++ / C#",
+}
+
+
+@pytest.fixture
+def engine():
+    engine = TaskEngine()
+    engine.load([{'id': i, 'name': name} for i, name in NAMES.items()])
+    return engine
+
+
+def test_fold_text_and_tokenize():
+    assert fold_text("Đường Ống GẤP") == "duong ong gap"
+    assert tokenize("Họp — với   ĐỐI-tác!") == ["hop", "voi", "doi", "tac"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("bao", {1, 4, 5}),
+    ("báo", {1, 4, 5}),
+    ("BAO CAO", {1}),
+    ("cao bao", {1}),
+    ("đi", {2}),
+    ("di cho", {2}),
+    ("doi tac", {3}),
+    ("tha", {1}),
+    ("muoi", {1}),
+    ("xe bao", {4}),
+    ("xyz", set()),
+    ("bao xyz", set()),
+])
+def test_prefix_search_ignores_case_and_diacritics(engine, query, expected):
+    assert engine.store.search(query) == expected
+
+
+def test_query_without_words_matches_substring(engine):
+    assert engine.store.search("++") == {5}
+
+
+def test_index_follows_renames_and_deletes(engine):
+    engine.update_task(2, name="Đi siêu thị")
+    engine.delete_task(4)
+    assert engine.store.search("cho") == set()
+    assert engine.store.search("sieu") == {2}
+    assert engine.store.search("bao") == {1, 5}
+    engine.undo()
+    assert engine.store.search("bao") == {1, 4, 5}
+
+
+def test_rebuild_matches_incremental_updates():
+    incremental, rebuilt = SearchIndex(), SearchIndex()
+    for task_id, name in NAMES.items():
+        incremental.add(task_id, name)
+    incremental.update(3, "Họp nhóm")
+    incremental.remove(5)
+    rebuilt.rebuild([{'id': i, 'name': n} for i, n in {**NAMES, 3: "Họp nhóm"}.items() if i != 5])
+    for query in ("bao", "hop", "nhom", "doi", "gia", "di"):
+        assert incremental.search(query) == rebuilt.search(query)
@@ -0,0 +1,97 @@
+"""Ghi xuống SQLite / journal rồi mở lại phải được đúng danh sách, mốc thay đổi và tombstone"""
+import random
+
+import pytest
+
+from todo_engine import (
+    CATEGORIES, PRIORITY_COLORS, SORT_OPTIONS, STATUS_OPTIONS, History, JournalTaskStorage, SQLiteTaskStorage,
+    TaskEngine
+)
+
+from helpers import random_ops
+
+STORAGES = {
+    'sqlite': lambda path: SQLiteTaskStorage(str(path / "tasks.db")),
+    # compact_every nhỏ để lần chạy nào cũng gộp journal vài lần
+    'journal': lambda path: JournalTaskStorage(str(path / "tasks.journal"), compact_every=7),
+}
+
+
+def stored_state(engine) -> tuple:
+    store = engine.store
+    _, _, tombstones = store.changes_since(None)
+    return (
+        [t.to_dict() for t in store],
+        sorted(tombstones),
+        engine.next_id
+    )
+
+
+@pytest.mark.parametrize("kind", STORAGES)
+@pytest.mark.parametrize("seed", range(4))
+def test_reload_round_trip(kind, seed, tmp_path, sample_tasks):
+    open_storage = STORAGES[kind]
+    engine = TaskEngine.from_storage(open_storage(tmp_path))
+    engine.load(sample_tasks)
+    random_ops(engine, random.Random(seed), 80)
+    expected = stored_state(engine)
+    engine.store.storage.close()
+
+    reopened = TaskEngine.from_storage(open_storage(tmp_path))
+    assert stored_state(reopened) == expected
+    reopened.store.storage.close()
+
+
+@pytest.mark.parametrize("kind", STORAGES)
+def test_deleted_ids_are_not_reused_after_reload(kind, tmp_path):
+    open_storage = STORAGES[kind]
+    engine = TaskEngine.from_storage(open_storage(tmp_path))
+    for name in ("a", "b", "c"):
+        engine.add_task(name, "Bình thường", "Khác")
+    engine.delete_task(2)
+    engine.store.storage.close()
+
+    reopened = TaskEngine.from_storage(open_storage(tmp_path))
+    assert reopened.next_id == 3
+    assert reopened.store.deleted_at(2) is not None
+    assert reopened.add_task("d", "Bình thường", "Khác").id == 3
+    assert reopened.store.deleted_at(2) is not None
+    reopened.store.storage.close()
+
+
+@pytest.mark.parametrize("kind", STORAGES)
+def test_undo_does_not_insert_an_id_that_exists_again(kind, tmp_path, sample_tasks):
+    open_storage = STORAGES[kind]
+    engine = TaskEngine.from_storage(open_storage(tmp_path))
+    engine.load(sample_tasks[:5])
+    mine, theirs = History(), History()
+    engine.bulk_delete([1, 2], history=mine)
+    engine.load([dict(sample_tasks[1], name="Đã nhập")], history=theirs)
+    engine.undo(history=mine)
+    expected = stored_state(engine)
+    assert [(t['id'], t['name']) for t in expected[0]] == [(1, "Đã nhập"), (2, "Việc 2")]
+    engine.store.storage.close()
+
+    reopened = TaskEngine.from_storage(open_storage(tmp_path))
+    assert stored_state(reopened) == expected
+    reopened.store.storage.close()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sql_filter_and_sort_matches_memory(seed, tmp_path, sample_tasks):
+    rng = random.Random(seed)
+    sql = TaskEngine.from_storage(STORAGES['sqlite'](tmp_path))
+    memory = TaskEngine()
+    for engine in (sql, memory):
+        engine.load(sample_tasks)
+        random_ops(engine, random.Random(seed), 60)
+    assert [t.to_dict() for t in sql.store] == [
+        dict(t.to_dict(), created_at=s.created_at, updated_at=s.updated_at) for t, s in zip(memory.store, sql.store)
+    ]
+    for _ in range(40):
+        args = (
+            rng.choice(STATUS_OPTIONS), rng.choice(["Tất cả"] + list(PRIORITY_COLORS)),
+            rng.choice(["Tất cả"] + CATEGORIES), rng.choice(["", "viec", "sua 0", "#"]), rng.choice(SORT_OPTIONS)
+        )
+        assert list(sql.filter_and_sort(*args)) == list(memory.filter_and_sort(*args)), args
+    sql.store.storage.close()
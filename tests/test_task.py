@@ -0,0 +1,26 @@
+"""Task: đọc/ghi như dict, chuyển qua lại dict không mất dữ liệu"""
+import pytest
+
+from todo_engine import Task
+
+
+@pytest.mark.parametrize("due_date, ordinal", [
+    ("2024-01-01", True),
+    ("2024-W01-1", False),
+    ("20240101", False),
+    ("2024-01-01T08:30:00", False),
+    ("không rõ", False),
+    ("", False),
+    (None, False),
+])
+def test_due_date_round_trip(due_date, ordinal):
+    data = {
+        'id': 1, 'name': "Việc", 'completed': False, 'priority': "Gấp", 'category': "Khác",
+        'due_date': due_date, 'created_at': None, 'order': 0, 'updated_at': None
+    }
+    task = Task.from_dict(data)
+    assert task.to_dict() == data
+    assert (task.due_ordinal is not None) == ordinal
+    assert task.copy().due_date == due_date
+    task['due_date'] = due_date
+    assert task['due_date'] == due_date
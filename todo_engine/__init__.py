@@ -0,0 +1,53 @@
+"""Lõi xử lý danh sách công việc, dùng được mà không cần Streamlit.
+
+Ví dụ::
+
+    from todo_engine import TaskEngine
+
+    engine = TaskEngine()
+    engine.add_task("Viết báo cáo", "Gấp", "Công việc")
+    engine.filter_and_sort(sort_option="Mức độ ưu tiên")
+
+pandas, numpy và openpyxl chỉ được import khi nhập/xuất file Excel.
+"""
+from .constants import (
+    CATEGORIES, DUE_FILTER_OPTIONS, NO_DUE_DATE, ORDER_GAP, PRIORITY_COLORS, PRIORITY_COLORS_HEX,
+    PRIORITY_ORDER, SORT_OPTIONS, STATUS_OPTIONS, TASK_COLUMNS
+)
+from .display import page_count, page_window, paging_state, table_changes, table_due_date
+from .due import due_label, due_range
+from .engine import History, TaskEngine, task_fields
+from .exporters import (
+    EXPORT_COLUMNS, EXPORT_FORMATS, export_changes, export_csv, export_excel, export_json,
+    export_parquet, export_row
+)
+from .importers import (
+    IMPORT_FORMATS, format_import_report, iter_json_records, read_changes, read_excel,
+    tasks_from_excel, tasks_from_json, validate_task_record
+)
+from .jobs import Job, JobCancelled, JobRunner, default_runner, tracked
+from .journal import COMPACT_EVERY, JournalTaskStorage, apply_entry, read_entries
+from .profiling import NULL_TIMER, PhaseTimer, configure_logging
+from .search import SearchIndex, fold_text, tokenize
+from .storage import SQLiteTaskStorage
+from .store import SortedIdView, TaskStore, changed_at, parse_sort_keys
+from .task import Task
+
+__all__ = [
+    'CATEGORIES', 'DUE_FILTER_OPTIONS', 'NO_DUE_DATE', 'ORDER_GAP', 'PRIORITY_COLORS', 'PRIORITY_COLORS_HEX',
+    'PRIORITY_ORDER', 'SORT_OPTIONS', 'STATUS_OPTIONS', 'TASK_COLUMNS',
+    'page_count', 'page_window', 'paging_state', 'table_changes', 'table_due_date',
+    'due_label', 'due_range',
+    'History', 'TaskEngine', 'task_fields',
+    'EXPORT_COLUMNS', 'EXPORT_FORMATS', 'export_changes', 'export_csv', 'export_excel', 'export_json',
+    'export_parquet', 'export_row',
+    'IMPORT_FORMATS', 'format_import_report', 'iter_json_records', 'read_changes', 'read_excel',
+    'tasks_from_excel', 'tasks_from_json', 'validate_task_record',
+    'Job', 'JobCancelled', 'JobRunner', 'default_runner', 'tracked',
+    'COMPACT_EVERY', 'JournalTaskStorage', 'apply_entry', 'read_entries',
+    'NULL_TIMER', 'PhaseTimer', 'configure_logging',
+    'SearchIndex', 'fold_text', 'tokenize',
+    'SQLiteTaskStorage',
+    'SortedIdView', 'TaskStore', 'changed_at', 'parse_sort_keys',
+    'Task',
+]
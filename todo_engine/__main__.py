@@ -0,0 +1,130 @@
+"""Dòng lệnh cho todo_engine.
+
+    python -m todo_engine --db todo.db add "Viết báo cáo" --priority Gấp
+    python -m todo_engine --db todo.db list --status "Đang làm" --sort "Ngày hết hạn"
+    python -m todo_engine --db todo.db list --due "Quá hạn"
+    python -m todo_engine --db todo.db export Excel -o todo.xlsx
+    python -m todo_engine --db todo.db changes --since 2024-05-01T08:00:00 -o changes.json
+    python -m todo_engine --db other.db import --merge changes.json
+    python -m todo_engine --journal todo.journal list
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+from . import (
+    CATEGORIES, DUE_FILTER_OPTIONS, EXPORT_FORMATS, PRIORITY_COLORS, SORT_OPTIONS, STATUS_OPTIONS,
+    JournalTaskStorage, SQLiteTaskStorage, TaskEngine, due_range, format_import_report
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m todo_engine", description="Quản lý danh sách công việc")
+    parser.add_argument("--db", default=os.environ.get("TODO_DB_PATH", "todo.db"),
+                        help="File SQLite (mặc định: $TODO_DB_PATH hoặc todo.db)")
+    parser.add_argument("--journal", default=os.environ.get("TODO_JOURNAL_PATH") or None,
+                        help="Dùng journal + snapshot thay cho SQLite (mặc định: $TODO_JOURNAL_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Thêm công việc")
+    add.add_argument("name")
+    add.add_argument("--priority", choices=list(PRIORITY_COLORS), default="Bình thường")
+    add.add_argument("--category", choices=CATEGORIES, default="Công việc")
+    add.add_argument("--due", type=date.fromisoformat, help="Ngày hết hạn (YYYY-MM-DD)")
+
+    listing = commands.add_parser("list", help="Liệt kê công việc")
+    listing.add_argument("--status", choices=STATUS_OPTIONS, default="Tất cả")
+    listing.add_argument("--priority", choices=["Tất cả"] + list(PRIORITY_COLORS), default="Tất cả")
+    listing.add_argument("--category", choices=["Tất cả"] + CATEGORIES, default="Tất cả")
+    listing.add_argument("--search", default="")
+    listing.add_argument("--sort", choices=SORT_OPTIONS, default=SORT_OPTIONS[0])
+    listing.add_argument("--due", choices=DUE_FILTER_OPTIONS, default="Tất cả",
+                         help="Lọc theo ngày hết hạn; \"Khoảng ngày\" dùng kèm --due-from/--due-to")
+    listing.add_argument("--due-from", type=date.fromisoformat, help="Ngày hết hạn từ (YYYY-MM-DD)")
+    listing.add_argument("--due-to", type=date.fromisoformat, help="Ngày hết hạn đến (YYYY-MM-DD)")
+
+    for name, help_text in (("done", "Đảo trạng thái hoàn thành"), ("delete", "Xóa công việc")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("ids", type=int, nargs="+")
+
+    move = commands.add_parser("move", help="Di chuyển các công việc thành một khối tới vị trí (tính từ 1)")
+    move.add_argument("position", type=int)
+    move.add_argument("ids", type=int, nargs="+")
+
+    commands.add_parser("stats", help="Thống kê")
+
+    importing = commands.add_parser("import", help="Nhập file Excel/JSON (thay toàn bộ dữ liệu)")
+    importing.add_argument("file")
+    importing.add_argument("--merge", action="store_true",
+                           help="Gộp file JSON (thay đổi hoặc đầy đủ) theo id thay vì thay toàn bộ dữ liệu")
+
+    exporting = commands.add_parser("export", help="Xuất dữ liệu")
+    exporting.add_argument("format", choices=list(EXPORT_FORMATS))
+    exporting.add_argument("-o", "--output", required=True)
+
+    changes = commands.add_parser("changes", help="Xuất các thay đổi (JSON) sau một mốc, để sao lưu hoặc đồng bộ")
+    changes.add_argument("--since", help="Mốc của lần xuất trước (bỏ trống = tất cả)")
+    changes.add_argument("-o", "--output", required=True)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.journal:
+        storage = JournalTaskStorage(args.journal)
+    else:
+        storage = SQLiteTaskStorage(args.db)
+    try:
+        return run(TaskEngine.from_storage(storage), args)
+    finally:
+        storage.close()
+
+
+def run(engine: TaskEngine, args: argparse.Namespace) -> int:
+    store = engine.store
+
+    if args.command == "add":
+        task = engine.add_task(args.name, args.priority, args.category, args.due)
+        print(f"Đã thêm #{task['id']}")
+    elif args.command == "list":
+        due = due_range(args.due, start=args.due_from, end=args.due_to)
+        for task_id in engine.filter_and_sort(args.status, args.priority, args.category, args.search, args.sort, due):
+            task = store.get(task_id)
+            mark = "x" if task['completed'] else " "
+            due = f" (hạn {task['due_date']})" if task['due_date'] else ""
+            print(f"[{mark}] #{task['id']} {PRIORITY_COLORS.get(task['priority'], '')} {task['name']} - {task['category']}{due}")
+    elif args.command == "done":
+        for task_id in args.ids:
+            engine.toggle_task_completion(task_id)
+    elif args.command == "delete":
+        print(f"Đã xóa {engine.bulk_delete(args.ids)} công việc")
+    elif args.command == "move":
+        engine.bulk_move(args.ids, args.position - 1)
+    elif args.command == "stats":
+        for key, value in store.stats().items():
+            print(f"{key}: {value:.0%}" if key == 'completion_rate' else f"{key}: {value}")
+    elif args.command == "import" and args.merge:
+        with open(args.file, 'rb') as file:
+            count, report = engine.merge_file(file, args.file)
+        print(f"Đã gộp {count} thay đổi. {format_import_report(report)}")
+    elif args.command == "import":
+        with open(args.file, 'rb') as file:
+            count, report = engine.import_file(file, args.file)
+        print(f"Đã nhập {count} công việc. {format_import_report(report)}")
+        if not count:
+            return 1
+    elif args.command == "export":
+        with open(args.output, 'wb') as file:
+            file.write(engine.export(args.format))
+        print(f"Đã xuất {len(store)} công việc ra {args.output}")
+    elif args.command == "changes":
+        until, data = engine.export_changes(args.since)
+        with open(args.output, 'wb') as file:
+            file.write(data)
+        print(f"Đã xuất thay đổi ra {args.output}; mốc cho lần sau: {until}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
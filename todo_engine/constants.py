@@ -0,0 +1,35 @@
+"""Hằng số dùng chung cho mô hình task"""
+from datetime import date
+
+# Định nghĩa priority colors
+PRIORITY_COLORS = {
+    "Gấp": "🔴",
+    "Quan trọng": "🟡",
+    "Bình thường": "🟢"
+}
+
+PRIORITY_COLORS_HEX = {
+    "Gấp": "#FF4444",
+    "Quan trọng": "#FFAA00",
+    "Bình thường": "#44FF44"
+}
+
+PRIORITY_ORDER = {"Gấp": 0, "Quan trọng": 1, "Bình thường": 2}
+
+SORT_OPTIONS = ["Thứ tự thêm", "Mức độ ưu tiên", "Ngày hết hạn", "Tên (A-Z)"]
+
+STATUS_OPTIONS = ["Tất cả", "Đang làm", "Đã hoàn thành"]
+
+# Bộ lọc theo ngày hết hạn (xem due.due_range)
+DUE_FILTER_OPTIONS = ["Tất cả", "Quá hạn", "Hết hạn hôm nay", "Trong tuần này", "Khoảng ngày"]
+
+# Khóa sắp xếp cho task không có (hoặc có sai) ngày hết hạn
+NO_DUE_DATE = date.max.toordinal()
+
+CATEGORIES = ["Công việc", "Cá nhân", "Học tập", "Khác"]
+
+# Khoảng cách giữa hai khóa 'order' liên tiếp khi giãn cách danh sách
+ORDER_GAP = 1024
+
+# updated_at: thời điểm thay đổi gần nhất (ISO), dùng cho xuất thay đổi / gộp theo id
+TASK_COLUMNS = ['id', 'name', 'completed', 'priority', 'category', 'due_date', 'created_at', 'order', 'updated_at']
@@ -0,0 +1,83 @@
+"""Tính toán thuần cho phần hiển thị danh sách (phân trang, bảng sửa trực tiếp),
+tách khỏi app.py để kiểm thử được mà không cần Streamlit / pandas"""
+import math
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+
+def page_count(total: int, page_size: int) -> int:
+    """Số trang của total task (ít nhất 1 trang)"""
+    return max(1, math.ceil(total / page_size))
+
+
+def paging_state(total: int, page_size: int, page_number: int = 1, visible_count: Optional[int] = None,
+                 focus_index: Optional[int] = None, reset: bool = False) -> Tuple[int, int]:
+    """(trang, số task đang hiện ở chế độ tải thêm) sau khi chỉnh cho hợp lệ.
+
+    reset đưa về trang đầu / page_size task (khi tìm kiếm, bộ lọc hoặc cách
+    sắp xếp đổi); focus_index giữ task ở vị trí đó trong cửa sổ đang xem.
+    """
+    if reset or visible_count is None:
+        visible_count = page_size
+    if reset:
+        page_number = 1
+    page_number = min(max(page_number, 1), page_count(total, page_size))
+    if focus_index is not None:
+        page_number = focus_index // page_size + 1
+        visible_count = max(visible_count, focus_index + 1)
+    return page_number, visible_count
+
+
+def page_window(total: int, page_size: int, page_number: int = None, visible_count: int = None) -> Tuple[int, int]:
+    """Khoảng [start, end) của danh sách cần vẽ.
+
+    Có page_number: các task của trang đó; không có: visible_count task
+    đầu tiên (chế độ tải thêm).
+    """
+    if page_number is not None:
+        start = (page_number - 1) * page_size
+        return start, min(start + page_size, total)
+    return 0, min(visible_count, total)
+
+
+def table_due_date(value) -> Optional[date]:
+    """Ngày hết hạn dạng date cho ô của bảng; chuỗi không phải ngày YYYY-MM-DD → None
+    (cùng quy tắc với Task.due_date)"""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        parsed = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.isoformat() == value else None
+
+
+def table_changes(edited_rows: Dict, rows: List[Dict], columns: Dict[str, str]) -> Dict[int, Dict]:
+    """Bản diff {id: {field: giá trị}} từ edited_rows của bảng sửa trực tiếp.
+
+    rows là các dòng đang hiển thị (theo vị trí), columns ánh xạ tên cột →
+    field. Chỉ giữ các ô thật sự khác giá trị đang hiển thị, nên ngày hết hạn
+    không đọc được (ô trống) không bị ghi đè khi sửa ô khác cùng dòng; tên
+    để trống bị bỏ qua.
+    """
+    changes = {}
+    for position, values in edited_rows.items():
+        row = rows[int(position)]
+        fields = {}
+        for column, value in values.items():
+            field = columns.get(column)
+            if field is None:
+                continue
+            if field == 'due_date':
+                value = table_due_date(value)
+                if value == table_due_date(row['due_date']):
+                    continue
+                value = value.isoformat() if value else None
+            elif value == row[field] or (field == 'name' and not (value or "").strip()):
+                continue
+            fields[field] = value
+        if fields:
+            changes[row['id']] = fields
+    return changes
@@ -0,0 +1,37 @@
+"""Khoảng lọc và nhãn theo ngày hết hạn"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+def due_range(option: str, today: date = None, start: date = None, end: date = None):
+    """Khoảng ngày hết hạn (ordinal đầu, ordinal cuối, tính cả hai đầu) của một lựa chọn trong DUE_FILTER_OPTIONS.
+
+    None ở một đầu là không giới hạn; trả về None nếu không lọc. start/end
+    chỉ dùng cho "Khoảng ngày".
+    """
+    today = today or date.today()
+    if option == "Quá hạn":
+        return (None, today.toordinal() - 1)
+    if option == "Hết hạn hôm nay":
+        return (today.toordinal(), today.toordinal())
+    if option == "Trong tuần này":
+        monday = (today - timedelta(days=today.weekday())).toordinal()
+        return (monday, monday + 6)
+    if option == "Khoảng ngày" and (start or end):
+        return (start.toordinal() if start else None, end.toordinal() if end else None)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def due_label(due: int, today: int) -> tuple:
+    """(nhóm, nhãn) của ngày hết hạn due so với today (đều là ordinal).
+
+    Nhóm là 'overdue', 'today' hoặc 'upcoming'. Kết quả được cache theo cặp
+    ngày, nên mỗi ngày hết hạn chỉ được tính nhãn một lần mỗi ngày.
+    """
+    days_left = due - today
+    if days_left < 0:
+        return 'overdue', f"Quá hạn {-days_left} ngày"
+    if days_left == 0:
+        return 'today', "Hết hạn hôm nay"
+    return 'upcoming', f"Còn {days_left} ngày"
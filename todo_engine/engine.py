@@ -0,0 +1,728 @@
+"""Các thao tác trên danh sách tasks, không phụ thuộc giao diện"""
+import functools
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Callable, Dict, List
+
+from .exporters import EXPORT_FORMATS, export_changes
+from .importers import IMPORT_FORMATS, latest_changes, read_changes, read_excel, tasks_from_json
+from .jobs import Job, JobRunner, default_runner
+from .profiling import NULL_TIMER, PhaseTimer
+from .storage import SQLiteTaskStorage
+from .store import TaskStore, changed_at
+from .task import Task
+
+# Số kết quả truy vấn (theo version) được giữ lại, dùng chung cho mọi người đọc
+QUERY_CACHE_SIZE = 32
+
+# Số thao tác gần nhất có thể hoàn tác
+UNDO_LIMIT = 100
+
+# Số lần thử đọc không khóa trước khi dùng snapshot cũ hoặc chờ khóa ghi
+READ_RETRIES = 3
+
+# Các field được lấy từ bản mới hơn khi gộp thay đổi ('order' được xử lý riêng)
+MERGE_FIELDS = ('name', 'completed', 'priority', 'category', 'due_date')
+
+# Lỗi có thể gặp khi đọc đúng lúc một thao tác ghi đang sửa dở chỉ mục
+_TORN_READ_ERRORS = (AttributeError, IndexError, KeyError, RuntimeError, TypeError, ValueError)
+
+
+def _writer(method):
+    """Thao tác ghi: giữ khóa ghi và đánh dấu đang ghi để người đọc biết mà đọc lại.
+
+    Nhận thêm history=History để ghi thao tác vào lịch sử hoàn tác của
+    người gọi thay cho lịch sử mặc định của engine (xem History).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, history: 'History' = None, **kwargs):
+        with self.lock:
+            outer = self._history
+            if history is not None:
+                self._history = history
+            self._writing += 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._writing -= 1
+                self._history = outer
+    return wrapper
+
+
+class History:
+    """Lịch sử hoàn tác / làm lại: (tên thao tác, hàm hoàn tác, hàm làm lại).
+
+    Engine dùng chung giữa nhiều session thì mỗi session giữ một History
+    riêng và truyền vào các thao tác ghi, nên hoàn tác chỉ đảo ngược thao tác
+    của chính session đó.
+    """
+
+    def __init__(self, limit: int = UNDO_LIMIT):
+        self.undo_entries: deque = deque(maxlen=limit)
+        self.redo_entries: List[tuple] = []
+
+    @property
+    def undo_label(self):
+        """Tên thao tác sẽ được hoàn tác (None nếu không có)"""
+        return self.undo_entries[-1][0] if self.undo_entries else None
+
+    @property
+    def redo_label(self):
+        """Tên thao tác sẽ được làm lại (None nếu không có)"""
+        return self.redo_entries[-1][0] if self.redo_entries else None
+
+
+def task_fields(kwargs: Dict) -> Dict:
+    """Chuẩn hóa giá trị field trước khi lưu (ngày hết hạn → chuỗi ISO)"""
+    fields = {}
+    for key, value in kwargs.items():
+        if key == 'due_date' and value:
+            fields[key] = value.isoformat() if isinstance(value, date) else value
+        else:
+            fields[key] = value
+    return fields
+
+
+class TaskEngine:
+    """TaskStore kèm bộ đếm id và các thao tác thêm/sửa/xóa/di chuyển/lọc.
+
+    Giao diện Streamlit, CLI và mã kiểm thử đều dùng chung lớp này. Một engine
+    có thể được nhiều session (nhiều thread) dùng chung: các thao tác ghi lần
+    lượt giữ khóa ghi, còn người đọc không bao giờ chờ khóa đó mà đọc lạc
+    quan rồi kiểm tra lại version (xem read); kết quả truy vấn và file xuất
+    là snapshot theo version, dùng chung cho mọi session.
+    """
+
+    def __init__(self, store: TaskStore = None, next_id: int = None, runner: JobRunner = None):
+        self.store = store if store is not None else TaskStore()
+        if next_id is None:
+            next_id = self.store.max_id() + 1
+        self.next_id = next_id
+        self.lock = threading.RLock()
+        self._writing = 0
+        # Khóa ngắn chỉ bảo vệ các cache snapshot, không bao giờ giữ khi tính toán
+        self._cache_lock = threading.Lock()
+        self._snapshots: OrderedDict = OrderedDict()
+        self._exports: Dict[str, tuple] = {}
+        # Lịch sử hoàn tác mặc định; _history là lịch sử của thao tác ghi đang chạy
+        self.history = History()
+        self._history = self.history
+        # Pool chạy nhập/xuất nền (mặc định dùng chung cả process)
+        self.runner = runner or default_runner()
+
+    @property
+    def version(self) -> int:
+        """Tăng sau mỗi thay đổi (xem TaskStore.version)"""
+        return self.store.version
+
+    @classmethod
+    def from_storage(cls, storage: SQLiteTaskStorage) -> 'TaskEngine':
+        """Nạp dữ liệu từ storage; mọi thay đổi sau đó được ghi xuống storage"""
+        tasks = storage.load_all()
+        return cls(TaskStore(tasks, storage=storage, deleted=storage.load_tombstones()), storage.max_id() + 1)
+
+    # Mỗi thao tác ghi lại cách đảo ngược chính nó từ các giá trị cũ của
+    # những field / vị trí bị đổi, nên hoàn tác và làm lại cũng chỉ tốn
+    # O(thay đổi) và được ghi xuống storage như mọi thay đổi khác
+
+    def _record(self, label: str, undo: Callable, redo: Callable):
+        self._history.undo_entries.append((label, undo, redo))
+        self._history.redo_entries.clear()
+
+    def _positions(self, task_ids) -> List[tuple]:
+        """(vị trí, task, id task đứng ngay sau) của các task còn trong danh sách, theo vị trí tăng dần"""
+        store = self.store
+        positions = []
+        for index in sorted(store.index_of(i) for i in set(task_ids) if i in store):
+            following = store.tasks[index + 1].id if index + 1 < len(store) else None
+            positions.append((index, store.tasks[index], following))
+        return positions
+
+    def _reinsert(self, positions: List[tuple]):
+        """Chèn lại các task về chỗ cũ (positions lấy từ _positions).
+
+        Mỗi task được chèn ngay trước task từng đứng sau nó, tra theo id lúc
+        gọi (từ cuối lên, nên task đứng sau cũng có thể là task vừa chèn lại),
+        vì session khác có thể đã thêm hoặc xóa task; task đó không còn thì
+        dùng vị trí cũ. Task có id đã có lại trong danh sách (vd. session
+        khác vừa nhập file) được bỏ qua.
+        """
+        store = self.store
+        for index, task, following in reversed(positions):
+            if task.id in store:
+                continue
+            if following is None:
+                index = len(store)
+            elif following in store:
+                index = store.index_of(following)
+            store.insert(task, index)
+
+    def _move_before(self, task_id: int, next_id, index: int):
+        """Đưa task tới ngay trước task next_id (None = cuối danh sách).
+
+        Hoàn tác / làm lại tra vị trí theo id lúc gọi vì session khác có thể
+        đã thêm hoặc xóa task; next_id không còn thì dùng vị trí index. Task
+        không còn thì không làm gì.
+        """
+        store = self.store
+        current = store.index_of(task_id)
+        if current is None:
+            return
+        target = store.index_of(next_id) if next_id is not None else len(store)
+        if target is None:
+            target = index
+        elif target > current:
+            target -= 1
+        target = max(0, min(target, len(store) - 1))
+        if target != current:
+            store.move(current, target)
+
+    def _restore_fields(self, before: List[tuple]):
+        """Gán lại giá trị cũ; các task có cùng giá trị cũ được gán trong một lần"""
+        groups: Dict[tuple, List[int]] = {}
+        for task_id, fields in before:
+            groups.setdefault(tuple(fields.items()), []).append(task_id)
+        for items, task_ids in groups.items():
+            self.store.update_many(task_ids, **dict(items))
+
+    @property
+    def undo_label(self):
+        """Tên thao tác sẽ được hoàn tác trong lịch sử mặc định (None nếu không có)"""
+        return self.history.undo_label
+
+    @property
+    def redo_label(self):
+        """Tên thao tác sẽ được làm lại trong lịch sử mặc định (None nếu không có)"""
+        return self.history.redo_label
+
+    @_writer
+    def undo(self):
+        """Hoàn tác thao tác gần nhất; trả về tên thao tác (None nếu không còn gì)"""
+        history = self._history
+        if not history.undo_entries:
+            return None
+        # Chỉ lấy khỏi lịch sử khi hoàn tác thành công
+        entry = history.undo_entries[-1]
+        entry[1]()
+        history.undo_entries.pop()
+        history.redo_entries.append(entry)
+        return entry[0]
+
+    @_writer
+    def redo(self):
+        """Làm lại thao tác vừa hoàn tác; trả về tên thao tác (None nếu không có)"""
+        history = self._history
+        if not history.redo_entries:
+            return None
+        entry = history.redo_entries[-1]
+        entry[2]()
+        history.redo_entries.pop()
+        history.undo_entries.append(entry)
+        return entry[0]
+
+    @_writer
+    def add_task(self, task_name: str, priority: str, category: str, due_date: date = None) -> Task:
+        """Thêm task mới vào danh sách"""
+        task = self.store.append(Task(
+            self.next_id, task_name, False, priority, category,
+            due_date.isoformat() if due_date else None, datetime.now().isoformat()
+        ))
+        self.next_id += 1
+        positions = self._positions([task.id])
+        self._record(
+            f"Thêm “{task_name}”",
+            lambda: self.store.remove(task.id), lambda: self._reinsert(positions)
+        )
+        return task
+
+    @_writer
+    def update_task(self, task_id: int, **kwargs):
+        """Cập nhật thông tin task"""
+        task = self.store.get(task_id)
+        if task is None:
+            return None
+        fields = task_fields(kwargs)
+        before = {key: task[key] for key in fields}
+        self.store.update(task_id, **fields)
+        self._record(
+            f"Sửa “{task.name}”",
+            lambda: self.store.update(task_id, **before), lambda: self.store.update(task_id, **fields)
+        )
+        return task
+
+    @_writer
+    def delete_task(self, task_id: int):
+        """Xóa task khỏi danh sách"""
+        positions = self._positions([task_id])
+        task = self.store.remove(task_id)
+        if task is not None:
+            self._record(
+                f"Xóa “{task.name}”",
+                lambda: self._reinsert(positions), lambda: self.store.remove(task_id)
+            )
+        return task
+
+    @_writer
+    def toggle_task_completion(self, task_id: int):
+        """Chuyển đổi trạng thái hoàn thành của task"""
+        task = self.store.get(task_id)
+        if task is not None:
+            self.update_task(task_id, completed=not task['completed'])
+
+    @_writer
+    def reorder_tasks(self, old_index: int, new_index: int):
+        """Sắp xếp lại thứ tự tasks"""
+        tasks = self.store.tasks
+        if 0 <= old_index < len(tasks) and 0 <= new_index < len(tasks):
+            # Nhớ task đứng ngay sau (theo id) thay vì vị trí, vì vị trí lệch khi session khác sửa danh sách
+            old_next = tasks[old_index + 1].id if old_index + 1 < len(tasks) else None
+            self.store.move(old_index, new_index)
+            task = tasks[new_index]
+            new_next = tasks[new_index + 1].id if new_index + 1 < len(tasks) else None
+            self._record(
+                f"Di chuyển “{task.name}”",
+                lambda: self._move_before(task.id, old_next, old_index),
+                lambda: self._move_before(task.id, new_next, new_index)
+            )
+
+    @_writer
+    def move_task_up(self, task_id: int):
+        """Di chuyển task lên trên"""
+        task_index = self.store.index_of(task_id)
+        if task_index is not None and task_index > 0:
+            self.reorder_tasks(task_index, task_index - 1)
+
+    @_writer
+    def move_task_down(self, task_id: int):
+        """Di chuyển task xuống dưới"""
+        task_index = self.store.index_of(task_id)
+        if task_index is not None and task_index < len(self.store) - 1:
+            self.reorder_tasks(task_index, task_index + 1)
+
+    @_writer
+    def move_task_to(self, task_id: int, position: int):
+        """Di chuyển task tới vị trí position (tính từ 0, tự giới hạn trong danh sách)"""
+        task_index = self.store.index_of(task_id)
+        if task_index is not None:
+            self.reorder_tasks(task_index, max(0, min(position, len(self.store) - 1)))
+
+    @_writer
+    def move_task_to_top(self, task_id: int):
+        """Di chuyển task lên đầu danh sách"""
+        self.move_task_to(task_id, 0)
+
+    @_writer
+    def move_task_to_bottom(self, task_id: int):
+        """Di chuyển task xuống cuối danh sách"""
+        self.move_task_to(task_id, len(self.store) - 1)
+
+    # Thao tác hàng loạt: mỗi hàm là một thay đổi duy nhất trên store (một lần
+    # tăng version, một transaction nếu có storage), trả về số task bị ảnh hưởng
+
+    @_writer
+    def apply_changes(self, changes: Dict[int, Dict]) -> int:
+        """Áp dụng một bản diff {id: {field: giá trị mới}} (vd. từ bảng chỉnh sửa).
+
+        Các task có cùng thay đổi được gán trong một lần; cả bản diff là một
+        thao tác hoàn tác. Trả về số task được sửa.
+        """
+        before, after = [], []
+        for task_id, fields in changes.items():
+            task = self.store.get(task_id)
+            if task is None or not fields:
+                continue
+            fields = task_fields(fields)
+            before.append((task_id, {key: task[key] for key in fields}))
+            after.append((task_id, fields))
+        if after:
+            self._restore_fields(after)
+            self._record(
+                f"Sửa {len(after)} công việc",
+                lambda: self._restore_fields(before), lambda: self._restore_fields(after)
+            )
+        return len(after)
+
+    @_writer
+    def bulk_set_completed(self, task_ids, completed: bool) -> int:
+        """Đánh dấu hoàn thành / chưa hoàn thành cho nhiều task"""
+        return self.bulk_update(task_ids, completed=completed)
+
+    @_writer
+    def bulk_update(self, task_ids, **kwargs) -> int:
+        """Gán cùng mức độ ưu tiên, danh mục, ngày hết hạn... cho nhiều task"""
+        fields = task_fields(kwargs)
+        task_ids = [i for i in dict.fromkeys(task_ids) if i in self.store]
+        before = [(i, {key: self.store.get(i)[key] for key in fields}) for i in task_ids]
+        count = self.store.update_many(task_ids, **fields)
+        if count:
+            self._record(
+                f"Sửa {count} công việc",
+                lambda: self._restore_fields(before), lambda: self.store.update_many(task_ids, **fields)
+            )
+        return count
+
+    @_writer
+    def bulk_delete(self, task_ids) -> int:
+        """Xóa nhiều task"""
+        positions = self._positions(task_ids)
+        task_ids = [task.id for _, task, _ in positions]
+        count = self.store.remove_many(task_ids)
+        if count:
+            self._record(
+                f"Xóa {count} công việc",
+                lambda: self._reinsert(positions), lambda: self.store.remove_many(task_ids)
+            )
+        return count
+
+    @_writer
+    def bulk_move(self, task_ids, position: int) -> int:
+        """Gom các task thành một khối bắt đầu tại position (tính từ 0)"""
+        positions = self._positions(task_ids)
+        task_ids = [task.id for _, task, _ in positions]
+        count = self.store.move_block(task_ids, position)
+        if count:
+            def undo():
+                # Task session khác đã xóa thì không chèn lại
+                present = [entry for entry in positions if entry[1].id in self.store]
+                self.store.remove_many([task.id for _, task, _ in present])
+                self._reinsert(present)
+            self._record(f"Di chuyển {count} công việc", undo, lambda: self.store.move_block(task_ids, position))
+        return count
+
+    def filter_and_sort(self, filter_status: str = "Tất cả", filter_priority: str = "Tất cả",
+                        filter_category: str = "Tất cả", search_query: str = "",
+                        sort_option: str = "Thứ tự thêm", due_range: tuple = None,
+                        timer: PhaseTimer = NULL_TIMER) -> Sequence:
+        """Danh sách id sau khi lọc và sắp xếp, theo thứ tự hiển thị.
+
+        due_range (xem due.due_range) giới hạn ngày hết hạn, tra bằng bisect
+        trên chỉ mục ngày hết hạn. timer nhận thời gian của các bước search /
+        due / sort / filter.
+        """
+        store = self.store
+        search_ids = None
+        if search_query:
+            with timer.phase("search"):
+                search_ids = store.search(search_query)
+        if due_range is not None:
+            with timer.phase("due"):
+                due_ids = store.due_ids(*due_range)
+            search_ids = due_ids if search_ids is None else search_ids & due_ids
+
+        if hasattr(store.storage, 'query_ids'):
+            # Lọc và sắp xếp trực tiếp bằng SQL
+            with timer.phase("filter_sort_sql"):
+                return store.storage.query_ids(filter_status, filter_priority, filter_category, sort_option, search_ids)
+
+        # Task trong store luôn là Task, đọc thẳng thuộc tính cho nhanh
+        filters = []
+        if filter_status == "Đang làm":
+            filters.append(lambda t: not t.completed)
+        elif filter_status == "Đã hoàn thành":
+            filters.append(lambda t: t.completed)
+        if filter_priority != "Tất cả":
+            filters.append(lambda t: t.priority == filter_priority)
+        if filter_category != "Tất cả":
+            filters.append(lambda t: t.category == filter_category)
+
+        # Duyệt sorted view có sẵn thay vì sắp xếp lại mỗi lần chạy
+        with timer.phase("sort"):
+            if search_ids is not None:
+                filtered_ids = store.sort_ids(search_ids, sort_option)
+            else:
+                filtered_ids = store.sorted_ids(sort_option)
+        if filters:
+            with timer.phase("filter"):
+                filtered_ids = [i for i in filtered_ids if all(f(store.get(i)) for f in filters)]
+        return filtered_ids
+
+    def _replace(self, tasks: List[Dict]):
+        self.store.load(tasks)
+        self.next_id = self.store.max_id() + 1
+
+    @_writer
+    def load(self, tasks: List[Dict]):
+        """Thay toàn bộ danh sách (dùng khi nhập file)"""
+        before = self.store.tasks
+        self._replace(tasks)
+        # Bản sao: store.tasks tiếp tục bị sửa tại chỗ bởi các thao tác sau
+        after = list(self.store.tasks)
+        self._record(
+            f"Thay danh sách ({len(after)} công việc)",
+            lambda: self._replace(before), lambda: self._replace(after)
+        )
+
+    @_writer
+    def merge(self, tasks: List[Dict], deleted: List[tuple] = ()) -> int:
+        """Gộp thay đổi từ nơi khác theo id thay vì thay cả danh sách.
+
+        tasks là các task (dict, có updated_at nếu biết), deleted là các cặp
+        (id, thời điểm xóa). Mỗi thay đổi chỉ được áp dụng nếu mới hơn bản
+        đang có (bản không có mốc luôn được coi là mới hơn) và giữ nguyên mốc
+        của nó, nên gộp lại cùng một bản thay đổi không làm gì. Nhiều bản cùng
+        id chỉ giữ bản mới nhất (xem latest_changes) và mọi thay đổi được tính
+        xong trước khi sửa store. Task khác created_at với task cùng id ở đây
+        là một task khác (xem _separate_clashes). Chi phí tỷ lệ với số thay
+        đổi. Cả lần gộp là một thao tác hoàn tác; trả về số task được thêm,
+        sửa hoặc xóa.
+        """
+        store = self.store
+        tasks, deleted, _ = latest_changes(tasks, deleted)
+        tasks, moved = self._separate_clashes(tasks, deleted)
+        updates, new_tasks = [], []
+        before, after, moves, old_orders = [], [], [], []
+        for data in tasks:
+            task_id = data['id']
+            stamp = data.get('updated_at')
+            incoming = changed_at(data) or None
+            local = store.get(task_id) if task_id not in moved else None
+            if local is None:
+                deleted_at = store.deleted_at(task_id)
+                if incoming is None or deleted_at is None or incoming > deleted_at:
+                    new_tasks.append((data, stamp))
+                continue
+            current = changed_at(local)
+            if incoming is not None and current and incoming <= current:
+                continue
+            fields = {key: data[key] for key in MERGE_FIELDS if key in data and data[key] != local[key]}
+            order = data.get('order')
+            if not isinstance(order, int) or isinstance(order, bool) or order == local.order:
+                order = None
+            if fields:
+                before.append((task_id, {key: local[key] for key in fields}))
+                after.append((task_id, fields))
+            if order is not None:
+                old_orders.append((task_id, local.order, None))
+                moves.append((task_id, order, stamp))
+            if fields or order is not None:
+                updates.append((task_id, fields, stamp))
+        # Task ở đây phải nhường id: gỡ ra rồi chèn lại (mốc mới) dưới id mới
+        new_tasks.extend((data, None) for data in moved.values())
+        removed_ids: Dict[str, List[int]] = {}
+        for task_id, deleted_at in deleted:
+            local = store.get(task_id)
+            if local is not None and (not changed_at(local) or deleted_at > changed_at(local)):
+                removed_ids.setdefault(deleted_at, []).append(task_id)
+
+        # Xóa, rồi sửa / di chuyển, rồi thêm; hoàn tác đi theo thứ tự ngược lại
+        removed = self._positions([i for ids in removed_ids.values() for i in ids] + list(moved))
+        for deleted_at, task_ids in removed_ids.items():
+            store.remove_many(task_ids, deleted_at)
+        # Tombstone của các id này bị gỡ ngay khi task thắng được chèn vào
+        store.remove_many(list(moved))
+        for task_id, fields, stamp in updates:
+            if fields:
+                store.update(task_id, updated_at=stamp, **fields)
+        store.move_to_orders(moves)
+        for data, stamp in new_tasks:
+            store.insert_ordered(Task.from_dict(data), stamp)
+            self.next_id = max(self.next_id, data['id'] + 1)
+        # Id đã xóa ở nơi khác cũng không được cấp lại ở đây
+        self.next_id = max([self.next_id] + [task_id + 1 for task_id, _ in deleted])
+        inserted = self._positions([data['id'] for data, _ in new_tasks])
+
+        count = len(updates) + len(inserted) + len(removed)
+        if count:
+            def undo():
+                store.remove_many([task.id for _, task, _ in inserted])
+                store.move_to_orders(old_orders)
+                self._restore_fields(before)
+                self._reinsert(removed)
+
+            def redo():
+                store.remove_many([task.id for _, task, _ in removed])
+                self._restore_fields(after)
+                store.move_to_orders([(task_id, order, None) for task_id, order, _ in moves])
+                self._reinsert(inserted)
+            self._record(f"Gộp {count} thay đổi", undo, redo)
+        return count
+
+    def _separate_clashes(self, tasks: List[Dict], deleted: List[tuple]) -> tuple:
+        """Tách các task cùng id nhưng khác created_at (hai nơi cùng cấp một id trước khi đồng bộ).
+
+        Task tạo trước giữ id; task kia nhận id mới cấp từ sau id lớn nhất
+        của cả hai bên, theo thứ tự (created_at, id), nên hai bên gộp thay
+        đổi của nhau cấp cùng một id cho nó. Task đã có ở đây dưới id khác
+        (từ lần gộp trước) thì dùng lại id đó. Trả về (tasks đã đổi id,
+        {id: dict task ở đây phải chuyển sang id mới}).
+        """
+        store = self.store
+        losers = []
+        for data in tasks:
+            local = store.get(data['id'])
+            created = data.get('created_at')
+            if local is None or not created or not local.created_at or created == local.created_at:
+                continue
+            if created < local.created_at:
+                losers.append((local.created_at, local.id, local.to_dict(), True))
+            else:
+                losers.append((created, data['id'], data, False))
+        if not losers:
+            return tasks, {}
+        known = {task.created_at: task.id for task in store}
+        next_id = max([self.next_id] + [data['id'] + 1 for data in tasks] + [i + 1 for i, _ in deleted])
+        renamed, moved = {}, {}
+        for created, task_id, data, is_local in sorted(losers, key=lambda loser: loser[:2]):
+            new_id = None if is_local else known.get(created)
+            if new_id is None:
+                new_id, next_id = next_id, next_id + 1
+            if is_local:
+                moved[task_id] = dict(data, id=new_id)
+            else:
+                renamed[task_id] = dict(data, id=new_id)
+        tasks = [renamed.get(data['id'], data) for data in tasks]
+        if renamed:
+            # Id mới có thể trùng một bản ghi khác trong cùng lần gộp
+            tasks = latest_changes(tasks, ())[0]
+        return tasks, moved
+
+    def changes_since(self, since: str = None) -> tuple:
+        """Snapshot (mốc, tasks, tombstones) các thay đổi sau mốc since (xem TaskStore.changes_since)"""
+        def compute():
+            until, tasks, deleted = self.store.changes_since(since)
+            return until, [task.copy() for task in tasks], deleted
+        return self.read(compute)[1]
+
+    def export_changes(self, since: str = None, progress: Callable = None) -> tuple:
+        """File JSON chỉ chứa các thay đổi sau mốc since (None = tất cả, kể cả tombstone).
+
+        Trả về (mốc, nội dung file); mốc dùng làm since cho lần xuất sau.
+        """
+        until, tasks, deleted = self.changes_since(since)
+        return until, export_changes(tasks, deleted, since, until, progress=progress)
+
+    def merge_file(self, file, filename: str, progress: Callable = None, history: History = None) -> tuple:
+        """Gộp file JSON (từ export_changes hoặc xuất JSON đầy đủ) theo id.
+
+        Giống import_file nhưng không thay danh sách; trả về (số task đã
+        thêm/sửa/xóa, report).
+        """
+        if IMPORT_FORMATS.get(filename.rsplit('.', 1)[-1].lower()) != "JSON":
+            raise ValueError("Chỉ gộp được file JSON!")
+        tasks, deleted, report = read_changes(file, progress=progress)
+        if progress is not None:
+            progress(1.0)
+        return self.merge(tasks, deleted, history=history), report
+
+    def submit_merge(self, file, filename: str, history: History = None) -> Job:
+        """Chạy merge_file trong pool nền; kết quả của Job là (số thay đổi, report)"""
+        return self.runner.submit(f"Gộp {filename}", self.merge_file, file, filename, history=history)
+
+    def parse_import(self, file, filename: str, progress: Callable = None) -> tuple:
+        """Đọc file Excel/JSON theo phần mở rộng của filename, chưa đụng tới danh sách.
+
+        Trả về (tasks, report).
+        """
+        kind = IMPORT_FORMATS.get(filename.rsplit('.', 1)[-1].lower())
+        if kind == "Excel":
+            return read_excel(file, self.next_id, progress=progress)
+        if kind == "JSON":
+            return tasks_from_json(file, progress=progress)
+        raise ValueError("Định dạng file không được hỗ trợ!")
+
+    def import_file(self, file, filename: str, progress: Callable = None, history: History = None) -> tuple:
+        """Nhập file Excel/JSON theo phần mở rộng của filename.
+
+        File được đọc mà không giữ khóa ghi; danh sách chỉ bị thay (một lần,
+        dưới khóa ghi) khi file có ít nhất một task hợp lệ. Trả về (số task
+        đã nhập, report); history như các thao tác ghi (xem History).
+        """
+        tasks, report = self.parse_import(file, filename, progress)
+        if progress is not None:
+            # Điểm hủy cuối cùng trước khi thay danh sách
+            progress(1.0)
+        if tasks:
+            self.load(tasks, history=history)
+        return len(tasks), report
+
+    def submit_import(self, file, filename: str, history: History = None) -> Job:
+        """Chạy import_file trong pool nền; kết quả của Job là (số task, report)"""
+        return self.runner.submit(f"Nhập {filename}", self.import_file, file, filename, history=history)
+
+    def submit_export(self, fmt: str) -> Job:
+        """Chạy export trong pool nền; các định dạng khác nhau chạy song song được"""
+        return self.runner.submit(f"Xuất {fmt}", self.export, fmt)
+
+    def read(self, compute: Callable, fallback: tuple = None) -> tuple:
+        """Chạy compute mà không lấy khóa ghi; trả về (version, kết quả).
+
+        Kết quả chỉ được nhận nếu không có thao tác ghi nào chen vào trong lúc
+        tính (version không đổi, không ai đang ghi). Sau READ_RETRIES lần
+        không thành công thì trả về fallback (snapshot cũ nhưng nhất quán)
+        nếu có, không có mới phải chờ khóa ghi.
+        """
+        for _ in range(READ_RETRIES):
+            version = self.store.version
+            if self._writing:
+                time.sleep(0)
+                continue
+            try:
+                result = compute()
+            except _TORN_READ_ERRORS:
+                continue
+            if not self._writing and self.store.version == version:
+                return version, result
+        if fallback is not None:
+            return fallback
+        with self.lock:
+            return self.store.version, compute()
+
+    def query(self, filter_status: str = "Tất cả", filter_priority: str = "Tất cả",
+              filter_category: str = "Tất cả", search_query: str = "",
+              sort_option: str = "Thứ tự thêm", due_range: tuple = None,
+              timer: PhaseTimer = NULL_TIMER) -> tuple:
+        """Snapshot (version, danh sách id) của filter_and_sort.
+
+        Mỗi tổ hợp bộ lọc chỉ được tính một lần cho mỗi version, kết quả
+        (LRU QUERY_CACHE_SIZE) dùng chung cho mọi session.
+        """
+        key = (filter_status, filter_priority, filter_category, search_query, sort_option, due_range)
+        return self._snapshot(('query',) + key, lambda: list(self.filter_and_sort(*key, timer=timer)))
+
+    def summary(self, today: date = None) -> tuple:
+        """Snapshot (version, (thống kê, bảng đếm)) của TaskStore.stats và TaskStore.count_table"""
+        today = today or date.today()
+        return self._snapshot(('summary', today), lambda: (self.store.stats(today), self.store.count_table()))
+
+    def rows(self, task_ids) -> tuple:
+        """Snapshot (version, dòng) của TaskStore.rows cho các task đang hiển thị"""
+        task_ids = tuple(task_ids)
+        return self._snapshot(('rows', task_ids), lambda: self.store.rows(task_ids))
+
+    def _snapshot(self, key: tuple, compute: Callable) -> tuple:
+        # Kết quả read() theo version trong LRU dùng chung (QUERY_CACHE_SIZE mục)
+        with self._cache_lock:
+            cached = self._snapshots.get(key)
+            if cached is not None and cached[0] == self.store.version:
+                self._snapshots.move_to_end(key)
+                return cached
+        snapshot = self.read(compute, fallback=cached)
+        if snapshot is not cached:
+            with self._cache_lock:
+                self._snapshots[key] = snapshot
+                self._snapshots.move_to_end(key)
+                if len(self._snapshots) > QUERY_CACHE_SIZE:
+                    self._snapshots.popitem(last=False)
+        return snapshot
+
+    def export(self, fmt: str, progress: Callable = None) -> bytes:
+        """Nội dung file xuất theo định dạng fmt (xem EXPORT_FORMATS).
+
+        File được giữ lại tới khi dữ liệu thay đổi; việc ghi file chạy trên
+        bản sao các task (chép trong read nên cả file thuộc cùng một version)
+        nên không chặn thao tác ghi. Nếu có
+        thay đổi xen vào trong lúc ghi, file vẫn được trả về nhưng không được
+        giữ lại.
+        """
+        cached = self._exports.get(fmt)
+        if cached is not None and cached[0] == self.store.version:
+            return cached[1]
+        version, tasks = self.read(lambda: [task.copy() for task in self.store.tasks])
+        data = EXPORT_FORMATS[fmt][2](tasks, progress=progress)
+        if self.store.version == version:
+            with self._cache_lock:
+                self._exports[fmt] = (version, data)
+        return data
@@ -0,0 +1,156 @@
+"""Xuất tasks ra Excel, CSV, Parquet và JSON (đầy đủ hoặc chỉ các thay đổi).
+
+openpyxl và pyarrow chỉ được import khi xuất đúng định dạng cần chúng. Mọi
+hàm xuất nhận thêm progress (xem jobs.tracked) để báo tiến độ khi chạy nền.
+"""
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import Callable, Dict
+
+from .jobs import tracked
+from .task import Task, ordinal_isoformat
+
+EXPORT_COLUMNS = ['ID', 'Tên công việc', 'Hoàn thành', 'Mức độ ưu tiên', 'Danh mục', 'Ngày hết hạn', 'Ngày tạo']
+
+# Số dòng mỗi row group khi ghi Parquet
+PARQUET_CHUNK_SIZE = 10000
+
+
+def export_row(task: Dict) -> tuple:
+    """Một dòng dữ liệu xuất file (theo EXPORT_COLUMNS)"""
+    if isinstance(task, Task):
+        # Đọc thẳng thuộc tính; ngày hết hạn dạng ordinal đã là ngày thuần
+        due = task.due_ordinal
+        if due is not None:
+            created_at = task.created_at
+            return (
+                task.id, task.name, 'Có' if task.completed else 'Không', task.priority, task.category,
+                ordinal_isoformat(due), created_at[:10] if created_at else ''
+            )
+    due_date_str = task.get('due_date') or ''
+    if len(due_date_str) != 10:
+        try:
+            due_date_str = datetime.fromisoformat(due_date_str).date().strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+    return (
+        task.get('id', ''),
+        task.get('name', ''),
+        'Có' if task.get('completed', False) else 'Không',
+        task.get('priority', ''),
+        task.get('category', ''),
+        due_date_str,
+        task.get('created_at', '')[:10] if task.get('created_at') else ''
+    )
+
+
+def export_excel(tasks, progress: Callable = None) -> bytes:
+    """Ghi từng dòng qua chế độ write-only của openpyxl"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Danh sách công việc')
+    header = []
+    for column in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    for task in tracked(tasks, progress):
+        sheet.append(export_row(task))
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def export_csv(tasks, progress: Callable = None) -> bytes:
+    """CSV UTF-8 có BOM để Excel đọc đúng tiếng Việt"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(export_row(task) for task in tracked(tasks, progress))
+    return output.getvalue().encode('utf-8-sig')
+
+
+def export_parquet(tasks, progress: Callable = None) -> bytes:
+    """Ghi Parquet theo từng row group PARQUET_CHUNK_SIZE dòng (cần pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.schema([
+        ('ID', pa.int64()), ('Tên công việc', pa.string()), ('Hoàn thành', pa.string()),
+        ('Mức độ ưu tiên', pa.string()), ('Danh mục', pa.string()), ('Ngày hết hạn', pa.string()),
+        ('Ngày tạo', pa.string())
+    ])
+    output = io.BytesIO()
+    with pq.ParquetWriter(output, schema) as writer:
+        chunk = []
+        for task in tracked(tasks, progress):
+            chunk.append(export_row(task))
+            if len(chunk) == PARQUET_CHUNK_SIZE:
+                writer.write_batch(pa.RecordBatch.from_arrays([pa.array(c) for c in zip(*chunk)], schema=schema))
+                chunk = []
+        if chunk:
+            writer.write_batch(pa.RecordBatch.from_arrays([pa.array(c) for c in zip(*chunk)], schema=schema))
+    return output.getvalue()
+
+
+def _encode_json(data, tasks: list, progress: Callable = None) -> bytes:
+    """Ghi data (có chứa các Task trong tasks) ra JSON thụt lề 2, từng phần một.
+
+    Task được chuyển sang dict lần lượt trong lúc ghi; tiến độ được tính
+    theo số Task đã chuyển.
+    """
+    if progress is None:
+        default = Task.to_dict
+    else:
+        steps = iter(tracked(tasks, progress))
+        
+        def default(task):
+            next(steps, None)
+            return task.to_dict()
+    output = io.BytesIO()
+    for chunk in json.JSONEncoder(ensure_ascii=False, indent=2, default=default).iterencode(data):
+        output.write(chunk.encode('utf-8'))
+    if progress is not None:
+        # Lượt cuối của tracked báo 1.0
+        for _ in steps:
+            pass
+    return output.getvalue()
+
+
+def export_json(tasks, progress: Callable = None) -> bytes:
+    """JSON giống json.dumps(..., indent=2) nhưng ghi dần từng phần (xem _encode_json)"""
+    tasks = list(tasks)
+    return _encode_json(tasks, tasks, progress)
+
+
+def export_changes(tasks, deleted, since: str = None, until: str = None, progress: Callable = None) -> bytes:
+    """JSON chỉ gồm các thay đổi: task đã thêm/sửa và tombstone của task đã xóa.
+
+    {"since": ..., "until": ..., "tasks": [...], "deleted": [{"id": ..., "deleted_at": ...}]};
+    nhập lại bằng importers.read_changes rồi TaskEngine.merge.
+    """
+    tasks = list(tasks)
+    changes = {
+        'since': since,
+        'until': until,
+        'tasks': tasks,
+        'deleted': [{'id': task_id, 'deleted_at': deleted_at} for task_id, deleted_at in deleted]
+    }
+    return _encode_json(changes, tasks, progress)
+
+
+# Định dạng xuất: tên → (phần mở rộng, MIME, hàm xuất)
+EXPORT_FORMATS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", export_excel),
+    "JSON": ("json", "application/json", export_json),
+    "CSV": ("csv", "text/csv", export_csv),
+}
+if importlib.util.find_spec("pyarrow") is not None:
+    EXPORT_FORMATS["Parquet"] = ("parquet", "application/vnd.apache.parquet", export_parquet)
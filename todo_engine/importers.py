@@ -0,0 +1,436 @@
+"""Nhập tasks từ file Excel và JSON/NDJSON, và đọc file thay đổi để gộp theo id.
+
+pandas (và openpyxl qua nó) chỉ được import khi thực sự đọc file Excel.
+"""
+import codecs
+import json
+import re
+import time
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from .constants import CATEGORIES, PRIORITY_COLORS
+from .jobs import PROGRESS_EVERY
+from .store import changed_at
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Kích thước mỗi lần đọc khi nhập file JSON
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Các giá trị được hiểu là "đã hoàn thành" khi nhập từ Excel
+COMPLETED_VALUES = ['có', 'yes', 'true', '1', 'x', '✓', '✅']
+
+# Phần mở rộng file → loại dữ liệu nhập
+IMPORT_FORMATS = {'xlsx': "Excel", 'xls': "Excel", 'json': "JSON", 'jsonl': "JSON", 'ndjson': "JSON"}
+
+
+def read_excel(file, id_start: int, progress: Callable = None):
+    """Đọc file Excel rồi chuyển sang tasks (xem tasks_from_excel).
+
+    pd.read_excel không báo tiến độ giữa chừng nên progress chỉ được gọi
+    trước và sau khi đọc file (phần chiếm gần hết thời gian).
+    """
+    import pandas as pd
+    
+    if progress is not None:
+        progress(0.0)
+    df = pd.read_excel(file)
+    if progress is not None:
+        progress(0.9)
+    # Kiểm tra các cột bắt buộc
+    if 'Tên công việc' not in df.columns:
+        raise ValueError("File Excel thiếu cột bắt buộc: 'Tên công việc'")
+    return tasks_from_excel(df, id_start)
+
+
+def tasks_from_excel(df: 'pd.DataFrame', id_start: int):
+    """Chuyển DataFrame từ file Excel sang danh sách tasks.
+
+    Mọi cột được chuẩn hóa bằng thao tác theo cột của pandas. Trả về
+    (tasks, report) với report gồm số dòng bị bỏ qua, số giá trị phải thay
+    bằng mặc định (theo lý do) và thời gian xử lý.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    started = time.perf_counter()
+    rejected, defaulted = {}, {}
+    row_numbers = df.index.to_numpy()
+    
+    # Xử lý ID - NaN hoặc giá trị không phải số dùng id tự sinh
+    task_ids = id_start + row_numbers
+    if 'ID' in df.columns:
+        ids = pd.to_numeric(df['ID'], errors='coerce').astype('float64')
+        valid_ids = np.isfinite(ids.to_numpy())
+        task_ids = np.where(valid_ids, np.trunc(ids.to_numpy(na_value=0)), task_ids).astype('int64')
+    
+    # Xử lý tên công việc - bắt buộc
+    names = df['Tên công việc'].astype(str).str.strip()
+    keep = df['Tên công việc'].notna() & (names != '') & (names != 'nan')
+    rejected['Thiếu tên công việc'] = int((~keep).sum())
+    
+    # Xử lý trạng thái hoàn thành
+    completed = pd.Series(False, index=df.index)
+    if 'Hoàn thành' in df.columns:
+        column = df['Hoàn thành']
+        completed = column.notna() & column.astype(str).str.strip().str.lower().isin(COMPLETED_VALUES)
+    
+    def choice_column(column_name: str, choices: List[str], default: str, reason: str) -> pd.Series:
+        if column_name not in df.columns:
+            return pd.Series(default, index=df.index)
+        column = df[column_name]
+        values = column.astype(str).str.strip()
+        valid = column.notna() & values.isin(choices)
+        defaulted[reason] = int((column.notna() & ~valid)[keep].sum())
+        return values.where(valid, default)
+    
+    # Xử lý mức độ ưu tiên và danh mục
+    priorities = choice_column('Mức độ ưu tiên', list(PRIORITY_COLORS), 'Bình thường', 'Mức độ ưu tiên không hợp lệ')
+    categories = choice_column('Danh mục', CATEGORIES, 'Khác', 'Danh mục không hợp lệ')
+    
+    # Xử lý ngày hết hạn - chuỗi và ngày giờ được parse trong một lần gọi, số bị bỏ qua
+    due_dates = pd.Series(None, index=df.index, dtype=object)
+    if 'Ngày hết hạn' in df.columns:
+        column = df['Ngày hết hạn']
+        if pd.api.types.is_datetime64_any_dtype(column):
+            parsed = column
+        else:
+            parseable = column.map(lambda v: isinstance(v, (str, datetime, date)))
+            parsed = pd.to_datetime(column.where(parseable), errors='coerce', format='mixed')
+        due_dates = parsed.dt.strftime('%Y-%m-%d').astype(object).where(parsed.notna(), None)
+        defaulted['Ngày hết hạn không hợp lệ'] = int((column.notna() & parsed.isna())[keep].sum())
+    
+    if 'ID' in df.columns:
+        defaulted['ID không hợp lệ'] = int((df['ID'].notna().to_numpy() & ~valid_ids)[keep.to_numpy()].sum())
+    
+    mask = keep.to_numpy()
+    
+    # ID trùng (kể cả id tự sinh trùng với ID ghi trong file) - dòng sau nhận id mới
+    kept_ids = task_ids[mask]
+    duplicated = pd.Series(kept_ids).duplicated().to_numpy()
+    if duplicated.any():
+        fresh_start = max(int(kept_ids.max()) + 1, id_start)
+        kept_ids = kept_ids.copy()
+        kept_ids[duplicated] = np.arange(fresh_start, fresh_start + int(duplicated.sum()))
+    defaulted['ID bị trùng'] = int(duplicated.sum())
+    
+    created_at = datetime.now().isoformat()
+    tasks = [
+        {
+            'id': task_id,
+            'name': name,
+            'completed': done,
+            'priority': priority,
+            'category': category,
+            'due_date': due_date,
+            'created_at': created_at,
+            'order': order
+        }
+        for task_id, name, done, priority, category, due_date, order in zip(
+            kept_ids.tolist(),
+            names[keep].tolist(),
+            completed[keep].tolist(),
+            priorities[keep].tolist(),
+            categories[keep].tolist(),
+            due_dates[keep].tolist(),
+            row_numbers[mask].tolist()
+        )
+    ]
+    report = {
+        'rejected': {reason: count for reason, count in rejected.items() if count},
+        'defaulted': {reason: count for reason, count in defaulted.items() if count},
+        'seconds': time.perf_counter() - started
+    }
+    return tasks, report
+
+
+def format_import_report(report: Dict) -> str:
+    """Mô tả ngắn gọn kết quả nhập dữ liệu"""
+    parts = [f"⏱️ {report['seconds'] * 1000:.0f} ms"]
+    if report['rejected']:
+        parts.append("Bỏ qua: " + ", ".join(f"{reason} ({count} dòng)" for reason, count in report['rejected'].items()))
+    if report['defaulted']:
+        parts.append("Dùng giá trị mặc định: " + ", ".join(f"{reason} ({count})" for reason, count in report['defaulted'].items()))
+    return " | ".join(parts)
+
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+# Lỗi JSONDecodeError cách cuối bộ đệm không quá chừng này ký tự có thể chỉ
+# do bản ghi bị cắt ngang ở cuối khối (vd. "tru|e"), nên phải đọc thêm rồi thử lại
+_TRUNCATION_WINDOW = 16
+
+# Phần tử iter_json_records trả về thay cho một dòng NDJSON không đọc được
+MALFORMED_LINE = object()
+
+
+def iter_json_records(file, chunk_size: int = JSON_CHUNK_SIZE):
+    """Đọc lần lượt từng phần tử từ file JSON (một mảng) hoặc NDJSON.
+
+    File được đọc theo từng khối chunk_size, nên bộ nhớ dùng thêm chỉ cỡ
+    một khối cộng với bản ghi đang đọc dở. Trong file NDJSON, dòng không
+    đọc được được bỏ qua và trả về MALFORMED_LINE; trong mảng JSON thì lỗi
+    cú pháp làm dừng cả file (JSONDecodeError).
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof = '', 0, False
+    
+    def fill(size: int = chunk_size):
+        nonlocal buffer, pos, eof
+        chunk = file.read(size)
+        if isinstance(chunk, bytes):
+            text = text_decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        eof = not chunk
+        buffer = buffer[pos:] + text
+        pos = 0
+    
+    def grow():
+        """Đọc thêm ít nhất bằng phần đang đọc dở, để bản ghi dài không bị chép lại nhiều lần"""
+        fill(max(chunk_size, len(buffer) - pos))
+    
+    def peek():
+        """Ký tự khác khoảng trắng tiếp theo (None nếu hết file)"""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return None
+            fill()
+    
+    def skip_line():
+        """Bỏ qua tới hết dòng hiện tại"""
+        nonlocal pos
+        while True:
+            newline = buffer.find('\n', pos)
+            if newline >= 0:
+                pos = newline + 1
+                return
+            if eof:
+                pos = len(buffer)
+                return
+            grow()
+    
+    first = peek()
+    if first is None:
+        return
+    in_array = first == '['
+    if in_array:
+        pos += 1
+    elif first != '{':
+        raise ValueError("File JSON không đúng định dạng!")
+    
+    # Trong mảng: sau mỗi phần tử phải là ',' hoặc ']', sau ',' phải là một phần tử
+    expect_value, after_comma = True, False
+    while True:
+        char = peek()
+        if in_array:
+            if char is None:
+                raise ValueError("File JSON không đầy đủ (thiếu ']')")
+            if char == ']' and not after_comma:
+                return
+            if not expect_value:
+                if char != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expect_value = after_comma = True
+                continue
+            if char in ',]':
+                raise json.JSONDecodeError("Expecting value", buffer, pos)
+        elif char is None:
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as error:
+                truncated = (
+                    error.pos >= len(buffer) - _TRUNCATION_WINDOW
+                    or error.msg.startswith("Unterminated string")
+                )
+                if eof or not truncated:
+                    if in_array:
+                        raise
+                    value = MALFORMED_LINE
+                    break
+                grow()
+        if value is MALFORMED_LINE:
+            skip_line()
+        else:
+            pos = end
+        expect_value = after_comma = False
+        yield value
+
+
+def validate_task_record(record) -> tuple:
+    """Kiểm tra một bản ghi từ file JSON; trả về (task, None) hoặc (None, lý do)"""
+    if record is MALFORMED_LINE:
+        return None, "Dòng JSON không hợp lệ"
+    if not isinstance(record, dict):
+        return None, "Không phải object"
+    task_id = record.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        return None, "ID không hợp lệ"
+    name = record.get('name')
+    if not isinstance(name, str) or not name.strip():
+        return None, "Thiếu tên công việc"
+    if record.get('priority') not in PRIORITY_COLORS:
+        return None, "Mức độ ưu tiên không hợp lệ"
+    if record.get('category') not in CATEGORIES:
+        return None, "Danh mục không hợp lệ"
+    completed = record.get('completed', False)
+    if not isinstance(completed, bool):
+        return None, "Trạng thái hoàn thành không hợp lệ"
+    due_date = record.get('due_date')
+    if due_date is not None:
+        try:
+            datetime.fromisoformat(due_date)
+        except (TypeError, ValueError):
+            return None, "Ngày hết hạn không hợp lệ"
+    # Thiếu created_at thì để None: gộp theo id coi bản ghi đó là cùng task
+    # với task đang có (xem TaskEngine._separate_clashes), nên gộp lại cùng
+    # một file không sinh bản sao
+    created_at = record.get('created_at')
+    task = {
+        'id': task_id,
+        'name': name,
+        'completed': completed,
+        'priority': record['priority'],
+        'category': record['category'],
+        'due_date': due_date,
+        'created_at': created_at if isinstance(created_at, str) and created_at else None
+    }
+    order = record.get('order')
+    if isinstance(order, int) and not isinstance(order, bool):
+        task['order'] = order
+    updated_at = record.get('updated_at')
+    if updated_at is not None:
+        try:
+            datetime.fromisoformat(updated_at)
+        except (TypeError, ValueError):
+            return None, "Thời điểm cập nhật không hợp lệ"
+        task['updated_at'] = updated_at
+    return task, None
+
+
+def _file_size(file):
+    """Kích thước file (None nếu không seek được)"""
+    try:
+        position = file.tell()
+        size = file.seek(0, 2)
+        file.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def tasks_from_json(file, progress: Callable = None):
+    """Đọc và kiểm tra tasks từ file JSON/NDJSON trong một lượt.
+
+    Trả về (tasks, report) giống tasks_from_excel; report có thêm 'max_id'.
+    Tiến độ được tính theo vị trí đã đọc trong file.
+    """
+    started = time.perf_counter()
+    rejected = {}
+    seen_ids = set()
+    max_id = -1
+    tasks = []
+    size = _file_size(file) if progress is not None else None
+    for count, record in enumerate(iter_json_records(file)):
+        if progress is not None and not count % PROGRESS_EVERY:
+            progress(file.tell() / size if size else 0.0)
+        task, reason = validate_task_record(record)
+        if task is not None and task['id'] in seen_ids:
+            task, reason = None, "ID bị trùng"
+        if task is None:
+            rejected[reason] = rejected.get(reason, 0) + 1
+            continue
+        seen_ids.add(task['id'])
+        max_id = max(max_id, task['id'])
+        tasks.append(task)
+    report = {
+        'rejected': rejected,
+        'defaulted': {},
+        'seconds': time.perf_counter() - started,
+        'max_id': max_id
+    }
+    return tasks, report
+
+
+def latest_changes(tasks: List[Dict], deleted: List[tuple]):
+    """Chỉ giữ bản mới nhất cho mỗi id trong các task và tombstone (id, thời điểm xóa).
+
+    Cùng mốc thì bản đứng sau thắng, tombstone đứng sau mọi task. Trả về
+    (tasks, deleted, số bản ghi bị bỏ vì có bản mới hơn cùng id).
+    """
+    latest: Dict[int, tuple] = {}
+    superseded = 0
+    records = [(data['id'], changed_at(data), data) for data in tasks]
+    records += [(task_id, deleted_at, None) for task_id, deleted_at in deleted]
+    for task_id, stamp, data in records:
+        if task_id in latest:
+            superseded += 1
+            if stamp < latest[task_id][0]:
+                continue
+        latest[task_id] = (stamp, data)
+    tasks = [data for _, data in latest.values() if data is not None]
+    deleted = [(task_id, stamp) for task_id, (stamp, data) in latest.items() if data is None]
+    return tasks, deleted, superseded
+
+
+def read_changes(file, progress: Callable = None):
+    """Đọc file thay đổi (xem exporters.export_changes) hoặc file JSON/NDJSON tasks thông thường.
+
+    Trả về (tasks, deleted, report): deleted là các cặp (id, thời điểm xóa).
+    Bản ghi không hợp lệ bị bỏ qua như tasks_from_json; nhiều bản ghi cùng
+    id (ví dụ nối nhiều file thay đổi) chỉ giữ bản mới nhất (xem latest_changes).
+    """
+    started = time.perf_counter()
+    rejected = {}
+    tasks, deleted = [], []
+    
+    def add_task(record):
+        task, reason = validate_task_record(record)
+        if task is None:
+            rejected[reason] = rejected.get(reason, 0) + 1
+            return
+        tasks.append(task)
+    
+    def add_tombstone(record):
+        task_id = record.get('id') if isinstance(record, dict) else None
+        deleted_at = record.get('deleted_at') if isinstance(record, dict) else None
+        try:
+            datetime.fromisoformat(deleted_at)
+        except (TypeError, ValueError):
+            deleted_at = None
+        if not isinstance(task_id, int) or isinstance(task_id, bool) or deleted_at is None:
+            rejected["Bản ghi xóa không hợp lệ"] = rejected.get("Bản ghi xóa không hợp lệ", 0) + 1
+            return
+        deleted.append((task_id, deleted_at))
+    
+    size = _file_size(file) if progress is not None else None
+    for count, record in enumerate(iter_json_records(file)):
+        if progress is not None and not count % PROGRESS_EVERY:
+            progress(file.tell() / size if size else 0.0)
+        if isinstance(record, dict) and isinstance(record.get('tasks'), list):
+            for task_record in record['tasks']:
+                add_task(task_record)
+            for tombstone in record.get('deleted') or []:
+                add_tombstone(tombstone)
+        else:
+            add_task(record)
+    tasks, deleted, superseded = latest_changes(tasks, deleted)
+    if superseded:
+        rejected["Có bản mới hơn cùng ID"] = superseded
+    report = {
+        'rejected': rejected,
+        'defaulted': {},
+        'seconds': time.perf_counter() - started
+    }
+    return tasks, deleted, report
@@ -0,0 +1,111 @@
+"""Chạy nhập/xuất file trong thread nền, có tiến độ và hủy được"""
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Iterable
+
+# Số thread chạy việc nền (đủ để xuất nhiều định dạng cùng lúc)
+JOB_WORKERS = 4
+
+# Báo tiến độ sau mỗi chừng này phần tử
+PROGRESS_EVERY = 1000
+
+
+class JobCancelled(Exception):
+    """Được ném ra từ hàm báo tiến độ khi việc đã bị hủy"""
+
+
+def tracked(items, progress: Callable = None) -> Iterable:
+    """Duyệt items (có len), báo tiến độ 0..1 qua progress sau mỗi PROGRESS_EVERY phần tử"""
+    if progress is None:
+        return items
+    return _tracked(items, progress)
+
+
+def _tracked(items, progress: Callable):
+    total = len(items) or 1
+    for i, item in enumerate(items):
+        if not i % PROGRESS_EVERY:
+            progress(i / total)
+        yield item
+    progress(1.0)
+
+
+class Job:
+    """Một việc chạy nền: tên, tiến độ (0..1), hủy và kết quả.
+
+    Hàm chạy nền nhận report làm tham số progress; khi việc đã bị hủy,
+    lần gọi report tiếp theo ném JobCancelled nên hàm dừng ở đó.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.progress = 0.0
+        self.future: Future = None
+        self._cancel = threading.Event()
+
+    def report(self, fraction: float):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(fraction, 0.0), 1.0)
+
+    def cancel(self):
+        """Yêu cầu dừng; việc chưa bắt đầu thì không chạy nữa"""
+        self._cancel.set()
+        self.future.cancel()
+
+    @property
+    def cancel_requested(self) -> bool:
+        """Đã bấm hủy (việc có thể vẫn chạy xong nếu đã qua lần báo tiến độ cuối)"""
+        return self._cancel.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Việc đã xong và thực sự bị hủy (không chạy hoặc dừng ở JobCancelled)"""
+        if not self.done:
+            return False
+        return self.future.cancelled() or isinstance(self.future.exception(), JobCancelled)
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def error(self):
+        """Lỗi của việc đã xong (None nếu thành công hoặc đã hủy)"""
+        if not self.done or self.future.cancelled():
+            return None
+        error = self.future.exception()
+        return None if isinstance(error, JobCancelled) else error
+
+    def result(self):
+        """Kết quả (chờ nếu chưa xong); ném JobCancelled nếu đã hủy"""
+        try:
+            return self.future.result()
+        except CancelledError:
+            raise JobCancelled() from None
+
+
+class JobRunner:
+    """Pool thread dùng chung cho các việc nền"""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="todo-job")
+
+    def submit(self, label: str, function: Callable, *args, **kwargs) -> Job:
+        """Chạy function(*args, progress=job.report, **kwargs) trong pool"""
+        job = Job(label)
+        job.future = self._executor.submit(function, *args, progress=job.report, **kwargs)
+        return job
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def default_runner() -> JobRunner:
+    """JobRunner dùng chung cho cả process (tạo khi cần lần đầu)"""
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = JobRunner()
+        return _default_runner
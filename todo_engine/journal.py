@@ -0,0 +1,231 @@
+"""Lưu tasks bằng snapshot JSON cộng nhật ký (journal) chỉ ghi nối thêm"""
+import json
+import os
+import threading
+from typing import Dict, Iterator, List
+
+from .constants import TASK_COLUMNS
+from .task import Task
+
+# Số bản ghi trong journal trước khi được gộp vào snapshot (chạy nền)
+COMPACT_EVERY = 1000
+
+
+def _row(task: Dict) -> list:
+    return [task[key] for key in TASK_COLUMNS]
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def read_entries(path: str) -> Iterator[list]:
+    """Các bản ghi trong một file journal.
+
+    Dòng bị ghi dở (khi tiến trình dừng đột ngột) được bỏ qua; lần mở sau nó
+    được kết thúc bằng xuống dòng nên có thể nằm giữa file.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def apply_entry(tasks: Dict[int, Task], entry: list, deleted: Dict[int, str] = None):
+    """Áp dụng một bản ghi journal lên tasks (id → Task) và tombstone deleted (id → thời điểm xóa).
+
+    Mọi bản ghi đều gán giá trị tuyệt đối, nên áp dụng lại một đoạn journal
+    đã có trong snapshot vẫn cho cùng kết quả.
+    """
+    if deleted is None:
+        deleted = {}
+    op = entry[0]
+    if op == "i":
+        task = Task(*entry[1])
+        tasks[task.id] = task
+        deleted.pop(task.id, None)
+    elif op == "u":
+        for task_id in entry[1]:
+            task = tasks.get(task_id)
+            if task is not None:
+                task.update(entry[2])
+    elif op == "d":
+        for task_id in entry[1]:
+            tasks.pop(task_id, None)
+            if len(entry) > 2:
+                deleted[task_id] = entry[2]
+    elif op == "o":
+        for task_id, order in entry[1]:
+            task = tasks.get(task_id)
+            if task is not None:
+                task.order = order
+                if len(entry) > 2:
+                    task.updated_at = entry[2]
+    elif op == "r":
+        tasks.clear()
+        for row in entry[1]:
+            tasks[row[0]] = Task(*row)
+            deleted.pop(row[0], None)
+    else:
+        raise ValueError(f"Bản ghi journal không hợp lệ: {op!r}")
+
+
+class JournalTaskStorage:
+    """Lưu tasks trong một file snapshot JSON và một journal JSON Lines.
+
+    Mỗi thay đổi chỉ nối thêm một dòng ngắn vào journal (path), nên chi phí
+    ghi tỷ lệ với thay đổi chứ không với cả danh sách. Khi khởi động, danh
+    sách được dựng lại từ snapshot (path + '.snapshot') rồi áp dụng phần
+    journal phía sau. Sau mỗi COMPACT_EVERY bản ghi, journal được đổi tên
+    thành path + '.old' và một thread nền gộp nó vào snapshot mới, trong khi
+    các thao tác ghi tiếp tục vào journal mới.
+
+    Có cùng các hàm ghi như SQLiteTaskStorage nên dùng được làm storage của
+    TaskStore; việc lọc/sắp xếp khi đó chạy trên các chỉ mục trong bộ nhớ.
+    Tombstone của task đã xóa được giữ trong bản ghi xóa và trong snapshot.
+    """
+
+    def __init__(self, path: str, compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.old_path = path + ".old"
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._max_id = -1
+        self._entries = 0
+        self._compactor = None
+        self._tombstones: Dict[int, str] = {}
+        # Dòng cuối bị ghi dở thì xuống dòng trước để bản ghi mới không dính vào nó
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                torn = file.read(1) != b"\n"
+            if torn:
+                with open(path, 'a', encoding='utf-8') as file:
+                    file.write("\n")
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _read_state(self, paths: List[str]) -> tuple:
+        """(tasks, tombstones) sau khi áp dụng các journal paths lên snapshot"""
+        tasks, deleted = {}, {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding='utf-8') as file:
+                snapshot = json.load(file)
+            for row in snapshot['tasks']:
+                tasks[row[0]] = Task(*row)
+            deleted = {task_id: deleted_at for task_id, deleted_at in snapshot.get('deleted', [])}
+        for path in paths:
+            for entry in read_entries(path):
+                apply_entry(tasks, entry, deleted)
+        return tasks, deleted
+
+    def load_all(self) -> List[Task]:
+        """Dựng lại toàn bộ tasks theo thứ tự: snapshot + journal chưa gộp"""
+        with self._lock:
+            tasks, self._tombstones = self._read_state([self.old_path, self.path])
+            self._entries = sum(1 for _ in read_entries(self.path))
+        self._max_id = max(max(tasks, default=-1), max(self._tombstones, default=-1))
+        return sorted(tasks.values(), key=lambda t: (t.order, t.id))
+
+    def load_tombstones(self) -> Dict[int, str]:
+        """Tombstone đọc được trong lần load_all gần nhất: id → thời điểm xóa"""
+        return dict(self._tombstones)
+
+    def max_id(self) -> int:
+        """Id lớn nhất từng được ghi, tính cả tombstone (-1 nếu chưa có)"""
+        return self._max_id
+
+    def _append(self, entry: list):
+        line = _dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._entries += 1
+            full = self._entries >= self.compact_every
+        if full:
+            self.compact()
+
+    def insert(self, task: Dict):
+        self._max_id = max(self._max_id, task['id'])
+        self._append(["i", _row(task)])
+
+    def update(self, task_id: int, fields: Dict):
+        """Cập nhật một số field của một task"""
+        self.update_many([task_id], fields)
+
+    def update_many(self, task_ids: List[int], fields: Dict):
+        """Gán cùng giá trị cho một số field của nhiều task (một bản ghi)"""
+        fields = {key: value for key, value in fields.items() if key in TASK_COLUMNS and key != 'id'}
+        if fields and task_ids:
+            self._append(["u", list(task_ids), fields])
+
+    def delete(self, task_id: int, deleted_at: str = None):
+        self.delete_many([task_id], deleted_at)
+
+    def delete_many(self, task_ids: List[int], deleted_at: str = None):
+        """Xóa các task; có deleted_at thì để lại tombstone cho chúng"""
+        self._append(["d", list(task_ids), deleted_at] if deleted_at else ["d", list(task_ids)])
+
+    def update_orders(self, pairs: List[tuple], updated_at: str = None):
+        """Ghi lại 'order' cho các cặp (id, order) đã thay đổi (và updated_at nếu có)"""
+        orders = [[i, o] for i, o in pairs]
+        self._append(["o", orders, updated_at] if updated_at else ["o", orders])
+
+    def replace_all(self, tasks: List[Dict]):
+        """Thay toàn bộ dữ liệu (dùng khi nhập file); journal được gộp ngay sau đó"""
+        rows = [_row(t) for t in tasks]
+        self._max_id = max((row[0] for row in rows), default=self._max_id)
+        with self._lock:
+            self._file.write(_dumps(["r", rows]) + "\n")
+            self._file.flush()
+            self._entries += 1
+        self.compact()
+
+    def compact(self, wait: bool = False):
+        """Gộp journal vào snapshot trong thread nền (wait=True: chờ gộp xong).
+
+        Nếu đang gộp dở thì không làm gì (trừ chờ, nếu wait).
+        """
+        with self._lock:
+            if self._compactor is None:
+                # Còn file .old (lần gộp trước bị dừng giữa chừng) thì gộp nó trước
+                if not os.path.exists(self.old_path):
+                    self._file.close()
+                    os.replace(self.path, self.old_path)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                    self._entries = 0
+                self._compactor = threading.Thread(target=self._compact, name="todo-journal-compact", daemon=True)
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def _compact(self):
+        try:
+            tasks, deleted = self._read_state([self.old_path])
+            temp_path = self.snapshot_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(_dumps({
+                    'tasks': [_row(t) for t in sorted(tasks.values(), key=lambda t: (t.order, t.id))],
+                    'deleted': [[task_id, deleted_at] for task_id, deleted_at in deleted.items()]
+                }))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            os.remove(self.old_path)
+        finally:
+            with self._lock:
+                self._compactor = None
+
+    def close(self):
+        """Chờ lần gộp đang chạy (nếu có) rồi đóng file journal"""
+        with self._lock:
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._file.close()
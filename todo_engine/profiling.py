@@ -0,0 +1,94 @@
+"""Đo thời gian từng giai đoạn của một lần chạy script.
+
+Khi tắt, phase() trả về cùng một context rỗng và timed() trả lại nguyên
+iterable, nên chi phí gần như bằng không.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger("todo_engine.profiling")
+
+_NULL_CONTEXT = nullcontext()
+
+
+class PhaseTimer:
+    """Cộng dồn thời gian theo tên giai đoạn (tổng, số lần, lâu nhất).
+
+    Giai đoạn có thể lồng nhau; thời gian của giai đoạn con cũng được tính
+    trong giai đoạn cha.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self._phases: Dict[str, List[float]] = {}
+
+    def _record(self, name: str, seconds: float):
+        phase = self._phases.get(name)
+        if phase is None:
+            self._phases[name] = [seconds, 1, seconds]
+        else:
+            phase[0] += seconds
+            phase[1] += 1
+            if seconds > phase[2]:
+                phase[2] = seconds
+
+    @contextmanager
+    def _phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+
+    def phase(self, name: str):
+        """Context đo một giai đoạn"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._phase(name)
+
+    def timed(self, name: str, iterable: Iterable) -> Iterable:
+        """Duyệt iterable, đo thời gian xử lý mỗi phần tử (thân vòng lặp) như một lần của giai đoạn name"""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iterable)
+
+    def _timed(self, name: str, iterable: Iterable):
+        for item in iterable:
+            started = time.perf_counter()
+            try:
+                yield item
+            finally:
+                self._record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict:
+        """Tổng thời gian và từng giai đoạn (ms), theo thứ tự bắt đầu đo"""
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'phases': {
+                name: {'ms': round(total * 1000, 3), 'count': count, 'max_ms': round(longest * 1000, 3)}
+                for name, (total, count, longest) in self._phases.items()
+            }
+        }
+
+    def log(self, **context) -> Dict:
+        """Ghi một dòng log JSON cho lần chạy này; trả về nội dung đã ghi"""
+        record = {'event': 'rerun', **context, **self.report()}
+        logger.info(json.dumps(record, ensure_ascii=False))
+        return record
+
+
+NULL_TIMER = PhaseTimer(enabled=False)
+
+
+def configure_logging(level: int = logging.INFO):
+    """Cho log đo thời gian ra stderr (gọi nhiều lần không sao)"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
@@ -0,0 +1,96 @@
+"""Tìm kiếm theo từ, không phân biệt dấu tiếng Việt"""
+import bisect
+import re
+import sys
+import unicodedata
+from typing import Dict, List
+
+
+def _build_fold_table() -> Dict[int, str]:
+    table = {ord('đ'): 'd', ord('Đ'): 'd'}
+    for code in list(range(0x00C0, 0x0250)) + list(range(0x1E00, 0x1F00)):
+        base = ''.join(c for c in unicodedata.normalize('NFD', chr(code)) if not unicodedata.combining(c))
+        if base and base != chr(code):
+            table[code] = base.lower()
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_text(text: str) -> str:
+    """Chuyển về chữ thường và bỏ dấu tiếng Việt ("Gấp" → "gap")"""
+    return text.lower().translate(_FOLD_TABLE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Tách văn bản (đã bỏ dấu) thành các từ"""
+    return re.findall(r'\w+', fold_text(text))
+
+
+class SearchIndex:
+    """Chỉ mục tìm kiếm theo từ, cập nhật tăng dần.
+
+    Mỗi từ (đã bỏ dấu) trỏ tới tập id chứa nó; danh sách từ được giữ có thứ
+    tự để tìm theo tiền tố bằng bisect.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, set] = {}
+        self._vocab: List[str] = []
+        # Tuple thay vì set (nhỏ hơn nhiều, chỉ cần duyệt khi xóa); các từ
+        # được intern nên mọi task dùng chung một chuỗi cho cùng một từ
+        self._doc_tokens: Dict[int, tuple] = {}
+
+    def add(self, task_id: int, text: str):
+        tokens = set(map(sys.intern, tokenize(text)))
+        self._doc_tokens[task_id] = tuple(tokens)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                bisect.insort(self._vocab, token)
+            ids.add(task_id)
+
+    def remove(self, task_id: int):
+        for token in self._doc_tokens.pop(task_id, ()):
+            ids = self._postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def update(self, task_id: int, text: str):
+        self.remove(task_id)
+        self.add(task_id, text)
+
+    def rebuild(self, tasks: List[Dict]):
+        self._postings = {}
+        self._doc_tokens = {}
+        for task in tasks:
+            tokens = set(map(sys.intern, tokenize(task['name'])))
+            self._doc_tokens[task['id']] = tuple(tokens)
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(task['id'])
+        self._vocab = sorted(self._postings)
+
+    def _prefix_ids(self, prefix: str) -> set:
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + '\U0010ffff', start)
+        if end - start == 1:
+            return self._postings[self._vocab[start]]
+        result = set()
+        for token in self._vocab[start:end]:
+            result |= self._postings[token]
+        return result
+
+    def search(self, query: str):
+        """Trả về tập id có mọi từ trong query là tiền tố của một từ trong tên.
+
+        Trả về None nếu query không có từ nào để tra.
+        """
+        words = tokenize(query)
+        if not words:
+            return None
+        matches = sorted((self._prefix_ids(word) for word in set(words)), key=len)
+        return matches[0].intersection(*matches[1:])
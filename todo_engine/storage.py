@@ -0,0 +1,181 @@
+"""Lưu trữ tasks bằng SQLite"""
+import json
+import sqlite3
+import threading
+from typing import Dict, List
+
+from .constants import PRIORITY_ORDER, TASK_COLUMNS
+from .task import Task
+
+
+class SQLiteTaskStorage:
+    """Lưu trữ tasks trong file SQLite (chế độ WAL).
+
+    Mỗi thao tác chỉ ghi các dòng bị thay đổi; lọc và sắp xếp danh sách
+    chính được thực hiện bằng SQL. Task bị xóa để lại một tombstone
+    (id, thời điểm xóa) trong bảng deleted để xuất thay đổi được cả việc xóa.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            priority TEXT NOT NULL,
+            category TEXT NOT NULL,
+            due_date TEXT,
+            created_at TEXT,
+            "order" INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS deleted (
+            id INTEGER PRIMARY KEY,
+            deleted_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed_order ON tasks (completed, "order");
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed_due_date ON tasks (completed, due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks ("order");
+    """
+
+    SORT_SQL = {
+        "Thứ tự thêm": '"order"',
+        "Mức độ ưu tiên": "CASE priority " + " ".join(
+            f"WHEN '{p}' THEN {rank}" for p, rank in PRIORITY_ORDER.items()
+        ) + f" ELSE {len(PRIORITY_ORDER)} END",
+        "Ngày hết hạn": "due_date IS NULL, due_date",
+        "Tên (A-Z)": "py_lower(name)",
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("py_lower", 1, lambda v: v.lower() if v else v, deterministic=True)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        # File tạo trước khi có cột updated_at
+        if 'updated_at' not in {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}:
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN updated_at TEXT")
+
+    @staticmethod
+    def _row(task: Dict) -> tuple:
+        return (
+            task['id'], task['name'], int(bool(task.get('completed'))), task.get('priority'),
+            task.get('category'), task.get('due_date'), task.get('created_at'), task.get('order', 0),
+            task.get('updated_at')
+        )
+
+    def load_all(self) -> List[Task]:
+        """Đọc toàn bộ tasks theo thứ tự"""
+        with self._lock:
+            rows = self.conn.execute('SELECT * FROM tasks ORDER BY "order", id').fetchall()
+        return [Task(row[0], row[1], bool(row[2]), *row[3:]) for row in rows]
+
+    def max_id(self) -> int:
+        """Id lớn nhất đang có, tính cả tombstone (-1 nếu chưa có)"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT MAX(COALESCE((SELECT MAX(id) FROM tasks), -1), "
+                "COALESCE((SELECT MAX(id) FROM deleted), -1))"
+            ).fetchone()[0]
+
+    def load_tombstones(self) -> Dict[int, str]:
+        """Tombstone của các task đã xóa: id → thời điểm xóa"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT id, deleted_at FROM deleted").fetchall())
+
+    def insert(self, task: Dict):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._row(task))
+            self.conn.execute("DELETE FROM deleted WHERE id = ?", (task['id'],))
+
+    def update(self, task_id: int, fields: Dict):
+        """Cập nhật một số cột của một task"""
+        columns = [key for key in fields if key in TASK_COLUMNS and key != 'id']
+        if not columns:
+            return
+        values = [int(fields[c]) if c == 'completed' else fields[c] for c in columns]
+        assignments = ", ".join(f'"{c}" = ?' for c in columns)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*values, task_id))
+
+    def update_many(self, task_ids: List[int], fields: Dict):
+        """Gán cùng giá trị cho một số cột của nhiều task trong một transaction"""
+        columns = [key for key in fields if key in TASK_COLUMNS and key != 'id']
+        if not columns or not task_ids:
+            return
+        values = [int(fields[c]) if c == 'completed' else fields[c] for c in columns]
+        assignments = ", ".join(f'"{c}" = ?' for c in columns)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"UPDATE tasks SET {assignments} WHERE id = ?", [(*values, task_id) for task_id in task_ids]
+            )
+
+    def delete(self, task_id: int, deleted_at: str = None):
+        self.delete_many([task_id], deleted_at)
+
+    def delete_many(self, task_ids: List[int], deleted_at: str = None):
+        """Xóa các task; có deleted_at thì để lại tombstone cho chúng"""
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+            if deleted_at:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO deleted VALUES (?, ?)", [(task_id, deleted_at) for task_id in task_ids]
+                )
+
+    def update_orders(self, pairs: List[tuple], updated_at: str = None):
+        """Ghi lại 'order' cho các cặp (id, order) đã thay đổi (và updated_at nếu có)"""
+        with self._lock, self.conn:
+            if updated_at:
+                self.conn.executemany(
+                    'UPDATE tasks SET "order" = ?, updated_at = ? WHERE id = ?', [(o, updated_at, i) for i, o in pairs]
+                )
+            else:
+                self.conn.executemany('UPDATE tasks SET "order" = ? WHERE id = ?', [(o, i) for i, o in pairs])
+
+    def replace_all(self, tasks: List[Dict]):
+        """Thay toàn bộ dữ liệu (dùng khi nhập file)"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._row(t) for t in tasks)
+            )
+            self.conn.execute("DELETE FROM deleted WHERE id IN (SELECT id FROM tasks)")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def query_ids(self, filter_status: str, filter_priority: str, filter_category: str,
+                  sort_option: str, candidate_ids: set = None) -> List[int]:
+        """Lọc và sắp xếp bằng SQL, trả về danh sách id theo thứ tự hiển thị.
+
+        candidate_ids (nếu có) giới hạn kết quả trong các id tìm được từ
+        SearchIndex.
+        """
+        where, params = [], []
+        if filter_status == "Đang làm":
+            where.append("completed = 0")
+        elif filter_status == "Đã hoàn thành":
+            where.append("completed = 1")
+        if filter_priority != "Tất cả":
+            where.append("priority = ?")
+            params.append(filter_priority)
+        if filter_category != "Tất cả":
+            where.append("category = ?")
+            params.append(filter_category)
+        if candidate_ids is not None:
+            where.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(candidate_ids)))
+        sql = "SELECT id FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f' ORDER BY completed, {self.SORT_SQL.get(sort_option, self.SORT_SQL["Thứ tự thêm"])}, "order"'
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
@@ -0,0 +1,698 @@
+"""Danh sách tasks trong bộ nhớ cùng các chỉ mục của nó"""
+import bisect
+from collections import Counter
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from .constants import NO_DUE_DATE, ORDER_GAP, PRIORITY_ORDER, SORT_OPTIONS, TASK_COLUMNS
+from .search import SearchIndex
+from .storage import SQLiteTaskStorage
+from .task import Task
+
+
+def parse_sort_keys(task: Dict) -> tuple:
+    """Khóa sắp xếp đã tính sẵn: (ngày hết hạn dạng ordinal, tên chữ thường, hạng ưu tiên)"""
+    # Task lưu sẵn ngày hết hạn dạng ordinal; chỉ phải parse các giá trị khác
+    due = task.due_ordinal if isinstance(task, Task) else None
+    if due is None:
+        due = NO_DUE_DATE
+        if task.get('due_date'):
+            try:
+                due = datetime.fromisoformat(task['due_date']).date().toordinal()
+            except (TypeError, ValueError):
+                pass
+    return (due, task['name'].lower(), PRIORITY_ORDER.get(task.get('priority'), 3))
+
+
+def changed_at(task: Dict) -> str:
+    """Thời điểm thay đổi gần nhất của task (task cũ chưa có updated_at thì lấy created_at)"""
+    return task.get('updated_at') or task.get('created_at') or ""
+
+
+class SortedIdView(Sequence):
+    """Dãy id chỉ đọc trên một sorted view, cắt lát không sao chép cả danh sách"""
+
+    def __init__(self, entries: List[tuple]):
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [entry[-1] for entry in self._entries[index]]
+        return self._entries[index][-1]
+
+
+class TaskStore:
+    """Danh sách tasks có thứ tự, kèm chỉ mục id → task.
+
+    Thứ tự được quyết định bởi field 'order': các khóa nguyên tăng dần, cách
+    nhau ORDER_GAP. Thêm hoặc di chuyển một task chỉ gán cho nó một khóa mới
+    nằm giữa hai task kề bên, nên không task nào khác bị ghi lại; khi hết chỗ
+    trống thì một đoạn nhỏ quanh đó được giãn cách lại. Vị trí của
+    task được tìm bằng bisect trên danh sách khóa.
+
+    Nếu có storage, mọi thay đổi được ghi xuống đó. Chỉ mục tìm kiếm theo
+    tên, các sorted view (một view cho mỗi cách sắp xếp trong SORT_OPTIONS),
+    chỉ mục ngày hết hạn và bộ đếm thống kê được cập nhật tăng dần cùng mọi
+    thay đổi.
+
+    Mỗi thay đổi gán cho các task bị đổi một mốc updated_at tăng dần; task
+    bị xóa để lại tombstone (id → thời điểm xóa). Cả hai được giữ trong
+    danh sách có thứ tự theo mốc, nên changes_since chỉ tốn O(số thay đổi).
+    """
+
+    # Các field làm thay đổi vị trí của task trong sorted view
+    VIEW_FIELDS = ('completed', 'order', 'name', 'priority', 'due_date')
+    # Các field ảnh hưởng tới bộ đếm thống kê
+    STATS_FIELDS = ('completed', 'priority', 'category', 'due_date')
+    # Các field không sửa được bằng update: id là khóa của chỉ mục, 'order'
+    # quyết định vị trí nên chỉ được đổi qua move / move_block / move_to_orders
+    FIXED_FIELDS = ('id', 'order')
+
+    def __init__(self, tasks: List[Dict] = None, storage: SQLiteTaskStorage = None, deleted: Dict[int, str] = None):
+        self.tasks: List[Dict] = []
+        self._by_id: Dict[int, Dict] = {}
+        self._orders: List[int] = []
+        self.search_index = SearchIndex()
+        self._sort_keys: Dict[int, tuple] = {}
+        self._views: Dict[str, List[tuple]] = {option: [] for option in SORT_OPTIONS}
+        # Số task theo (danh mục, mức độ ưu tiên, đã hoàn thành)
+        self._counts: Counter = Counter()
+        # Ngày hết hạn (ordinal) của các task chưa hoàn thành, có thứ tự
+        self._pending_due: List[int] = []
+        # (ngày hết hạn dạng ordinal, id) của mọi task có ngày hết hạn, có thứ tự
+        self._due_index: List[tuple] = []
+        # (mốc thay đổi, id) của mọi task, và tombstone id → thời điểm xóa cùng (thời điểm xóa, id), có thứ tự
+        self._changed_index: List[tuple] = []
+        self._deleted: Dict[int, str] = dict(deleted or {})
+        self._deleted_index: List[tuple] = sorted((at, i) for i, at in self._deleted.items())
+        # Mốc thay đổi lớn nhất đã có; mốc mới luôn lớn hơn nó
+        self.last_changed = max(self._deleted.values(), default="")
+        self.storage = storage
+        # Tăng sau mỗi thay đổi, dùng làm khóa cache cho dữ liệu dẫn xuất
+        self.version = 0
+        if tasks and self._index(tasks) and storage:
+            storage.update_orders([(t.id, t.order) for t in self.tasks])
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._by_id
+
+    def _index(self, tasks: List[Dict]) -> bool:
+        """Dựng lại chỉ mục trong một lượt; trả về True nếu phải đánh lại 'order'.
+
+        Các dict được chuyển thành Task (xem Task.from_dict); từ đó trở đi
+        store đọc/ghi thẳng thuộc tính của Task. ID trùng bị từ chối bằng
+        ValueError trước khi store bị thay đổi.
+        """
+        tasks = [Task.from_dict(t) for t in tasks]
+        by_id = {t.id: t for t in tasks}
+        if len(by_id) != len(tasks):
+            raise ValueError("Danh sách công việc có ID bị trùng!")
+        self.tasks = tasks
+        self._by_id = by_id
+        renumber = False
+        previous = None
+        for task in self.tasks:
+            order = task.order
+            if not isinstance(order, int) or (previous is not None and order <= previous):
+                renumber = True
+                break
+            previous = order
+        if renumber:
+            for idx, task in enumerate(self.tasks):
+                task.order = idx * ORDER_GAP
+        self._orders = [t.order for t in self.tasks]
+        self.search_index.rebuild(self.tasks)
+        self._sort_keys = {t.id: parse_sort_keys(t) for t in self.tasks}
+        self._rebuild_views()
+        self._rebuild_stats()
+        self._rebuild_due_index()
+        self._changed_index = sorted((changed_at(t), t.id) for t in self.tasks)
+        if self._changed_index:
+            self.last_changed = max(self.last_changed, self._changed_index[-1][0])
+        return renumber
+
+    def _rebuild_stats(self):
+        self._counts = Counter((t.category, t.priority, t.completed) for t in self.tasks)
+        self._pending_due = sorted(
+            self._sort_keys[t.id][0] for t in self.tasks
+            if not t.completed and self._sort_keys[t.id][0] != NO_DUE_DATE
+        )
+
+    def _rebuild_due_index(self):
+        self._due_index = sorted(
+            (due, task_id) for task_id, (due, _, _) in self._sort_keys.items() if due != NO_DUE_DATE
+        )
+
+    def _rebuild_views(self):
+        entries = [self._view_entries(t) for t in self.tasks]
+        for option, column in zip(SORT_OPTIONS, zip(*entries) if entries else [()] * len(SORT_OPTIONS)):
+            self._views[option] = sorted(column)
+
+    def _rebalance(self, index: int):
+        """Giãn cách lại khóa 'order' quanh vị trí index.
+
+        Cửa sổ được mở rộng gấp đôi cho tới khi đủ chỗ để các khóa trong đó
+        cách nhau ít nhất ORDER_GAP / 8, nên thường chỉ vài task bị ghi lại.
+        """
+        size = 2
+        while True:
+            lo, hi = max(0, index - size), min(len(self.tasks), index + size)
+            before = self._orders[lo - 1] if lo > 0 else None
+            after = self._orders[hi] if hi < len(self.tasks) else None
+            count = hi - lo
+            if before is None:
+                step = ORDER_GAP
+                start = 0 if after is None else after - count * step
+            elif after is None:
+                step = ORDER_GAP
+                start = before + step
+            else:
+                step = (after - before) // (count + 1)
+                start = before + step
+            if step >= ORDER_GAP // 8:
+                break
+            size *= 2
+        
+        window = self.tasks[lo:hi]
+        if count > len(self.tasks) // 2:
+            for i, task in enumerate(window):
+                task.order = start + i * step
+            self._rebuild_views()
+        else:
+            for i, task in enumerate(window):
+                self._views_remove(task)
+                task.order = start + i * step
+                self._views_add(task)
+        self._orders[lo:hi] = [t.order for t in window]
+        # Khóa mới phải tới được nơi khác khi đồng bộ, nên các task này cũng được tính là đã đổi
+        stamp = self._stamp()
+        for task in window:
+            self._touch(task, stamp)
+        if self.storage:
+            self.storage.update_orders([(t.id, t.order) for t in window], stamp)
+
+    def _order_at(self, index: int) -> int:
+        """Khóa 'order' cho một task sắp được chèn vào vị trí index"""
+        if not self._orders:
+            return 0
+        if index <= 0:
+            return self._orders[0] - ORDER_GAP
+        if index >= len(self._orders):
+            return self._orders[-1] + ORDER_GAP
+        before, after = self._orders[index - 1], self._orders[index]
+        if after - before < 2:
+            self._rebalance(index)
+            before, after = self._orders[index - 1], self._orders[index]
+        return (before + after) // 2
+
+    def _view_entries(self, task: Dict) -> tuple:
+        """Khóa của task trong từng sorted view, theo thứ tự SORT_OPTIONS"""
+        due, name, rank = self._sort_keys[task.id]
+        completed, order, task_id = task.completed, task.order, task.id
+        return (
+            (completed, order, task_id),
+            (completed, rank, order, task_id),
+            (completed, due, order, task_id),
+            (completed, name, order, task_id),
+        )
+
+    def _views_add(self, task: Dict):
+        for option, entry in zip(SORT_OPTIONS, self._view_entries(task)):
+            bisect.insort(self._views[option], entry)
+
+    def _views_remove(self, task: Dict):
+        for option, entry in zip(SORT_OPTIONS, self._view_entries(task)):
+            view = self._views[option]
+            del view[bisect.bisect_left(view, entry)]
+
+    def _due_add(self, task: Dict):
+        due = self._sort_keys[task.id][0]
+        if due != NO_DUE_DATE:
+            bisect.insort(self._due_index, (due, task.id))
+
+    def _due_remove(self, task: Dict):
+        due = self._sort_keys[task.id][0]
+        if due != NO_DUE_DATE:
+            del self._due_index[bisect.bisect_left(self._due_index, (due, task.id))]
+
+    def _changed_remove(self, task: Dict):
+        del self._changed_index[bisect.bisect_left(self._changed_index, (changed_at(task), task.id))]
+
+    def _touch(self, task: Dict, stamp: str):
+        """Gán mốc thay đổi mới cho một task đang có trong chỉ mục"""
+        self._changed_remove(task)
+        task.updated_at = stamp
+        bisect.insort(self._changed_index, (stamp, task.id))
+
+    def _stamp(self, updated_at: str = None) -> str:
+        """Mốc cho một thay đổi: updated_at nếu có (thay đổi gộp từ nơi khác), không thì thời điểm hiện tại.
+
+        Mốc hiện tại luôn lớn hơn mọi mốc đã có, kể cả khi đồng hồ lùi.
+        """
+        if updated_at:
+            self.last_changed = max(self.last_changed, updated_at)
+            return updated_at
+        stamp = datetime.now().isoformat(timespec='microseconds')
+        if stamp <= self.last_changed:
+            try:
+                stamp = (datetime.fromisoformat(self.last_changed) + timedelta(microseconds=1)).isoformat(
+                    timespec='microseconds'
+                )
+            except ValueError:
+                stamp = self.last_changed + "0"
+        self.last_changed = stamp
+        return stamp
+
+    def _tombstone(self, task_ids, deleted_at: str):
+        for task_id in task_ids:
+            self._untombstone(task_id)
+            self._deleted[task_id] = deleted_at
+            bisect.insort(self._deleted_index, (deleted_at, task_id))
+
+    def _untombstone(self, task_id: int):
+        deleted_at = self._deleted.pop(task_id, None)
+        if deleted_at is not None:
+            del self._deleted_index[bisect.bisect_left(self._deleted_index, (deleted_at, task_id))]
+
+    def _stats_add(self, task: Dict):
+        self._counts[(task.category, task.priority, task.completed)] += 1
+        due = self._sort_keys[task.id][0]
+        if not task.completed and due != NO_DUE_DATE:
+            bisect.insort(self._pending_due, due)
+
+    def _stats_remove(self, task: Dict):
+        key = (task.category, task.priority, task.completed)
+        self._counts[key] -= 1
+        if not self._counts[key]:
+            del self._counts[key]
+        due = self._sort_keys[task.id][0]
+        if not task.completed and due != NO_DUE_DATE:
+            del self._pending_due[bisect.bisect_left(self._pending_due, due)]
+
+    def load(self, tasks: List[Dict]):
+        """Thay toàn bộ danh sách (dùng khi nhập file).
+
+        Mọi task nhận cùng một mốc thay đổi mới; task cũ không còn trong
+        danh sách để lại tombstone.
+        """
+        stamp = self._stamp()
+        removed = set(self._by_id)
+        self._index(tasks)
+        for task in self.tasks:
+            task.updated_at = stamp
+        self._changed_index = sorted((stamp, task_id) for task_id in self._by_id)
+        removed.difference_update(self._by_id)
+        for task_id in self._by_id:
+            self._untombstone(task_id)
+        self._tombstone(removed, stamp)
+        self.version += 1
+        if self.storage:
+            self.storage.replace_all(self.tasks)
+            if removed:
+                self.storage.delete_many(list(removed), stamp)
+
+    def get(self, task_id: int):
+        """Lấy task theo id (None nếu không có)"""
+        return self._by_id.get(task_id)
+
+    def index_of(self, task_id: int):
+        """Vị trí của task trong danh sách (None nếu không có)"""
+        task = self._by_id.get(task_id)
+        if task is None:
+            return None
+        return bisect.bisect_left(self._orders, task.order)
+
+    def search(self, query: str) -> set:
+        """Tập id có tên khớp query (xem SearchIndex.search).
+
+        Query không chứa từ nào (chỉ có ký tự đặc biệt) được so khớp chuỗi con.
+        """
+        ids = self.search_index.search(query)
+        if ids is None:
+            query = query.lower()
+            ids = {t.id for t in self.tasks if query in t.name.lower()}
+        return ids
+
+    def max_id(self) -> int:
+        """Id lớn nhất trong danh sách và tombstone (-1 nếu chưa có)"""
+        return max(max(self._by_id, default=-1), max(self._deleted, default=-1))
+
+    def deleted_at(self, task_id: int):
+        """Thời điểm xóa của task đã bị xóa (None nếu không có tombstone)"""
+        return self._deleted.get(task_id)
+
+    def changes_since(self, since: str = None) -> tuple:
+        """(mốc, tasks, tombstones) của các thay đổi có mốc sau since (None = tất cả).
+
+        mốc là last_changed lúc gọi, dùng làm since cho lần sau; tasks theo
+        mốc tăng dần, tombstones là các cặp (id, thời điểm xóa).
+        """
+        if since is None:
+            lo = deleted_lo = 0
+        else:
+            lo = bisect.bisect_right(self._changed_index, (since, float('inf')))
+            deleted_lo = bisect.bisect_right(self._deleted_index, (since, float('inf')))
+        return (
+            self.last_changed,
+            [self._by_id[task_id] for _, task_id in self._changed_index[lo:]],
+            [(task_id, deleted_at) for deleted_at, task_id in self._deleted_index[deleted_lo:]]
+        )
+
+    def rows(self, task_ids) -> List[Dict]:
+        """Bản sao dict của các task theo task_ids (bỏ qua id không còn).
+
+        Mỗi dict có thêm 'index' (vị trí trong danh sách) và 'due' (ngày hết
+        hạn dạng ordinal, xem due_ordinal) để hiển thị không phải đọc lại store.
+        """
+        rows = []
+        for task_id in task_ids:
+            task = self._by_id.get(task_id)
+            if task is not None:
+                row = task.to_dict()
+                row['index'] = bisect.bisect_left(self._orders, task.order)
+                row['due'] = self.due_ordinal(task_id)
+                rows.append(row)
+        return rows
+
+    def due_ordinal(self, task_id: int):
+        """Ngày hết hạn của task dạng ordinal (None nếu không có hoặc không đọc được)"""
+        keys = self._sort_keys.get(task_id)
+        return None if keys is None or keys[0] == NO_DUE_DATE else keys[0]
+
+    def _due_slice(self, start: int = None, end: int = None) -> tuple:
+        lo = 0 if start is None else bisect.bisect_left(self._due_index, (start,))
+        hi = len(self._due_index) if end is None else bisect.bisect_left(self._due_index, (end + 1,))
+        return lo, max(lo, hi)
+
+    def due_ids(self, start: int = None, end: int = None) -> set:
+        """Tập id có ngày hết hạn (ordinal) trong [start, end]; None = không giới hạn"""
+        lo, hi = self._due_slice(start, end)
+        return {task_id for _, task_id in self._due_index[lo:hi]}
+
+    def due_count(self, start: int = None, end: int = None) -> int:
+        """Số task có ngày hết hạn trong [start, end], không cần duyệt danh sách"""
+        lo, hi = self._due_slice(start, end)
+        return hi - lo
+
+    def count(self, category: str = None, priority: str = None, completed: bool = None) -> int:
+        """Số task khớp các điều kiện (None = không lọc), đọc từ bộ đếm"""
+        return sum(
+            n for (c, p, done), n in self._counts.items()
+            if (category is None or c == category)
+            and (priority is None or p == priority)
+            and (completed is None or done == completed)
+        )
+
+    def count_table(self) -> Dict[tuple, tuple]:
+        """(danh mục, mức độ ưu tiên) → (số đã hoàn thành, tổng số), đọc từ bộ đếm"""
+        table = {}
+        for (category, priority, done), n in self._counts.items():
+            completed, total = table.get((category, priority), (0, 0))
+            table[category, priority] = (completed + n if done else completed, total + n)
+        return table
+
+    def stats(self, today: date = None) -> Dict:
+        """Thống kê tổng quát, không phụ thuộc vào số lượng task"""
+        today = (today or date.today()).toordinal()
+        total = len(self.tasks)
+        completed = self.count(completed=True)
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': total - completed,
+            'overdue': bisect.bisect_left(self._pending_due, today),
+            'due_today': bisect.bisect_right(self._pending_due, today) - bisect.bisect_left(self._pending_due, today),
+            'completion_rate': completed / total if total else 0.0
+        }
+
+    def sorted_ids(self, sort_option: str) -> SortedIdView:
+        """Tất cả id theo cách sắp xếp sort_option (chưa hoàn thành trước)"""
+        return SortedIdView(self._views[sort_option])
+
+    def sort_ids(self, task_ids, sort_option: str) -> List[int]:
+        """Sắp xếp một tập id nhỏ theo sort_option bằng khóa đã tính sẵn"""
+        column = SORT_OPTIONS.index(sort_option)
+        return [entry[-1] for entry in sorted(self._view_entries(self._by_id[i])[column] for i in task_ids)]
+
+    def append(self, task: Dict) -> Task:
+        """Thêm task (dict hoặc Task) vào cuối danh sách"""
+        return self.insert(task, len(self.tasks))
+
+    def insert(self, task: Dict, index: int, updated_at: str = None) -> Task:
+        """Chèn task (dict hoặc Task) vào vị trí index, chỉ task đó nhận khóa 'order' mới"""
+        index = max(0, min(index, len(self.tasks)))
+        return self._insert(Task.from_dict(task), index, None, updated_at)
+
+    def insert_ordered(self, task: Dict, updated_at: str = None) -> Task:
+        """Chèn task theo khóa 'order' sẵn có của nó (task gộp từ nơi khác).
+
+        Khóa được giữ nguyên nếu chưa có task nào dùng, không thì task nhận
+        một khóa mới ngay trước task đang giữ khóa đó.
+        """
+        task = Task.from_dict(task)
+        order = task.order
+        if not isinstance(order, int):
+            return self.insert(task, len(self.tasks), updated_at)
+        index = bisect.bisect_left(self._orders, order)
+        if index < len(self._orders) and self._orders[index] == order:
+            order = None
+        return self._insert(task, index, order, updated_at)
+
+    def _insert(self, task: Task, index: int, order: int, updated_at: str) -> Task:
+        """Chèn task vào vị trí index với khóa order (None = khóa mới giữa hai task kề bên).
+
+        ID đã có trong danh sách bị từ chối bằng ValueError trước khi store
+        (và storage) bị thay đổi.
+        """
+        if task.id in self._by_id:
+            raise ValueError(f"Công việc có ID {task.id} đã tồn tại!")
+        if order is None:
+            order = self._order_at(index)
+        task.order = order
+        task.updated_at = self._stamp(updated_at)
+        self._by_id[task.id] = task
+        self.tasks.insert(index, task)
+        self._orders.insert(index, task.order)
+        self.version += 1
+        self.search_index.add(task.id, task.name)
+        self._sort_keys[task.id] = parse_sort_keys(task)
+        self._views_add(task)
+        self._stats_add(task)
+        self._due_add(task)
+        bisect.insort(self._changed_index, (task.updated_at, task.id))
+        self._untombstone(task.id)
+        if self.storage:
+            self.storage.insert(task)
+        return task
+
+    def _check_fields(self, fields: Dict):
+        """ValueError nếu fields có field không sửa được, KeyError nếu có field lạ.
+
+        Kiểm tra trước khi store bị thay đổi: _apply gỡ task khỏi các chỉ mục
+        trước khi ghi, nên lỗi giữa chừng sẽ làm task biến mất khỏi chỉ mục.
+        """
+        fixed = [key for key in self.FIXED_FIELDS if key in fields]
+        if fixed:
+            raise ValueError(f"Không thể sửa trực tiếp field {', '.join(fixed)} của công việc!")
+        unknown = [key for key in fields if key not in TASK_COLUMNS]
+        if unknown:
+            raise KeyError(unknown[0])
+
+    def update(self, task_id: int, **fields):
+        """Cập nhật các field của task (updated_at mặc định là thời điểm hiện tại)"""
+        self._check_fields(fields)
+        task = self._by_id.get(task_id)
+        if task is None:
+            return None
+        fields['updated_at'] = self._stamp(fields.get('updated_at'))
+        self._apply(task, fields)
+        self.version += 1
+        if self.storage:
+            self.storage.update(task_id, fields)
+        return task
+
+    def update_many(self, task_ids, **fields) -> int:
+        """Gán cùng các field cho nhiều task: một lần tăng version, một transaction"""
+        self._check_fields(fields)
+        tasks = [t for t in map(self._by_id.get, task_ids) if t is not None]
+        if not tasks:
+            return 0
+        fields['updated_at'] = self._stamp(fields.get('updated_at'))
+        for task in tasks:
+            self._apply(task, fields)
+        self.version += 1
+        if self.storage:
+            self.storage.update_many([t.id for t in tasks], fields)
+        return len(tasks)
+
+    def _apply(self, task: Dict, fields: Dict):
+        """Ghi fields vào task và cập nhật các chỉ mục liên quan"""
+        task_id = task.id
+        resort = any(key in fields for key in self.VIEW_FIELDS)
+        recount = any(key in fields for key in self.STATS_FIELDS)
+        redue = 'due_date' in fields
+        restamp = 'updated_at' in fields
+        if resort:
+            self._views_remove(task)
+        if recount:
+            self._stats_remove(task)
+        if redue:
+            self._due_remove(task)
+        if restamp:
+            self._changed_remove(task)
+        task.update(fields)
+        if 'name' in fields:
+            self.search_index.update(task_id, task.name)
+        if resort:
+            self._sort_keys[task_id] = parse_sort_keys(task)
+            self._views_add(task)
+        if recount:
+            self._stats_add(task)
+        if redue:
+            self._due_add(task)
+        if restamp:
+            bisect.insort(self._changed_index, (changed_at(task), task_id))
+
+    def remove(self, task_id: int, deleted_at: str = None):
+        """Xóa task và để lại tombstone; các task còn lại giữ nguyên khóa 'order'"""
+        index = self.index_of(task_id)
+        if index is None:
+            return None
+        stamp = self._stamp(deleted_at)
+        task = self.tasks.pop(index)
+        del self._orders[index]
+        del self._by_id[task_id]
+        self._views_remove(task)
+        self._stats_remove(task)
+        self._due_remove(task)
+        self._changed_remove(task)
+        del self._sort_keys[task_id]
+        self._tombstone([task_id], stamp)
+        self.version += 1
+        self.search_index.remove(task_id)
+        if self.storage:
+            self.storage.delete(task_id, stamp)
+        return task
+
+    def remove_many(self, task_ids, deleted_at: str = None) -> int:
+        """Xóa nhiều task trong một lượt duyệt danh sách"""
+        ids = {i for i in task_ids if i in self._by_id}
+        if not ids:
+            return 0
+        stamp = self._stamp(deleted_at)
+        # Xóa nhiều thì dựng lại view/thống kê nhanh hơn gỡ từng task
+        rebuild = len(ids) * 8 > len(self.tasks)
+        for task_id in ids:
+            task = self._by_id.pop(task_id)
+            if not rebuild:
+                self._views_remove(task)
+                self._stats_remove(task)
+                self._due_remove(task)
+                self._changed_remove(task)
+            del self._sort_keys[task_id]
+            self.search_index.remove(task_id)
+        self.tasks = [t for t in self.tasks if t.id not in ids]
+        self._orders = [t.order for t in self.tasks]
+        if rebuild:
+            self._rebuild_views()
+            self._rebuild_stats()
+            self._rebuild_due_index()
+            self._changed_index = sorted((changed_at(t), t.id) for t in self.tasks)
+        self._tombstone(ids, stamp)
+        self.version += 1
+        if self.storage:
+            self.storage.delete_many(list(ids), stamp)
+        return len(ids)
+
+    def move(self, old_index: int, new_index: int, updated_at: str = None):
+        """Di chuyển task từ old_index sang new_index, chỉ đổi khóa của task đó"""
+        task = self.tasks.pop(old_index)
+        del self._orders[old_index]
+        self._views_remove(task)
+        self._place(task, new_index, self._order_at(new_index), updated_at)
+
+    def move_to_orders(self, moves: List[tuple]) -> int:
+        """Đưa các task tới chỗ của khóa 'order' cho trước (thay đổi gộp từ nơi khác).
+
+        moves là các bộ (id, order, updated_at). Các task được gỡ ra hết rồi
+        mới chèn lại, nên khóa của chúng không vướng nhau; khóa đã có task
+        khác giữ thì task nhận một khóa mới ngay trước task đó.
+        """
+        placed = []
+        for task_id, order, updated_at in moves:
+            task = self._by_id.get(task_id)
+            if task is not None:
+                index = self.index_of(task_id)
+                del self.tasks[index]
+                del self._orders[index]
+                self._views_remove(task)
+                placed.append((order, task, updated_at))
+        if not placed:
+            return 0
+        for order, task, updated_at in sorted(placed, key=lambda entry: entry[0]):
+            index = bisect.bisect_left(self._orders, order)
+            if index < len(self._orders) and self._orders[index] == order:
+                order = self._order_at(index)
+            task.order = order
+            self.tasks.insert(index, task)
+            self._orders.insert(index, order)
+            self._views_add(task)
+            self._touch(task, self._stamp(updated_at))
+        self.version += 1
+        if self.storage:
+            # Ghi theo mốc cuối cùng của từng task (task đã chèn có thể bị giãn cách lại ở lượt sau)
+            stamped: Dict[str, List[tuple]] = {}
+            for _, task, _ in placed:
+                stamped.setdefault(task.updated_at, []).append((task.id, task.order))
+            for stamp, pairs in stamped.items():
+                self.storage.update_orders(pairs, stamp)
+        return len(placed)
+
+    def _place(self, task: Task, index: int, order: int, updated_at: str):
+        task.order = order
+        self.tasks.insert(index, task)
+        self._orders.insert(index, task.order)
+        self._views_add(task)
+        stamp = self._stamp(updated_at)
+        self._touch(task, stamp)
+        self.version += 1
+        if self.storage:
+            self.storage.update_orders([(task.id, task.order)], stamp)
+
+    def move_block(self, task_ids, position: int) -> int:
+        """Đưa các task (giữ thứ tự tương đối) thành một khối bắt đầu tại position.
+
+        position tính trên danh sách sau khi đã gỡ khối ra; chỉ các task trong
+        khối nhận khóa 'order' mới.
+        """
+        block = sorted((t for t in map(self._by_id.get, set(task_ids)) if t is not None), key=lambda t: t.order)
+        if not block:
+            return 0
+        for task in block:
+            index = self.index_of(task.id)
+            del self.tasks[index]
+            del self._orders[index]
+            self._views_remove(task)
+        position = max(0, min(position, len(self.tasks)))
+        for offset, task in enumerate(block):
+            task.order = self._order_at(position + offset)
+            self.tasks.insert(position + offset, task)
+            self._orders.insert(position + offset, task.order)
+            self._views_add(task)
+        stamp = self._stamp()
+        for task in block:
+            self._touch(task, stamp)
+        self.version += 1
+        if self.storage:
+            self.storage.update_orders([(t.id, t.order) for t in block], stamp)
+        return len(block)
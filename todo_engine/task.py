@@ -0,0 +1,125 @@
+"""Biểu diễn gọn của một task"""
+import sys
+from collections.abc import MutableMapping
+from datetime import date
+from functools import lru_cache
+from typing import Dict
+
+from .constants import TASK_COLUMNS
+
+
+@lru_cache(maxsize=4096)
+def ordinal_isoformat(ordinal: int) -> str:
+    """'YYYY-MM-DD' của một ordinal (số ngày khác nhau thường ít nên được cache)"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+class Task(MutableMapping):
+    """Một công việc lưu bằng __slots__ thay cho dict chín khóa.
+
+    Vẫn đọc/ghi được như dict (task['name'], task.get(...), task.update(...),
+    dict(task)) với đúng các khóa trong TASK_COLUMNS. Mức độ ưu tiên và danh
+    mục được intern để mọi task dùng chung một chuỗi; ngày hết hạn dạng
+    'YYYY-MM-DD' được lưu thành ordinal (giá trị khác được giữ nguyên), nên
+    chuyển qua lại với dict/JSON không mất thông tin.
+    """
+
+    __slots__ = ('id', 'name', 'completed', 'priority', 'category', '_due', 'created_at', 'order', 'updated_at')
+
+    def __init__(self, id: int, name: str, completed: bool = False, priority: str = None,
+                 category: str = None, due_date: str = None, created_at: str = None, order: int = None,
+                 updated_at: str = None):
+        self.id = id
+        self.name = name
+        self.completed = completed
+        self.priority = sys.intern(priority) if isinstance(priority, str) else priority
+        self.category = sys.intern(category) if isinstance(category, str) else category
+        self.due_date = due_date
+        self.created_at = created_at
+        self.order = order
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(cls, data) -> 'Task':
+        """Task từ dict (hoặc Task khác); khóa ngoài TASK_COLUMNS bị bỏ qua"""
+        if isinstance(data, Task):
+            return data
+        get = data.get
+        return cls(get('id'), get('name'), get('completed', False), get('priority'), get('category'),
+                   get('due_date'), get('created_at'), get('order'), get('updated_at'))
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'completed': self.completed,
+            'priority': self.priority,
+            'category': self.category,
+            'due_date': self.due_date,
+            'created_at': self.created_at,
+            'order': self.order,
+            'updated_at': self.updated_at
+        }
+
+    def copy(self) -> 'Task':
+        """Bản sao độc lập, chép thẳng các slot (không intern / parse ngày lại)"""
+        task = Task.__new__(Task)
+        for slot in Task.__slots__:
+            setattr(task, slot, getattr(self, slot))
+        return task
+
+    @property
+    def due_date(self):
+        due = self._due
+        return ordinal_isoformat(due) if type(due) is int else due
+
+    @due_date.setter
+    def due_date(self, value):
+        if isinstance(value, str) and len(value) == 10:
+            # Chỉ dạng chuẩn YYYY-MM-DD mới được lưu thành ordinal để đọc lại
+            # đúng chuỗi cũ ('2024-W01-1' cũng dài 10 ký tự nhưng giữ nguyên)
+            try:
+                parsed = date.fromisoformat(value)
+            except ValueError:
+                parsed = None
+            if parsed is not None and parsed.isoformat() == value:
+                value = parsed.toordinal()
+        self._due = value
+
+    @property
+    def due_ordinal(self):
+        """Ngày hết hạn dạng ordinal, None nếu không có hoặc không phải ngày thuần"""
+        return self._due if type(self._due) is int else None
+
+    def __getitem__(self, key: str):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        if key in ('priority', 'category') and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str):
+        raise TypeError("Không thể xóa field của Task")
+
+    def __iter__(self):
+        return iter(TASK_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(TASK_COLUMNS)
+
+    def __contains__(self, key) -> bool:
+        return key in _FIELDS
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _FIELDS else default
+
+    def __repr__(self) -> str:
+        return f"Task({self.to_dict()!r})"
+
+
+_FIELDS = frozenset(TASK_COLUMNS)